@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк пропускной способности AsyncDatabaseManager при конкурентных запросах
+Сравнивает синхронные вызовы DatabaseManager из цикла событий с асинхронным фасадом
+и измеряет задержку цикла событий во время нагрузки
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.datagen import generate
+from database.async_database_manager import AsyncDatabaseManager
+from database.database_manager import DatabaseManager
+
+
+def populate(db_path, users, projects, tasks):
+    """Заполнение базы синтетическими данными"""
+    db = DatabaseManager(db_path)
+    generate(db, users, projects, tasks)
+    db.close()
+    return tasks
+
+
+async def measure_loop_lag(stop_event, interval=0.001):
+    """Максимальная задержка цикла событий относительно ожидаемого интервала"""
+    max_lag = 0.0
+    while not stop_event.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, time.perf_counter() - started - interval)
+    return max_lag
+
+
+async def sync_worker(db, task_count, requests):
+    for _ in range(requests):
+        db.get_task_by_id(random.randint(1, task_count))
+        db.search_tasks("Task 1")
+        await asyncio.sleep(0)
+
+
+async def async_worker(db, task_count, requests):
+    for _ in range(requests):
+        await db.get_task_by_id(random.randint(1, task_count))
+        await db.search_tasks("Task 1")
+
+
+async def run_scenario(name, worker, db, task_count, concurrency, requests):
+    stop_event = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop_event))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(db, task_count, requests) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop_event.set()
+    max_lag = await lag_task
+
+    total = concurrency * requests * 2
+    print(f"{name:<8} запросов: {total:>7}  время: {elapsed:8.3f} с  "
+          f"запросов/с: {total / elapsed:10.1f}  макс. задержка цикла: {max_lag * 1000:8.2f} мс")
+
+
+async def main_async(args):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        task_count = populate(db_path, args.users, args.projects, args.tasks)
+
+        for concurrency in args.concurrency:
+            print(f"\nКонкурентность: {concurrency}")
+
+            sync_db = DatabaseManager(db_path)
+            await run_scenario("sync", sync_worker, sync_db, task_count,
+                               concurrency, args.requests)
+            sync_db.close()
+
+            async with AsyncDatabaseManager(db_path) as async_db:
+                await run_scenario("async", async_worker, async_db, task_count,
+                                   concurrency, args.requests)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=50,
+                        help="количество запросов на одну корутину")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
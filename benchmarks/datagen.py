@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Генератор синтетических данных для бенчмарков
+Заполняет базу пользователями, проектами и задачами в заданном масштабе
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+
+from database.database_manager import DatabaseManager
+from database.storage import PROJECT_STATUSES, TASK_STATUSES, USER_ROLES
+
+# Масштаб задаётся числом задач, пользователей и проектов пропорционально меньше
+SCALES = {
+    "1k": 1_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+INSERT_BATCH_SIZE = 10_000
+
+
+def scale_counts(tasks):
+    """Количество пользователей, проектов и задач для заданного числа задач"""
+    return {
+        "users": max(10, tasks // 100),
+        "projects": max(5, tasks // 50),
+        "tasks": tasks,
+    }
+
+
+def _insert(db, sql, rows):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, INSERT_BATCH_SIZE))
+        if not batch:
+            break
+        with db.connection:
+            db.connection.executemany(sql, batch)
+
+
+def generate(db, users, projects, tasks, seed=42):
+    """Заполнение базы; значения кодируются в текущем режиме хранения базы"""
+    rng = random.Random(seed)
+    codec = db.codec
+    now = datetime.now().replace(microsecond=0)
+    timings = {}
+
+    started = time.perf_counter()
+    first_user = (db.fetch_one("SELECT COALESCE(MAX(id), 0) AS id FROM users")["id"]) + 1
+    rows = ((f"user{first_user + i}", f"user{first_user + i}@example.com",
+             codec.encode("users", "role", rng.choice(USER_ROLES)),
+             codec.encode_date(now - timedelta(days=rng.randint(0, 720))))
+            for i in range(users))
+    _insert(db, "INSERT INTO users (username, email, role, registration_date)"
+                " VALUES (?, ?, ?, ?)", rows)
+    timings["users"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rows = ((f"Project {i}", f"Описание проекта {i}",
+             codec.encode_date(now - timedelta(days=rng.randint(0, 365))),
+             codec.encode_date(now + timedelta(days=rng.randint(1, 365))),
+             codec.encode("projects", "status", rng.choice(PROJECT_STATUSES)))
+            for i in range(projects))
+    _insert(db, "INSERT INTO projects (name, description, start_date, end_date, status)"
+                " VALUES (?, ?, ?, ?, ?)", rows)
+    timings["projects"] = time.perf_counter() - started
+
+    user_ids = [row["id"] for row in db.fetch_all("SELECT id FROM users")]
+    project_ids = [row["id"] for row in db.fetch_all("SELECT id FROM projects")]
+
+    started = time.perf_counter()
+    rows = ((f"Task {i}", f"Описание задачи {i}", rng.randint(1, 3),
+             codec.encode("tasks", "status", rng.choice(TASK_STATUSES)),
+             codec.encode_date(now + timedelta(days=rng.randint(-30, 90))),
+             rng.choice(project_ids), rng.choice(user_ids))
+            for i in range(tasks))
+    _insert(db, "INSERT INTO tasks (title, description, priority, status, due_date,"
+                " project_id, assignee_id) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    timings["tasks"] = time.perf_counter() - started
+
+    db.clear_cache()
+    db.connection.execute("ANALYZE")
+    return timings
+
+
+def generate_scale(db_path, scale, seed=42, **storage):
+    """Создание базы заданного масштаба; возвращает количество строк и время загрузки"""
+    counts = scale_counts(SCALES[scale] if scale in SCALES else int(scale))
+    db = DatabaseManager(db_path, **storage)
+    try:
+        timings = generate(db, seed=seed, **counts)
+    finally:
+        db.close()
+    return counts, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("db_path", help="путь к создаваемой базе данных")
+    parser.add_argument("--scale", default="1k",
+                        help=f"масштаб ({', '.join(SCALES)}) или число задач")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    counts, timings = generate_scale(args.db_path, args.scale, args.seed)
+    for table, count in counts.items():
+        print(f"{table:<9} {count:>9} строк  {timings[table]:8.2f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк сборки объектов из строк базы данных
+Сравнивает конструкторы моделей с валидацией и доверенный путь from_row
+на строках сгенерированной базы, а также проверку email предварительно
+скомпилированным шаблоном и шаблоном-строкой
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.datagen import SCALES, generate_scale
+from benchmarks.suite import DEFAULT_REPEAT, DEFAULT_THRESHOLD, RESULTS_DIR, compare, summarize
+from database.database_manager import DatabaseManager
+from models.project import Project
+from models.task import Task
+from models.user import EMAIL_PATTERN, User
+
+
+def construct_task(db, row):
+    """Прежний путь: конструктор Task со всеми проверками"""
+    return Task(id=row['id'], title=row['title'], description=row['description'],
+                priority=row['priority'], due_date=db.codec.decode_date(row['due_date']),
+                project_id=row['project_id'], assignee_id=row['assignee_id'],
+                status=db.codec.decode('tasks', 'status', row['status']))
+
+
+def construct_project(db, row):
+    """Прежний путь: конструктор Project со всеми проверками"""
+    return Project(id=row['id'], name=row['name'], description=row['description'],
+                   start_date=db.codec.decode_date(row['start_date']),
+                   end_date=db.codec.decode_date(row['end_date']),
+                   status=db.codec.decode('projects', 'status', row['status']))
+
+
+def construct_user(db, row):
+    """Прежний путь: конструктор User со всеми проверками"""
+    return User(id=row['id'], username=row['username'], email=row['email'],
+                role=db.codec.decode('users', 'role', row['role']),
+                registration_date=db.codec.decode_date(row['registration_date']))
+
+
+def benchmarks(db, rows):
+    """Тройки (имя, таблица строк, операция над всеми строками таблицы)"""
+    emails = [row['email'] for row in rows['users']]
+    pattern = EMAIL_PATTERN.pattern
+    return [
+        ("tasks.constructor", "tasks", lambda: [construct_task(db, r) for r in rows['tasks']]),
+        ("tasks.from_row", "tasks", lambda: [db._row_to_task(r) for r in rows['tasks']]),
+        ("projects.constructor", "projects",
+         lambda: [construct_project(db, r) for r in rows['projects']]),
+        ("projects.from_row", "projects",
+         lambda: [db._row_to_project(r) for r in rows['projects']]),
+        ("users.constructor", "users", lambda: [construct_user(db, r) for r in rows['users']]),
+        ("users.from_row", "users", lambda: [db._row_to_user(r) for r in rows['users']]),
+        ("email.re_match", "users", lambda: [re.match(pattern, e) for e in emails]),
+        ("email.compiled", "users", lambda: [EMAIL_PATTERN.match(e) for e in emails]),
+    ]
+
+
+def run(args):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "hydration_bench.db")
+        print(f"Генерация данных масштаба {args.scale}...")
+        generate_scale(db_path, args.scale, args.seed)
+        db = DatabaseManager(db_path)
+        try:
+            # Строки читаются заранее, чтобы замерялась только сборка объектов
+            rows = {table: db.fetch_all(f"SELECT * FROM {table}")
+                    for table in ("tasks", "projects", "users")}
+            results = {}
+            for name, table, operation in benchmarks(db, rows):
+                operation()
+                samples = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    operation()
+                    samples.append((time.perf_counter() - started) * 1000)
+                results[name] = summarize(samples)
+                count = len(rows[table])
+                per_row_us = results[name]['median_ms'] * 1000 / max(count, 1)
+                print(f"{name:<24} p50 {results[name]['median_ms']:>9.3f} мс "
+                      f"({per_row_us:.2f} мкс на строку, строк: {count})")
+        finally:
+            db.close()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "scale": args.scale,
+            "repeat": args.repeat,
+            "rows": {table: len(values) for table, values in rows.items()},
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", default="1k",
+                        help=f"масштаб ({', '.join(SCALES)}) или число задач")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="количество повторов каждой операции")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="файл результатов JSON "
+                                         "(по умолчанию benchmarks/results/hydration-<scale>.json)")
+    parser.add_argument("--baseline", help="файл базового прогона для поиска регрессий")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="допустимый относительный рост медианы")
+    args = parser.parse_args()
+
+    report = run(args)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"hydration-{args.scale}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты сохранены в {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
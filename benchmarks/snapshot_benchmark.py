@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк записи во время долгой выгрузки
+Выгрузка всех задач в CSV выполняется в отдельном процессе, как отчёт другого
+экземпляра приложения, а основной процесс в это время обновляет задачи.
+Сравниваются запись без выгрузки, выгрузка обычным чтением в режиме журнала
+отката и выгрузка из снимка read_snapshot в режиме WAL: замеряются
+пропускная способность и задержка записи
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.datagen import SCALES, generate_scale
+from benchmarks.suite import DEFAULT_THRESHOLD, RESULTS_DIR, compare, summarize
+from database.database_manager import DatabaseManager
+
+EXPORT_COLUMNS = ('title', 'status', 'due_date', 'project_id', 'assignee_id')
+# Сценарии: имя, режим журнала базы и способ выгрузки
+SCENARIOS = (
+    ("idle", "wal", None),
+    ("rollback", "delete", "direct"),
+    ("snapshot", "wal", "snapshot"),
+)
+
+
+def export(db, path):
+    """Выгрузка задач с названиями проектов и именами исполнителей; возвращает число строк"""
+    projects = {project.id: project.name for project in db.get_all_projects(columns=['name'])}
+    users = {user.id: user.username for user in db.get_all_users(columns=['username'])}
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for task in db.iter_tasks(columns=EXPORT_COLUMNS):
+            writer.writerow((task.id, task.title, task.status, task.due_date.isoformat(),
+                             projects.get(task.project_id), users.get(task.assignee_id)))
+            rows += 1
+    return rows
+
+
+def run_export(db_path, method, path, reports):
+    """Выгрузка в дочернем процессе; итог передаётся через очередь"""
+    report = {}
+    db = DatabaseManager(db_path)
+    try:
+        started = time.perf_counter()
+        if method == "snapshot":
+            with db.read_snapshot() as snapshot:
+                report["rows"] = export(snapshot, path)
+        else:
+            report["rows"] = export(db, path)
+        report["seconds"] = time.perf_counter() - started
+    except Exception as e:
+        report["error"] = str(e)
+    finally:
+        db.close()
+    reports.put(report)
+
+
+def set_journal_mode(db_path, mode):
+    connection = sqlite3.connect(db_path)
+    try:
+        connection.execute(f"PRAGMA journal_mode = {mode}")
+    finally:
+        connection.close()
+
+
+def write_until(db, task_count, rng, done):
+    """Обновления задач, пока done() не вернёт True; задержки в мс и число ошибок"""
+    latencies = []
+    errors = 0
+    while not done():
+        started = time.perf_counter()
+        try:
+            db.update_task(rng.randint(1, task_count), priority=rng.randint(1, 3))
+        except Exception:
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies, errors
+
+
+def run_scenario(db_path, task_count, mode, method, args, tmp_dir):
+    set_journal_mode(db_path, mode)
+    rng = random.Random(args.seed)
+    db = DatabaseManager(db_path)
+    report = {}
+    try:
+        started = time.perf_counter()
+        if method is None:
+            deadline = started + args.idle_seconds
+            latencies, errors = write_until(db, task_count, rng,
+                                            lambda: time.perf_counter() >= deadline)
+        else:
+            # Соединения SQLite нельзя наследовать через fork, поэтому
+            # процесс выгрузки запускается заново
+            context = multiprocessing.get_context("spawn")
+            reports = context.Queue()
+            path = os.path.join(tmp_dir, f"export-{method}.csv")
+            exporter = context.Process(target=run_export, args=(db_path, method, path, reports))
+            exporter.start()
+            latencies, errors = write_until(db, task_count, rng,
+                                            lambda: not exporter.is_alive())
+            exporter.join()
+            # Процесс, упавший до отправки итога, ничего не положит в очередь
+            report = reports.get() if exporter.exitcode == 0 else {
+                "error": f"код завершения процесса {exporter.exitcode}"}
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+
+    if "error" in report:
+        raise RuntimeError(f"Ошибка выгрузки: {report['error']}")
+    result = summarize(latencies or [0.0])
+    result.update({
+        "writes": len(latencies),
+        "errors": errors,
+        "writes_per_sec": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "export_rows": report.get("rows"),
+        "export_s": round(report["seconds"], 3) if "seconds" in report else None,
+    })
+    return result
+
+
+def run(args):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = args.db or os.path.join(tmp_dir, "snapshot_bench.db")
+        if not os.path.exists(db_path) or os.path.getsize(db_path) == 0:
+            print(f"Генерация данных масштаба {args.scale}...")
+            generate_scale(db_path, args.scale, args.seed)
+        db = DatabaseManager(db_path)
+        try:
+            task_count = db.get_counts()["tasks"]
+        finally:
+            db.close()
+
+        results = {}
+        for name, mode, method in SCENARIOS:
+            result = results[f"write.{name}"] = run_scenario(db_path, task_count, mode,
+                                                             method, args, tmp_dir)
+            export = f"выгрузка {result['export_s']} с" if method else "без выгрузки"
+            print(f"write.{name:<10} записей/с {result['writes_per_sec']:>10.1f}  "
+                  f"p50 {result['median_ms']:>8.3f} мс  max {result['max_ms']:>9.3f} мс  "
+                  f"ошибок {result['errors']:>4}  ({export})")
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "scale": args.scale,
+            "tasks": task_count,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", default="1m",
+                        help=f"масштаб ({', '.join(SCALES)}) или число задач")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="путь к базе; существующая база используется повторно")
+    parser.add_argument("--idle-seconds", type=float, default=2.0,
+                        help="длительность записи без выгрузки")
+    parser.add_argument("--output", help="файл результатов JSON "
+                                         "(по умолчанию benchmarks/results/snapshot-<scale>.json)")
+    parser.add_argument("--baseline", help="файл базового прогона для поиска регрессий")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="допустимый относительный рост медианы")
+    args = parser.parse_args()
+
+    try:
+        report = run(args)
+    except RuntimeError as e:
+        print(f"Ошибка: {e}")
+        sys.exit(2)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"snapshot-{args.scale}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты сохранены в {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк запуска приложения
+Каждый прогон запускает MainWindow в отдельном процессе на сгенерированной базе
+под виртуальным X-сервером (Xvfb) и замеряет от старта процесса время импорта
+модулей, время до первой отрисовки окна и время до загрузки данных открытой вкладки
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Модули бенчмарков импортируют базу данных и контроллеры, поэтому в дочернем
+# процессе они загружаются только после замера импорта приложения
+
+DEFAULT_RUNS = 5
+# Дочерний процесс запускается как модуль пакета benchmarks из корня проекта
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHILD_TIMEOUT = 300
+
+
+def child(db_path):
+    """Запуск окна в дочернем процессе; отметки времени печатаются в stdout в JSON"""
+    marks = {}
+    from views.main_window import MainWindow
+    marks["import"] = time.time()
+    modules = len(sys.modules)
+
+    from benchmarks.ui_benchmark import fail_on_message_boxes
+
+    with fail_on_message_boxes():
+        window = MainWindow(db_path)
+        marks["window_created"] = time.time()
+
+        def on_expose(event):
+            # Первое событие Expose окна верхнего уровня: окно показано,
+            # после обработки idle-задач его содержимое нарисовано
+            if event.widget is window.root and "first_paint" not in marks:
+                window.root.update_idletasks()
+                marks["first_paint"] = time.time()
+
+        window.root.bind("<Expose>", on_expose, add="+")
+        try:
+            while not window.loaded or "first_paint" not in marks:
+                window.root.update()
+            window.root.update_idletasks()
+            marks["data_ready"] = time.time()
+        finally:
+            window.db_manager.close()
+            window.root.destroy()
+
+    print(json.dumps({"marks": marks, "modules": modules}))
+
+
+def run_once(db_path):
+    """Один запуск дочернего процесса; возвращает интервалы от его старта в мс"""
+    started = time.time()
+    completed = subprocess.run([sys.executable, "-m", "benchmarks.startup_benchmark",
+                                "--child", db_path],
+                               cwd=PROJECT_ROOT, capture_output=True, text=True,
+                               timeout=CHILD_TIMEOUT)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Дочерний процесс завершился с ошибкой:\n{completed.stderr}")
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    timings = {f"startup.{name}": (value - started) * 1000
+               for name, value in report["marks"].items()}
+    return timings, report["modules"]
+
+
+def run(args):
+    from benchmarks.datagen import generate_scale
+    from benchmarks.ui_benchmark import summarize, virtual_display
+
+    samples = {}
+    modules = 0
+    with virtual_display(args.xvfb) as display, tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = args.db or os.path.join(tmp_dir, "startup_bench.db")
+        if not os.path.exists(db_path) or os.path.getsize(db_path) == 0:
+            print(f"Генерация данных масштаба {args.scale}...")
+            generate_scale(db_path, args.scale, args.seed)
+
+        # Первый запуск прогревает файловый кэш ОС и не учитывается
+        run_once(db_path)
+        for _ in range(args.runs):
+            timings, modules = run_once(db_path)
+            for name, elapsed_ms in timings.items():
+                samples.setdefault(name, []).append(elapsed_ms)
+
+    results = {name: summarize(values) for name, values in samples.items()}
+    for name, result in results.items():
+        print(f"{name:<24} p50 {result['median_ms']:>9.2f} мс  max {result['max_ms']:>9.2f} мс")
+    print(f"Модулей загружено при импорте главного окна: {modules}")
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "scale": args.scale,
+            "runs": args.runs,
+            "display": display,
+            "modules_after_import": modules,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def main():
+    from benchmarks.datagen import SCALES
+    from benchmarks.suite import DEFAULT_THRESHOLD, RESULTS_DIR, compare
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", default="100k",
+                        help=f"масштаб ({', '.join(SCALES)}) или число задач")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS,
+                        help="количество запусков приложения")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="путь к базе; существующая база используется повторно")
+    parser.add_argument("--xvfb", action="store_true",
+                        help="запускать Xvfb даже при заданной переменной DISPLAY")
+    parser.add_argument("--output", help="файл результатов JSON "
+                                         "(по умолчанию benchmarks/results/startup-<scale>.json)")
+    parser.add_argument("--baseline", help="файл базового прогона для поиска регрессий")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="допустимый относительный рост медианы")
+    args = parser.parse_args()
+
+    try:
+        report = run(args)
+    except (RuntimeError, subprocess.TimeoutExpired) as e:
+        print(f"Ошибка: {e}")
+        sys.exit(2)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{args.scale}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты сохранены в {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        child(sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Набор бенчмарков DatabaseManager и контроллеров
+Генерирует синтетическую базу заданного масштаба, измеряет время каждой операции,
+сохраняет результаты в JSON и сравнивает их с сохранённым базовым прогоном
+"""
+
+import argparse
+import fnmatch
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.datagen import SCALES, generate_scale
+from controllers.project_controller import ProjectController
+from controllers.task_controller import TaskController
+from controllers.user_controller import UserController
+from database.database_manager import DatabaseManager
+from models.project import Project
+from models.task import Task
+from models.user import User
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+BULK_INSERT_SIZE = 1000
+DEFAULT_REPEAT = 20
+DEFAULT_THRESHOLD = 0.25
+# Изменения меньше этого порога считаются шумом даже при большом относительном росте
+MIN_DELTA_MS = 0.05
+
+
+class Context:
+    """Состояние прогона: база, контроллеры и идентификаторы существующих записей"""
+
+    def __init__(self, db, seed):
+        self.db = db
+        self.rng = random.Random(seed)
+        self.task_controller = TaskController(db)
+        self.project_controller = ProjectController(db)
+        self.user_controller = UserController(db)
+        self.task_ids = [row["id"] for row in db.fetch_all("SELECT id FROM tasks")]
+        self.project_ids = [row["id"] for row in db.fetch_all("SELECT id FROM projects")]
+        self.user_ids = [row["id"] for row in db.fetch_all("SELECT id FROM users")]
+        self.pool = []
+        self._counter = itertools.count()
+
+    def task_id(self):
+        return self.rng.choice(self.task_ids)
+
+    def project_id(self):
+        return self.rng.choice(self.project_ids)
+
+    def user_id(self):
+        return self.rng.choice(self.user_ids)
+
+    def unique(self, prefix):
+        return f"{prefix}{os.getpid()}_{next(self._counter)}"
+
+    def new_task(self):
+        return Task(self.unique("Bench task "), "Описание", self.rng.randint(1, 3),
+                    datetime.now() + timedelta(days=7), self.project_id(), self.user_id())
+
+    def new_project(self):
+        now = datetime.now()
+        return Project(self.unique("Bench project "), "Описание", now, now + timedelta(days=30))
+
+    def new_user(self):
+        name = self.unique("bench_user_")
+        return User(name, f"{name}@example.com", "developer")
+
+    def bulk_insert_tasks(self):
+        codec = self.db.codec
+        due_date = codec.encode_date(datetime.now() + timedelta(days=7))
+        status = codec.encode("tasks", "status", "pending")
+        rows = [
+            (self.unique("Bulk task "), "Описание", 2, status, due_date,
+             self.project_id(), self.user_id())
+            for _ in range(BULK_INSERT_SIZE)
+        ]
+        with self.db.connection:
+            self.db.connection.executemany(
+                "INSERT INTO tasks (title, description, priority, status, due_date,"
+                " project_id, assignee_id) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self.db.clear_cache()
+
+    def fill_pool(self, factory, repeat):
+        self.pool = [factory() for _ in range(repeat)]
+
+
+def _pool_tasks(c, n):
+    c.fill_pool(lambda: c.db.add_task(c.new_task()), n)
+
+
+def _pool_projects(c, n):
+    c.fill_pool(lambda: c.db.add_project(c.new_project()), n)
+
+
+def _pool_users(c, n):
+    c.fill_pool(lambda: c.db.add_user(c.new_user()), n)
+
+
+# (имя, подготовка пула записей или None, одна операция)
+BENCHMARKS = [
+    ("db.add_task", None, lambda c: c.db.add_task(c.new_task())),
+    ("db.add_project", None, lambda c: c.db.add_project(c.new_project())),
+    ("db.add_user", None, lambda c: c.db.add_user(c.new_user())),
+    ("db.bulk_insert_tasks", None, lambda c: c.bulk_insert_tasks()),
+    ("db.get_task_by_id", None, lambda c: c.db.get_task_by_id(c.task_id())),
+    ("db.get_all_tasks", None, lambda c: c.db.get_all_tasks()),
+    ("db.search_tasks", None, lambda c: c.db.search_tasks("Task 1")),
+    ("db.get_overdue_tasks", None, lambda c: c.db.get_overdue_tasks()),
+    ("db.get_tasks_by_project", None, lambda c: c.db.get_tasks_by_project(c.project_id())),
+    ("db.get_tasks_by_user", None, lambda c: c.db.get_tasks_by_user(c.user_id())),
+    ("db.get_all_projects", None, lambda c: c.db.get_all_projects()),
+    ("db.get_all_users", None, lambda c: c.db.get_all_users()),
+    ("db.update_task", None,
+     lambda c: c.db.update_task(c.task_id(), priority=c.rng.randint(1, 3))),
+    ("db.update_project", None,
+     lambda c: c.db.update_project(c.project_id(), description="Обновлено")),
+    ("db.update_user", None, lambda c: c.db.update_user(c.user_id(), role="manager")),
+    ("db.delete_task", _pool_tasks, lambda c: c.db.delete_task(c.pool.pop())),
+    ("db.delete_project", _pool_projects, lambda c: c.db.delete_project(c.pool.pop())),
+    ("db.delete_user", _pool_users, lambda c: c.db.delete_user(c.pool.pop())),
+    ("task_controller.add_task", None,
+     lambda c: c.task_controller.add_task(c.unique("Task "), "Описание", 2,
+                                          datetime.now() + timedelta(days=7),
+                                          c.project_id(), c.user_id())),
+    ("task_controller.get_all_tasks", None, lambda c: c.task_controller.get_all_tasks()),
+    ("task_controller.search_tasks", None, lambda c: c.task_controller.search_tasks("Task 1")),
+    ("task_controller.get_overdue_tasks", None,
+     lambda c: c.task_controller.get_overdue_tasks()),
+    ("task_controller.get_tasks_by_project", None,
+     lambda c: c.task_controller.get_tasks_by_project(c.project_id())),
+    ("task_controller.get_tasks_by_user", None,
+     lambda c: c.task_controller.get_tasks_by_user(c.user_id())),
+    ("task_controller.update_task", None,
+     lambda c: c.task_controller.update_task(c.task_id(), priority=c.rng.randint(1, 3))),
+    ("task_controller.update_task_status", None,
+     lambda c: c.task_controller.update_task_status(c.task_id(), "in_progress")),
+    ("task_controller.delete_task", _pool_tasks,
+     lambda c: c.task_controller.delete_task(c.pool.pop())),
+    ("project_controller.add_project", None,
+     lambda c: c.project_controller.add_project(c.unique("Project "), "Описание",
+                                                datetime.now() + timedelta(days=1),
+                                                datetime.now() + timedelta(days=30))),
+    ("project_controller.get_all_projects", None,
+     lambda c: c.project_controller.get_all_projects()),
+    ("project_controller.get_project_progress", None,
+     lambda c: c.project_controller.get_project_progress(c.project_id())),
+    ("project_controller.get_all_project_progress", None,
+     lambda c: c.project_controller.get_all_project_progress()),
+    ("project_controller.update_project_status", None,
+     lambda c: c.project_controller.update_project_status(c.project_id(), "active")),
+    ("project_controller.delete_project", _pool_projects,
+     lambda c: c.project_controller.delete_project(c.pool.pop())),
+    ("user_controller.add_user", None,
+     lambda c: c.user_controller.add_user(c.unique("user_"), c.unique("mail") + "@example.com",
+                                          "developer")),
+    ("user_controller.get_all_users", None, lambda c: c.user_controller.get_all_users()),
+    ("user_controller.get_all_user_workload", None,
+     lambda c: c.user_controller.get_all_user_workload()),
+    ("user_controller.get_user_tasks", None,
+     lambda c: c.user_controller.get_user_tasks(c.user_id())),
+    ("user_controller.update_user", None,
+     lambda c: c.user_controller.update_user(c.user_id(), role="developer")),
+    ("user_controller.delete_user", _pool_users,
+     lambda c: c.user_controller.delete_user(c.pool.pop())),
+]
+
+
+def measure(ctx, setup, operation, repeat, warm):
+    """Время каждого повтора операции в миллисекундах"""
+    if setup:
+        setup(ctx, repeat)
+    samples = []
+    for _ in range(repeat):
+        if not warm:
+            ctx.db.clear_cache()
+        started = time.perf_counter()
+        operation(ctx)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def summarize(samples):
+    median = statistics.median(samples)
+    return {
+        "repeat": len(samples),
+        "min_ms": round(min(samples), 4),
+        "median_ms": round(median, 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "max_ms": round(max(samples), 4),
+        "ops_per_sec": round(1000 / median, 2) if median else None,
+    }
+
+
+def run_suite(db_path, args, storage):
+    ctx = Context(DatabaseManager(db_path, **storage), args.seed)
+    results = {}
+    try:
+        for name, setup, operation in BENCHMARKS:
+            if args.filter and not any(fnmatch.fnmatch(name, p) for p in args.filter):
+                continue
+            results[name] = summarize(measure(ctx, setup, operation, args.repeat, args.warm))
+            print(f"{name:<42} медиана {results[name]['median_ms']:>10.3f} мс  "
+                  f"мин {results[name]['min_ms']:>10.3f} мс")
+        storage_options = ctx.db.codec.options()
+    finally:
+        ctx.db.close()
+    return results, storage_options
+
+
+def run(args):
+    storage = {key: value for key, value in
+               (("compact_enums", args.compact_enums), ("epoch_dates", args.epoch_dates))
+               if value is not None}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = args.db or os.path.join(tmp_dir, "bench.db")
+        load = None
+        if not os.path.exists(db_path) or os.path.getsize(db_path) == 0:
+            print(f"Генерация данных масштаба {args.scale}...")
+            counts, timings = generate_scale(db_path, args.scale, args.seed, **storage)
+            load = {
+                table: {"rows": counts[table], "seconds": round(timings[table], 3),
+                        "rows_per_sec": round(counts[table] / timings[table], 1)
+                        if timings[table] else None}
+                for table in counts
+            }
+        results, storage_options = run_suite(db_path, args, storage)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "scale": args.scale,
+            "repeat": args.repeat,
+            "warm_cache": args.warm,
+            "storage": storage_options,
+            "load": load,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, min_delta_ms=MIN_DELTA_MS):
+    """Сравнение медиан с базовым прогоном; возвращает список регрессий"""
+    regressions = []
+    print(f"\n{'операция':<42} {'база, мс':>10} {'сейчас, мс':>11} {'изм.':>8}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<42} {'-':>10} {result['median_ms']:>11.3f}     new")
+            continue
+        before, after = base["median_ms"], result["median_ms"]
+        change = (after - before) / before if before else 0.0
+        regressed = change > threshold and after - before > min_delta_ms
+        mark = "  РЕГРЕССИЯ" if regressed else ""
+        print(f"{name:<42} {before:>10.3f} {after:>11.3f} {change:>+8.1%}{mark}")
+        if regressed:
+            regressions.append({"name": name, "baseline_ms": before,
+                                "current_ms": after, "change": round(change, 4)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", default="1k",
+                        help=f"масштаб ({', '.join(SCALES)}) или число задач")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="количество повторов каждой операции")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--filter", nargs="+",
+                        help="шаблоны имён операций, например 'db.get_*'")
+    parser.add_argument("--warm", action="store_true",
+                        help="не сбрасывать кэши перед каждым повтором")
+    parser.add_argument("--db", help="путь к базе; существующая база используется повторно")
+    parser.add_argument("--compact-enums", action="store_true", default=None)
+    parser.add_argument("--epoch-dates", action="store_true", default=None)
+    parser.add_argument("--output", help="файл результатов JSON "
+                                         "(по умолчанию benchmarks/results/<scale>.json)")
+    parser.add_argument("--baseline", help="файл базового прогона для поиска регрессий")
+    parser.add_argument("--compare", metavar="RESULTS",
+                        help="сравнить готовый файл результатов с --baseline без запуска")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="допустимый относительный рост медианы")
+    args = parser.parse_args()
+
+    if args.compare:
+        if not args.baseline:
+            parser.error("--compare требует --baseline")
+        with open(args.compare, encoding="utf-8") as f:
+            report = json.load(f)
+    else:
+        report = run(args)
+        output = args.output or os.path.join(RESULTS_DIR, f"{args.scale}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nРезультаты сохранены в {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"\nНайдено регрессий: {len(regressions)}")
+            sys.exit(1)
+        print("\nРегрессий не найдено")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк интерфейса Tkinter без монитора
+Запускает MainWindow на сгенерированной базе под виртуальным X-сервером (Xvfb),
+имитирует ввод в поле поиска, обновления списков, открытие диалогов и
+переключение вкладок и сохраняет перцентили задержек каждой операции в JSON
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from benchmarks.datagen import SCALES, generate_scale
+from benchmarks.suite import DEFAULT_THRESHOLD, RESULTS_DIR, compare
+
+DEFAULT_ROUNDS = 5
+SEARCH_TEXT = "task 1"
+XVFB_SCREEN = "1280x1024x24"
+XVFB_START_TIMEOUT = 10
+QUERY_REPORT_SIZE = 15
+
+
+@contextmanager
+def virtual_display(force=False):
+    """Запуск Xvfb, если нет дисплея или он запрошен явно"""
+    if os.environ.get("DISPLAY") and not force:
+        yield os.environ["DISPLAY"]
+        return
+
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        raise RuntimeError("Не найден Xvfb и не задана переменная DISPLAY")
+
+    display_number = 99
+    while os.path.exists(f"/tmp/.X11-unix/X{display_number}"):
+        display_number += 1
+    display = f":{display_number}"
+    process = start_xvfb(xvfb, display_number)
+    previous = os.environ.get("DISPLAY")
+    try:
+        os.environ["DISPLAY"] = display
+        yield display
+    finally:
+        if previous is None:
+            os.environ.pop("DISPLAY", None)
+        else:
+            os.environ["DISPLAY"] = previous
+        process.terminate()
+        process.wait()
+
+
+def start_xvfb(xvfb, display_number):
+    """Запуск Xvfb и ожидание его сокета; процесс, не успевший запуститься, завершается"""
+    process = subprocess.Popen([xvfb, f":{display_number}", "-screen", "0", XVFB_SCREEN,
+                                "-nolisten", "tcp"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + XVFB_START_TIMEOUT
+    while not os.path.exists(f"/tmp/.X11-unix/X{display_number}"):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.terminate()
+            process.wait()
+            raise RuntimeError("Не удалось запустить Xvfb")
+        time.sleep(0.05)
+    return process
+
+
+@contextmanager
+def fail_on_message_boxes():
+    """Модальные окна сообщений заблокировали бы прогон, поэтому они становятся ошибками"""
+    from tkinter import messagebox
+
+    def fail(title, message=None, **options):
+        raise RuntimeError(f"Открыто окно сообщения '{title}': {message}")
+
+    names = ("showinfo", "showwarning", "showerror", "askyesno", "askokcancel")
+    originals = {name: getattr(messagebox, name) for name in names}
+    for name in names:
+        setattr(messagebox, name, fail)
+    try:
+        yield
+    finally:
+        for name, original in originals.items():
+            setattr(messagebox, name, original)
+
+
+class Recorder:
+    def __init__(self, root):
+        self.root = root
+        self.samples = {}
+
+    @contextmanager
+    def measure(self, name):
+        # Замер включает перерисовку: очередь idle-задач Tk обрабатывается до остановки таймера
+        started = time.perf_counter()
+        yield
+        self.root.update_idletasks()
+        self.samples.setdefault(name, []).append((time.perf_counter() - started) * 1000)
+
+    def add(self, name, elapsed_ms):
+        self.samples.setdefault(name, []).append(elapsed_ms)
+
+
+def percentile(sorted_samples, fraction):
+    index = max(0, math.ceil(fraction * len(sorted_samples)) - 1)
+    return sorted_samples[index]
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "repeat": len(ordered),
+        "min_ms": round(ordered[0], 4),
+        "median_ms": round(statistics.median(ordered), 4),
+        "p90_ms": round(percentile(ordered, 0.90), 4),
+        "p95_ms": round(percentile(ordered, 0.95), 4),
+        "p99_ms": round(percentile(ordered, 0.99), 4),
+        "max_ms": round(ordered[-1], 4),
+        "mean_ms": round(statistics.fmean(ordered), 4),
+    }
+
+
+def walk(widget):
+    pending = list(widget.winfo_children())
+    while pending:
+        child = pending.pop()
+        yield child
+        pending.extend(child.winfo_children())
+
+
+def find_search_entry(view):
+    from tkinter import ttk
+    variable = str(view.search_var)
+    for widget in walk(view):
+        if isinstance(widget, ttk.Entry) and str(widget.cget("textvariable")) == variable:
+            return widget
+    raise RuntimeError(f"Поле поиска не найдено в {view.__class__.__name__}")
+
+
+def flush_search(view):
+    # Поиск задач откладывается до паузы в наборе; отложенный запрос
+    # выполняется сразу, чтобы замер нажатия включал фильтрацию
+    job = getattr(view, "_search_job", None)
+    if job is not None:
+        view.after_cancel(job)
+        view._run_search()
+    wait_search(view)
+
+
+def wait_search(view):
+    # Поиск задач идёт в фоновом потоке, результат показывается
+    # из цикла событий, поэтому цикл прокручивается до его завершения
+    while getattr(view, "searching", False):
+        view.update()
+
+
+def type_text(recorder, name, view, entry, text):
+    # Каждый символ вводится отдельным событием, как при наборе с клавиатуры:
+    # KeyRelease вызывает фильтрацию списка, привязанную в представлении
+    for char in text:
+        with recorder.measure(name):
+            entry.insert("end", char)
+            entry.event_generate("<KeyRelease>", keysym="space" if char == " " else char)
+            flush_search(view)
+    for _ in text:
+        with recorder.measure(name):
+            entry.delete(len(entry.get()) - 1, "end")
+            entry.event_generate("<KeyRelease>", keysym="BackSpace")
+            flush_search(view)
+
+
+def open_dialog(recorder, name, root, opener):
+    # Диалоги модальные и ждут закрытия в wait_window, поэтому закрытие
+    # планируется заранее: оно выполнится, как только диалог построен
+    # и цикл событий освободился
+    import tkinter as tk
+
+    def close_dialogs():
+        recorder.add(name, (time.perf_counter() - started) * 1000)
+        for widget in [w for w in walk(root) if isinstance(w, tk.Toplevel)]:
+            if widget.winfo_exists():
+                widget.destroy()
+
+    started = time.perf_counter()
+    after_id = root.after_idle(close_dialogs)
+    try:
+        opener()
+    except Exception:
+        root.after_cancel(after_id)
+        raise
+
+
+def run_scenario(window, recorder, rounds):
+    root = window.root
+    views = [
+        ("tasks", window.task_view, window.task_view.refresh_tasks, window.task_view.add_task),
+        ("projects", window.project_view, window.project_view.refresh_projects,
+         window.project_view.add_project),
+        ("users", window.user_view, window.user_view.refresh_users, window.user_view.add_user),
+    ]
+    entries = {name: find_search_entry(view) for name, view, _, _ in views}
+
+    for _ in range(rounds):
+        for index, (name, view, refresh, add) in enumerate(views):
+            with recorder.measure("tab_switch"):
+                window.notebook.select(index)
+                root.update()
+            with recorder.measure(f"{name}.refresh"):
+                refresh()
+            type_text(recorder, f"{name}.keystroke", view, entries[name], SEARCH_TEXT)
+            open_dialog(recorder, f"{name}.dialog_open", root, add)
+            root.update()
+
+        with recorder.measure("tasks.filter_overdue"):
+            window.task_view.filter_overdue()
+            wait_search(window.task_view)
+        with recorder.measure("refresh_all"):
+            window.refresh_all()
+
+
+def measure_window(db_path, args):
+    """Запуск окна и прогон сценария; возвращает замеры и статистику запросов"""
+    from views.main_window import MainWindow
+
+    with fail_on_message_boxes():
+        started = time.perf_counter()
+        window = MainWindow(db_path)
+        # Данные открытой вкладки загружаются после первой отрисовки окна
+        while not window.loaded:
+            window.root.update()
+        startup_ms = (time.perf_counter() - started) * 1000
+
+        recorder = Recorder(window.root)
+        recorder.add("startup", startup_ms)
+        if args.profile_queries:
+            window.db_manager.enable_instrumentation()
+        try:
+            run_scenario(window, recorder, args.rounds)
+            queries = window.db_manager.get_query_stats()
+        finally:
+            window.close()
+    return recorder, queries
+
+
+def print_report(results, queries):
+    for name, result in results.items():
+        print(f"{name:<24} p50 {result['median_ms']:>9.2f} мс  p95 {result['p95_ms']:>9.2f} мс  "
+              f"p99 {result['p99_ms']:>9.2f} мс  n={result['repeat']}")
+
+    if queries:
+        print(f"\n{'запросов':>9} {'всего, мс':>10}  запрос / вызывающий код")
+        for item in queries[:QUERY_REPORT_SIZE]:
+            callers = ", ".join(f"{name} x{count}" for name, count in item['callers'].items())
+            print(f"{item['count']:>9} {item['total_ms']:>10.1f}  {item['fingerprint'][:80]}")
+            print(f"{'':>21}{callers}")
+
+
+def run(args):
+    with virtual_display(args.xvfb) as display, tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = args.db or os.path.join(tmp_dir, "ui_bench.db")
+        if not os.path.exists(db_path) or os.path.getsize(db_path) == 0:
+            print(f"Генерация данных масштаба {args.scale}...")
+            generate_scale(db_path, args.scale, args.seed)
+        recorder, queries = measure_window(db_path, args)
+
+    results = {name: summarize(samples) for name, samples in recorder.samples.items()}
+    print_report(results, queries)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "scale": args.scale,
+            "rounds": args.rounds,
+            "display": display,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+        "queries": queries,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", default="1k",
+                        help=f"масштаб ({', '.join(SCALES)}) или число задач")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS,
+                        help="количество повторов сценария")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="путь к базе; существующая база используется повторно")
+    parser.add_argument("--xvfb", action="store_true",
+                        help="запускать Xvfb даже при заданной переменной DISPLAY")
+    parser.add_argument("--profile-queries", action="store_true",
+                        help="собрать статистику SQL-запросов по вызывающему коду")
+    parser.add_argument("--output", help="файл результатов JSON "
+                                         "(по умолчанию benchmarks/results/ui-<scale>.json)")
+    parser.add_argument("--baseline", help="файл базового прогона для поиска регрессий")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="допустимый относительный рост медианы")
+    args = parser.parse_args()
+
+    try:
+        report = run(args)
+    except RuntimeError as e:
+        print(f"Ошибка: {e}")
+        sys.exit(2)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"ui-{args.scale}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты сохранены в {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк конкурентной записи
+Несколько потоков-производителей обновляют задачи: каждый через свой
+DatabaseManager с фиксацией на каждую запись или через общую очередь
+WriteQueue с групповой фиксацией. Замеряется пропускная способность
+зафиксированных записей, задержка записи и число ошибок блокировки
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.datagen import generate_scale
+from benchmarks.suite import DEFAULT_THRESHOLD, RESULTS_DIR, compare, summarize
+from database.database_manager import DatabaseManager
+from database.write_queue import WRITE_BATCH_DELAY, WRITE_BATCH_SIZE, WriteQueue
+
+
+def direct_producer(db_path, task_count, writes, seed, report):
+    """Производитель со своим соединением: каждая запись фиксируется отдельно"""
+    rng = random.Random(seed)
+    db = DatabaseManager(db_path)
+    try:
+        for _ in range(writes):
+            started = time.perf_counter()
+            try:
+                db.update_task(rng.randint(1, task_count), priority=rng.randint(1, 3))
+            except Exception:
+                report["errors"] += 1
+                continue
+            report["latencies"].append((time.perf_counter() - started) * 1000)
+    finally:
+        db.close()
+
+
+def queue_producer(queue, task_count, writes, seed, report):
+    """Производитель общей очереди; запись считается выполненной после фиксации группы"""
+    rng = random.Random(seed)
+    for _ in range(writes):
+        started = time.perf_counter()
+        try:
+            queue.update_task(rng.randint(1, task_count), priority=rng.randint(1, 3)).result()
+        except Exception:
+            report["errors"] += 1
+            continue
+        report["latencies"].append((time.perf_counter() - started) * 1000)
+
+
+def run_producers(target, make_args, producers):
+    reports = [{"latencies": [], "errors": 0} for _ in range(producers)]
+    threads = [threading.Thread(target=target, args=make_args(i) + (reports[i],))
+               for i in range(producers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    latencies = [value for report in reports for value in report["latencies"]]
+    errors = sum(report["errors"] for report in reports)
+    result = summarize(latencies or [0.0])
+    result.update({
+        "writes": len(latencies),
+        "errors": errors,
+        "writes_per_sec": round(len(latencies) / elapsed, 2) if elapsed else None,
+    })
+    return result
+
+
+def run(args):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "write_bench.db")
+        print(f"Генерация данных масштаба {args.scale}...")
+        counts, _ = generate_scale(db_path, args.scale, args.seed)
+        task_count = counts["tasks"]
+        connection = sqlite3.connect(db_path)
+        try:
+            connection.execute(f"PRAGMA journal_mode = {args.journal_mode}")
+        finally:
+            connection.close()
+
+        for producers in args.producers:
+            name = f"direct.{producers}"
+            results[name] = run_producers(
+                direct_producer,
+                lambda i: (db_path, task_count, args.writes, args.seed + i), producers)
+
+            with WriteQueue(db_path, batch_size=args.batch_size,
+                            max_delay=args.max_delay) as queue:
+                results[f"queue.{producers}"] = run_producers(
+                    queue_producer,
+                    lambda i: (queue, task_count, args.writes, args.seed + i), producers)
+                batch = queue.stats()["avg_batch"]
+            results[f"queue.{producers}"]["avg_batch"] = batch
+
+            for key in (name, f"queue.{producers}"):
+                result = results[key]
+                group = f"  группа {result['avg_batch']}" if "avg_batch" in result else ""
+                print(f"{key:<12} записей/с {result['writes_per_sec']:>10.1f}  "
+                      f"p50 {result['median_ms']:>8.3f} мс  max {result['max_ms']:>9.3f} мс  "
+                      f"ошибок {result['errors']:>4}{group}")
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "scale": args.scale,
+            "writes_per_producer": args.writes,
+            "journal_mode": args.journal_mode,
+            "batch_size": args.batch_size,
+            "max_delay": args.max_delay,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", default="1k", help="масштаб базы или число задач")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--producers", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                        help="количество потоков-производителей")
+    parser.add_argument("--writes", type=int, default=200,
+                        help="количество записей на одного производителя")
+    parser.add_argument("--journal-mode", default="delete", choices=["delete", "wal"])
+    parser.add_argument("--batch-size", type=int, default=WRITE_BATCH_SIZE)
+    parser.add_argument("--max-delay", type=float, default=WRITE_BATCH_DELAY,
+                        help="сколько секунд группа ждёт новых команд")
+    parser.add_argument("--output", help="файл результатов JSON "
+                                         "(по умолчанию benchmarks/results/writes-<scale>.json)")
+    parser.add_argument("--baseline", help="файл базового прогона для поиска регрессий")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="допустимый относительный рост медианы")
+    args = parser.parse_args()
+
+    report = run(args)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"writes-{args.scale}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты сохранены в {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,28 @@
-from .task_controller import TaskController
-from .project_controller import ProjectController
-from .user_controller import UserController
+import importlib
+
+# Контроллеры импортируются при первом обращении: синхронному приложению
+# не нужны asyncio и асинхронный фасад базы данных
+_MODULES = {
+    'TaskController': 'controllers.task_controller',
+    'ProjectController': 'controllers.project_controller',
+    'UserController': 'controllers.user_controller',
+    'AsyncTaskController': 'controllers.async_controllers',
+    'AsyncProjectController': 'controllers.async_controllers',
+    'AsyncUserController': 'controllers.async_controllers',
+}
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_MODULES[name]), name)
+
 
 __all__ = [
     'TaskController',
     'ProjectController',
-    'UserController'
-]
\ No newline at end of file
+    'UserController',
+    'AsyncTaskController',
+    'AsyncProjectController',
+    'AsyncUserController'
+]
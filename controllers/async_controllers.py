@@ -0,0 +1,138 @@
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Iterable
+from models.task import Task
+from models.project import Project
+from models.user import User
+from database.async_database_manager import AsyncDatabaseManager
+from database.cancellation import CancellationToken
+from database.task_query import TaskQuery
+from controllers.task_controller import TaskController
+from controllers.project_controller import ProjectController
+from controllers.user_controller import UserController
+
+
+class AsyncTaskController:
+    def __init__(self, db_manager: AsyncDatabaseManager):
+        self.db_manager = db_manager
+        self._controller = TaskController(db_manager.db_manager)
+
+    async def add_task(self, title: str, description: str, priority: int,
+                       due_date: datetime, project_id: int, assignee_id: int) -> Task:
+        return await self.db_manager.run(self._controller.add_task, title, description,
+                                         priority, due_date, project_id, assignee_id)
+
+    async def get_task(self, task_id: int) -> Optional[Task]:
+        return await self.db_manager.run(self._controller.get_task, task_id)
+
+    async def get_tasks_by_ids(self, task_ids: Iterable[int]) -> Dict[int, Task]:
+        return await self.db_manager.run(self._controller.get_tasks_by_ids, list(task_ids))
+
+    async def get_all_tasks(self, columns: Optional[Iterable[str]] = None) -> List[Task]:
+        return await self.db_manager.run(self._controller.get_all_tasks, columns)
+
+    async def update_task(self, task_id: int, **kwargs) -> bool:
+        return await self.db_manager.run(self._controller.update_task, task_id, **kwargs)
+
+    async def delete_task(self, task_id: int) -> bool:
+        return await self.db_manager.run(self._controller.delete_task, task_id)
+
+    async def search_tasks(self, query: str,
+                           token: Optional[CancellationToken] = None) -> List[Task]:
+        return await self.db_manager.run_cancellable(token, self._controller.search_tasks, query)
+
+    async def update_task_status(self, task_id: int, new_status: str) -> bool:
+        return await self.db_manager.run(self._controller.update_task_status, task_id, new_status)
+
+    async def get_overdue_tasks(self) -> List[Task]:
+        return await self.db_manager.run(self._controller.get_overdue_tasks)
+
+    async def query_tasks(self, query: TaskQuery,
+                          token: Optional[CancellationToken] = None) -> List[Task]:
+        return await self.db_manager.run_cancellable(token, self._controller.query_tasks, query)
+
+    async def get_tasks_by_project(self, project_id: int) -> List[Task]:
+        return await self.db_manager.run(self._controller.get_tasks_by_project, project_id)
+
+    async def get_tasks_by_user(self, user_id: int) -> List[Task]:
+        return await self.db_manager.run(self._controller.get_tasks_by_user, user_id)
+
+
+class AsyncProjectController:
+    def __init__(self, db_manager: AsyncDatabaseManager):
+        self.db_manager = db_manager
+        self._controller = ProjectController(db_manager.db_manager)
+
+    async def add_project(self, name: str, description: str,
+                          start_date: datetime, end_date: datetime) -> Project:
+        return await self.db_manager.run(self._controller.add_project, name, description,
+                                         start_date, end_date)
+
+    async def get_project(self, project_id: int) -> Optional[Project]:
+        return await self.db_manager.run(self._controller.get_project, project_id)
+
+    async def get_projects_by_ids(self, project_ids: Iterable[int]) -> Dict[int, Project]:
+        return await self.db_manager.run(self._controller.get_projects_by_ids, list(project_ids))
+
+    async def get_all_projects(self, columns: Optional[Iterable[str]] = None) -> List[Project]:
+        return await self.db_manager.run(self._controller.get_all_projects, columns)
+
+    async def update_project(self, project_id: int, **kwargs) -> bool:
+        return await self.db_manager.run(self._controller.update_project, project_id, **kwargs)
+
+    async def delete_project(self, project_id: int) -> bool:
+        return await self.db_manager.run(self._controller.delete_project, project_id)
+
+    async def delete_projects(self, project_ids: List[int], progress_callback=None) -> int:
+        return await self.db_manager.run(self._controller.delete_projects, list(project_ids),
+                                         progress_callback)
+
+    async def purge_completed_projects(self, older_than: datetime, progress_callback=None) -> int:
+        return await self.db_manager.run(self._controller.purge_completed_projects, older_than,
+                                         progress_callback)
+
+    async def update_project_status(self, project_id: int, new_status: str) -> bool:
+        return await self.db_manager.run(self._controller.update_project_status,
+                                         project_id, new_status)
+
+    async def get_project_progress(self, project_id: int) -> float:
+        return await self.db_manager.run(self._controller.get_project_progress, project_id)
+
+    async def get_all_project_progress(self) -> Dict[int, float]:
+        return await self.db_manager.run(self._controller.get_all_project_progress)
+
+
+class AsyncUserController:
+    def __init__(self, db_manager: AsyncDatabaseManager):
+        self.db_manager = db_manager
+        self._controller = UserController(db_manager.db_manager)
+
+    async def add_user(self, username: str, email: str, role: str) -> User:
+        return await self.db_manager.run(self._controller.add_user, username, email, role)
+
+    async def get_user(self, user_id: int) -> Optional[User]:
+        return await self.db_manager.run(self._controller.get_user, user_id)
+
+    async def get_users_by_ids(self, user_ids: Iterable[int]) -> Dict[int, User]:
+        return await self.db_manager.run(self._controller.get_users_by_ids, list(user_ids))
+
+    async def get_all_users(self, columns: Optional[Iterable[str]] = None) -> List[User]:
+        return await self.db_manager.run(self._controller.get_all_users, columns)
+
+    async def update_user(self, user_id: int, **kwargs) -> bool:
+        return await self.db_manager.run(self._controller.update_user, user_id, **kwargs)
+
+    async def delete_user(self, user_id: int) -> bool:
+        return await self.db_manager.run(self._controller.delete_user, user_id)
+
+    async def delete_users(self, user_ids: List[int], progress_callback=None) -> int:
+        return await self.db_manager.run(self._controller.delete_users, list(user_ids),
+                                         progress_callback)
+
+    async def get_user_tasks(self, user_id: int) -> List[Dict[str, Any]]:
+        return await self.db_manager.run(self._controller.get_user_tasks, user_id)
+
+    async def get_user_workload(self, user_id: int) -> Dict[str, Any]:
+        return await self.db_manager.run(self._controller.get_user_workload, user_id)
+
+    async def get_all_user_workload(self) -> Dict[int, Dict[str, Any]]:
+        return await self.db_manager.run(self._controller.get_all_user_workload)
@@ -1,8 +1,10 @@
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable
 from models.project import Project
 from database.database_manager import DatabaseManager
+from metrics import profiled
 
+@profiled
 class ProjectController:
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
@@ -33,8 +35,11 @@ class ProjectController:
     def get_project(self, project_id: int) -> Optional[Project]:
         return self.db_manager.get_project_by_id(project_id)
 
-    def get_all_projects(self) -> List[Project]:
-        return self.db_manager.get_all_projects()
+    def get_projects_by_ids(self, project_ids: Iterable[int]) -> Dict[int, Project]:
+        return self.db_manager.get_projects_by_ids(project_ids)
+
+    def get_all_projects(self, columns: Optional[Iterable[str]] = None) -> List[Project]:
+        return self.db_manager.get_all_projects(columns)
 
     def update_project(self, project_id: int, **kwargs) -> bool:
         if not kwargs:
@@ -65,6 +70,13 @@ class ProjectController:
     def delete_project(self, project_id: int) -> bool:
         return self.db_manager.delete_project(project_id)
 
+    def delete_projects(self, project_ids: List[int], progress_callback=None) -> int:
+        return self.db_manager.delete_projects(project_ids, progress_callback=progress_callback)
+
+    def purge_completed_projects(self, older_than: datetime, progress_callback=None) -> int:
+        return self.db_manager.purge_completed_projects(older_than,
+                                                        progress_callback=progress_callback)
+
     def update_project_status(self, project_id: int, new_status: str) -> bool:
         valid_statuses = ['active', 'completed', 'on_hold']
         if new_status not in valid_statuses:
@@ -77,4 +89,15 @@ class ProjectController:
         if not project:
             raise ValueError(f"Проект с ID {project_id} не найден")
         
-        return project.get_progress()
\ No newline at end of file
+        stats = self.db_manager.get_project_stats(project_id)
+        return project.get_progress(stats['total'], stats['completed'])
+
+    def get_all_project_progress(self) -> Dict[int, float]:
+        # Одно чтение таблицы счётчиков вместо просмотра задач каждого проекта
+        stats = self.db_manager.get_all_project_stats()
+        progress = {}
+        for project in self.db_manager.get_all_projects(columns=['status']):
+            counts = stats.get(project.id)
+            progress[project.id] = (project.get_progress(counts['total'], counts['completed'])
+                                    if counts else project.get_progress())
+        return progress
\ No newline at end of file
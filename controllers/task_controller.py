@@ -1,8 +1,12 @@
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable
 from models.task import Task
+from database.cancellation import CancellationToken
 from database.database_manager import DatabaseManager
+from database.task_query import TaskQuery
+from metrics import profiled
 
+@profiled
 class TaskController:
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
@@ -40,8 +44,11 @@ class TaskController:
     def get_task(self, task_id: int) -> Optional[Task]:
         return self.db_manager.get_task_by_id(task_id)
 
-    def get_all_tasks(self) -> List[Task]:
-        return self.db_manager.get_all_tasks()
+    def get_tasks_by_ids(self, task_ids: Iterable[int]) -> Dict[int, Task]:
+        return self.db_manager.get_tasks_by_ids(task_ids)
+
+    def get_all_tasks(self, columns: Optional[Iterable[str]] = None) -> List[Task]:
+        return self.db_manager.get_all_tasks(columns)
 
     def update_task(self, task_id: int, **kwargs) -> bool:
         if not kwargs:
@@ -82,11 +89,12 @@ class TaskController:
     def delete_task(self, task_id: int) -> bool:
         return self.db_manager.delete_task(task_id)
 
-    def search_tasks(self, query: str) -> List[Task]:
+    def search_tasks(self, query: str,
+                     token: Optional[CancellationToken] = None) -> List[Task]:
         if not query or not query.strip():
             return []
         
-        return self.db_manager.search_tasks(query)
+        return self.db_manager.search_tasks(query, token)
 
     def update_task_status(self, task_id: int, new_status: str) -> bool:
         valid_statuses = ['pending', 'in_progress', 'completed']
@@ -96,17 +104,11 @@ class TaskController:
         return self.db_manager.update_task(task_id, status=new_status)
 
     def get_overdue_tasks(self) -> List[Task]:
+        return self.db_manager.get_overdue_tasks()
 
-        all_tasks = self.get_all_tasks()
-        overdue_tasks = []
-        
-        current_time = datetime.now()
-        
-        for task in all_tasks:
-            if task.status != 'completed' and task.due_date < current_time:
-                overdue_tasks.append(task)
-                
-        return overdue_tasks
+    def query_tasks(self, query: TaskQuery,
+                    token: Optional[CancellationToken] = None) -> List[Task]:
+        return self.db_manager.query_tasks(query, token)
 
     def get_tasks_by_project(self, project_id: int) -> List[Task]:
         project = self.db_manager.get_project_by_id(project_id)
@@ -1,8 +1,11 @@
+from collections import defaultdict
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable
 from models.user import User
-from database.database_manager import DatabaseManager
+from database.database_manager import DatabaseManager, EMPTY_WORKLOAD
+from metrics import profiled
 
+@profiled
 class UserController:
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
@@ -41,8 +44,11 @@ class UserController:
     def get_user(self, user_id: int) -> Optional[User]:
         return self.db_manager.get_user_by_id(user_id)
 
-    def get_all_users(self) -> List[User]:
-        return self.db_manager.get_all_users()
+    def get_users_by_ids(self, user_ids: Iterable[int]) -> Dict[int, User]:
+        return self.db_manager.get_users_by_ids(user_ids)
+
+    def get_all_users(self, columns: Optional[Iterable[str]] = None) -> List[User]:
+        return self.db_manager.get_all_users(columns)
 
     def update_user(self, user_id: int, **kwargs) -> bool:
 
@@ -81,6 +87,9 @@ class UserController:
     def delete_user(self, user_id: int) -> bool:
         return self.db_manager.delete_user(user_id)
 
+    def delete_users(self, user_ids: List[int], progress_callback=None) -> int:
+        return self.db_manager.delete_users(user_ids, progress_callback=progress_callback)
+
     def get_user_tasks(self, user_id: int) -> List[Dict[str, Any]]:
         user = self.get_user(user_id)
         if not user:
@@ -92,7 +101,8 @@ class UserController:
         
         result = []
         for task in tasks:
-            project = self.db_manager.get_project_by_id(task.project_id)
+            # Проекты всех задач выборки загружаются одним запросом при первом обращении
+            project = task.project
             project_name = project.name if project else "Неизвестный проект"
             
             task_info = task.to_dict()
@@ -101,4 +111,17 @@ class UserController:
             
             result.append(task_info)
         
-        return result
\ No newline at end of file
+        return result
+
+    def get_user_workload(self, user_id: int) -> Dict[str, Any]:
+        user = self.get_user(user_id)
+        if not user:
+            raise ValueError(f"Пользователь с ID {user_id} не найден")
+        
+        return self.db_manager.get_user_workload(user_id)
+
+    def get_all_user_workload(self) -> Dict[int, Dict[str, Any]]:
+        # У пользователей без открытых задач нулевая нагрузка
+        workload = defaultdict(lambda: dict(EMPTY_WORKLOAD))
+        workload.update(self.db_manager.get_all_user_workload())
+        return workload
\ No newline at end of file
@@ -1,5 +1,28 @@
-from .database_manager import DatabaseManager
+import importlib
+
+# Асинхронный фасад и очередь записи тянут asyncio и concurrent.futures,
+# поэтому имена пакета импортируются при первом обращении
+_MODULES = {
+    'DatabaseManager': 'database.database_manager',
+    'AsyncDatabaseManager': 'database.async_database_manager',
+    'TaskQuery': 'database.task_query',
+    'CancellationToken': 'database.cancellation',
+    'QueryCancelled': 'database.cancellation',
+    'WriteQueue': 'database.write_queue',
+}
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_MODULES[name]), name)
+
 
 __all__ = [
-    'DatabaseManager'
-]
\ No newline at end of file
+    'DatabaseManager',
+    'AsyncDatabaseManager',
+    'TaskQuery',
+    'CancellationToken',
+    'QueryCancelled',
+    'WriteQueue'
+]
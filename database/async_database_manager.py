@@ -0,0 +1,324 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Optional, List, Dict, Any, Iterable, Callable, AsyncIterator
+from models.task import Task
+from models.project import Project
+from models.user import User
+from models.deferred import Deferred
+from database.cancellation import CancellationToken
+from database.task_query import TaskQuery
+from database.database_manager import (
+    DatabaseManager, DELETE_CHUNK_SIZE, STREAM_BATCH_SIZE, IDENTITY_CACHE_SIZE, QUERY_CACHE_SIZE
+)
+
+
+class AsyncDatabaseManager:
+    # Соединение sqlite3 привязано к потоку, в котором создано, поэтому все
+    # обращения к DatabaseManager выполняются в одном выделенном потоке,
+    # а корутины только ожидают результат, не блокируя цикл событий.
+    def __init__(self, db_path: str = "tasks.db", cache_size: int = IDENTITY_CACHE_SIZE,
+                 query_cache_size: int = QUERY_CACHE_SIZE,
+                 compact_enums: Optional[bool] = None,
+                 epoch_dates: Optional[bool] = None) -> None:
+        self.db_path = db_path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._thread: Optional[threading.Thread] = None
+        # Конструктор не ждёт открытия соединения, чтобы не останавливать
+        # цикл событий; команды встают в очередь потока после открытия
+        self._opening = self._executor.submit(self._open, db_path, cache_size,
+                                              query_cache_size, compact_enums, epoch_dates)
+
+    @classmethod
+    async def open(cls, db_path: str = "tasks.db", **kwargs) -> "AsyncDatabaseManager":
+        manager = cls(db_path, **kwargs)
+        await asyncio.wrap_future(manager._opening)
+        return manager
+
+    def _open(self, *args) -> DatabaseManager:
+        self._thread = threading.current_thread()
+        return DatabaseManager(*args)
+
+    @property
+    def db_manager(self) -> DatabaseManager:
+        # До await open() или входа в async with синхронное обращение
+        # ждёт открытия соединения
+        return self._opening.result()
+
+    async def __aenter__(self) -> "AsyncDatabaseManager":
+        await asyncio.wrap_future(self._opening)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def run(self, func: Callable, *args, **kwargs):
+        if self._executor is None:
+            raise Exception("Соединение с базой данных закрыто")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._call_detached, functools.partial(func, *args, **kwargs))
+
+    def _call_detached(self, call: Callable):
+        # Записи с отложенными столбцами и связями отдаются копиями, чьи
+        # загрузчики выполняются в потоке базы данных: в потоке вызывающего
+        # кода соединение sqlite3 использовать нельзя
+        result = call()
+        relations: Dict[int, Dict[str, _ExecutorLoader]] = {}
+        if isinstance(result, list):
+            return [self._detach(item, relations) for item in result]
+        if isinstance(result, dict):
+            # Словарь обновляется на месте, чтобы сохранить его тип
+            for key, item in result.items():
+                result[key] = self._detach(item, relations)
+            return result
+        return self._detach(result, relations)
+
+    def _detach(self, entity, relations):
+        if not isinstance(entity, Deferred):
+            return entity
+        values = dict(entity.__dict__)
+        loader = values.get('_deferred_loader')
+        if loader is not None:
+            values['_deferred_loader'] = functools.partial(self._call_sync, loader)
+        loaders = values.get('_relations')
+        if loaders is not None:
+            # Копии задач одной выборки разделяют загрузчики, как и оригиналы
+            if id(loaders) not in relations:
+                relations[id(loaders)] = {name: _ExecutorLoader(self, relation)
+                                          for name, relation in loaders.items()}
+            values['_relations'] = relations[id(loaders)]
+        if loader is None and loaders is None:
+            return entity
+        return type(entity).from_row(values)
+
+    def _call_sync(self, func: Callable, *args):
+        if threading.current_thread() is self._thread:
+            return func(*args)
+        if self._executor is None:
+            raise Exception("Соединение с базой данных закрыто")
+        return self._executor.submit(func, *args).result()
+
+    async def run_cancellable(self, token: Optional[CancellationToken], func: Callable,
+                              *args, **kwargs):
+        # Отмена корутины прерывает и запрос в потоке базы данных, иначе он
+        # занимал бы единственный поток до своего завершения
+        token = token or CancellationToken()
+        try:
+            return await self.run(self._call_cancellable, token, func, *args, **kwargs)
+        except asyncio.CancelledError:
+            token.cancel()
+            raise
+
+    def _call_cancellable(self, token, func, *args, **kwargs):
+        with self.db_manager.cancellable(token):
+            return func(*args, **kwargs)
+
+    async def close(self) -> None:
+        if self._executor is None:
+            return
+        await self.run(self.db_manager.close)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    async def create_tables(self) -> None:
+        await self.run(self.db_manager.create_tables)
+
+    async def migrate(self, target: Optional[int] = None, dry_run: bool = False,
+                      progress_callback=None) -> List[Dict]:
+        return await self.run(self.db_manager.migrate, target, dry_run, progress_callback)
+
+    async def schema_version(self) -> int:
+        return await self.run(self.db_manager.schema_version)
+
+    async def convert_storage(self, compact_enums: Optional[bool] = None,
+                              epoch_dates: Optional[bool] = None,
+                              dry_run: bool = False) -> List[str]:
+        return await self.run(self.db_manager.convert_storage, compact_enums,
+                              epoch_dates, dry_run)
+
+    async def clear_cache(self) -> None:
+        await self.run(self.db_manager.clear_cache)
+
+    async def get_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        return await self.run(self.db_manager.get_cache_stats)
+
+    async def enable_instrumentation(self, slow_query_ms: Optional[float] = None,
+                                     trace: bool = False, slow_query_callback=None):
+        return await self.run(self.db_manager.enable_instrumentation, slow_query_ms, trace,
+                              slow_query_callback)
+
+    async def disable_instrumentation(self) -> None:
+        await self.run(self.db_manager.disable_instrumentation)
+
+    async def get_query_stats(self) -> List[Dict[str, Any]]:
+        return await self.run(self.db_manager.get_query_stats)
+
+    async def get_slow_queries(self) -> List[Dict[str, Any]]:
+        return await self.run(self.db_manager.get_slow_queries)
+
+    async def get_traced_statements(self) -> List[str]:
+        return await self.run(self.db_manager.get_traced_statements)
+
+    async def reset_query_stats(self) -> None:
+        await self.run(self.db_manager.reset_query_stats)
+
+    async def add_task(self, task: Task) -> int:
+        return await self.run(self.db_manager.add_task, task)
+
+    async def get_task_by_id(self, task_id: int) -> Optional[Task]:
+        return await self.run(self.db_manager.get_task_by_id, task_id)
+
+    async def get_tasks_by_ids(self, task_ids: Iterable[int]) -> Dict[int, Task]:
+        return await self.run(self.db_manager.get_tasks_by_ids, list(task_ids))
+
+    async def get_all_tasks(self, columns: Optional[Iterable[str]] = None) -> List[Task]:
+        return await self.run(self.db_manager.get_all_tasks, columns)
+
+    async def update_task(self, task_id: int, **kwargs) -> bool:
+        return await self.run(self.db_manager.update_task, task_id, **kwargs)
+
+    async def delete_task(self, task_id: int) -> bool:
+        return await self.run(self.db_manager.delete_task, task_id)
+
+    async def search_tasks(self, query_str: str,
+                           token: Optional[CancellationToken] = None) -> List[Task]:
+        return await self.run_cancellable(token, self.db_manager.search_tasks, query_str)
+
+    async def get_tasks_by_project(self, project_id: int) -> List[Task]:
+        return await self.run(self.db_manager.get_tasks_by_project, project_id)
+
+    async def get_tasks_by_user(self, user_id: int) -> List[Task]:
+        return await self.run(self.db_manager.get_tasks_by_user, user_id)
+
+    async def get_overdue_tasks(self) -> List[Task]:
+        return await self.run(self.db_manager.get_overdue_tasks)
+
+    async def query_tasks(self, query: TaskQuery,
+                          token: Optional[CancellationToken] = None) -> List[Task]:
+        return await self.run_cancellable(token, self.db_manager.query_tasks, query)
+
+    async def get_counts(self) -> Dict[str, int]:
+        return await self.run(self.db_manager.get_counts)
+
+    async def add_project(self, project: Project) -> int:
+        return await self.run(self.db_manager.add_project, project)
+
+    async def get_project_by_id(self, project_id: int) -> Optional[Project]:
+        return await self.run(self.db_manager.get_project_by_id, project_id)
+
+    async def get_projects_by_ids(self, project_ids: Iterable[int]) -> Dict[int, Project]:
+        return await self.run(self.db_manager.get_projects_by_ids, list(project_ids))
+
+    async def get_all_projects(self, columns: Optional[Iterable[str]] = None) -> List[Project]:
+        return await self.run(self.db_manager.get_all_projects, columns)
+
+    async def get_project_stats(self, project_id: int) -> Dict[str, int]:
+        return await self.run(self.db_manager.get_project_stats, project_id)
+
+    async def get_all_project_stats(self) -> Dict[int, Dict[str, int]]:
+        return await self.run(self.db_manager.get_all_project_stats)
+
+    async def update_project(self, project_id: int, **kwargs) -> bool:
+        return await self.run(self.db_manager.update_project, project_id, **kwargs)
+
+    async def delete_project(self, project_id: int) -> bool:
+        return await self.run(self.db_manager.delete_project, project_id)
+
+    async def delete_projects(self, project_ids: Iterable[int],
+                              chunk_size: int = DELETE_CHUNK_SIZE,
+                              progress_callback=None) -> int:
+        return await self.run(self.db_manager.delete_projects, list(project_ids),
+                              chunk_size, progress_callback)
+
+    async def purge_completed_projects(self, older_than: datetime,
+                                       chunk_size: int = DELETE_CHUNK_SIZE,
+                                       progress_callback=None) -> int:
+        return await self.run(self.db_manager.purge_completed_projects, older_than,
+                              chunk_size, progress_callback)
+
+    async def add_user(self, user: User) -> int:
+        return await self.run(self.db_manager.add_user, user)
+
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+        return await self.run(self.db_manager.get_user_by_id, user_id)
+
+    async def get_users_by_ids(self, user_ids: Iterable[int]) -> Dict[int, User]:
+        return await self.run(self.db_manager.get_users_by_ids, list(user_ids))
+
+    async def get_all_users(self, columns: Optional[Iterable[str]] = None) -> List[User]:
+        return await self.run(self.db_manager.get_all_users, columns)
+
+    async def get_user_workload(self, user_id: int) -> Dict[str, Any]:
+        return await self.run(self.db_manager.get_user_workload, user_id)
+
+    async def get_all_user_workload(self) -> Dict[int, Dict[str, Any]]:
+        return await self.run(self.db_manager.get_all_user_workload)
+
+    async def update_user(self, user_id: int, **kwargs) -> bool:
+        return await self.run(self.db_manager.update_user, user_id, **kwargs)
+
+    async def delete_user(self, user_id: int) -> bool:
+        return await self.run(self.db_manager.delete_user, user_id)
+
+    async def delete_users(self, user_ids: Iterable[int],
+                           chunk_size: int = DELETE_CHUNK_SIZE,
+                           progress_callback=None) -> int:
+        return await self.run(self.db_manager.delete_users, list(user_ids),
+                              chunk_size, progress_callback)
+
+    async def fetch_one(self, query, params=()):
+        return await self.run(self.db_manager.fetch_one, query, params)
+
+    async def fetch_all(self, query, params=()):
+        return await self.run(self.db_manager.fetch_all, query, params)
+
+    async def changes_since(self, seq: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        return await self.run(self.db_manager.changes_since, seq, limit)
+
+    async def latest_change_seq(self) -> int:
+        return await self.run(self.db_manager.latest_change_seq)
+
+    async def compact_changes(self, acknowledged_seq: Optional[int] = None) -> int:
+        return await self.run(self.db_manager.compact_changes, acknowledged_seq)
+
+    def iter_tasks(self, batch_size: int = STREAM_BATCH_SIZE,
+                   columns: Optional[Iterable[str]] = None) -> AsyncIterator[Task]:
+        return self._stream(functools.partial(self.db_manager.iter_tasks, columns=columns),
+                            batch_size)
+
+    def iter_projects(self, batch_size: int = STREAM_BATCH_SIZE,
+                      columns: Optional[Iterable[str]] = None) -> AsyncIterator[Project]:
+        return self._stream(functools.partial(self.db_manager.iter_projects, columns=columns),
+                            batch_size)
+
+    def iter_users(self, batch_size: int = STREAM_BATCH_SIZE,
+                   columns: Optional[Iterable[str]] = None) -> AsyncIterator[User]:
+        return self._stream(functools.partial(self.db_manager.iter_users, columns=columns),
+                            batch_size)
+
+    async def _stream(self, iterator_factory, batch_size):
+        iterator = await self.run(iterator_factory, batch_size)
+        try:
+            while True:
+                batch = await self.run(lambda: list(islice(iterator, batch_size)))
+                if not batch:
+                    break
+                for item in batch:
+                    yield item
+        finally:
+            if self._executor is not None:
+                await self.run(iterator.close)
+
+
+class _ExecutorLoader:
+    # Загрузчик связи, который обращается к базе через поток AsyncDatabaseManager
+    def __init__(self, manager: AsyncDatabaseManager, loader) -> None:
+        self._manager = manager
+        self._loader = loader
+
+    def load(self, key: Optional[int]):
+        return self._manager._call_sync(self._loader.load, key)
@@ -0,0 +1,66 @@
+import sqlite3
+import threading
+import time
+from typing import Optional, Set
+
+CANCELLED_REASON = "Запрос отменён"
+TIMEOUT_REASON = "Превышено время выполнения запроса"
+
+
+class QueryCancelled(Exception):
+    pass
+
+
+def is_interrupt(error: Optional[BaseException]) -> bool:
+    # Методы DatabaseManager оборачивают ошибки sqlite3, поэтому прерывание
+    # ищется и в цепочке исходных исключений
+    while error is not None:
+        if isinstance(error, sqlite3.OperationalError) and str(error) == "interrupted":
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class CancellationToken:
+    # Токен отмены запроса с необязательным бюджетом времени. cancel() можно
+    # вызвать из любого потока: выполняющиеся под токеном запросы прерываются
+    # через Connection.interrupt(), а истечение срока замечает обработчик
+    # прогресса SQLite, который вызывается каждые несколько сотен инструкций
+    def __init__(self, timeout: Optional[float] = None) -> None:
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self._reason: Optional[str] = None
+        self._connections: Set[sqlite3.Connection] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def reason(self) -> Optional[str]:
+        return self._reason
+
+    @property
+    def cancelled(self) -> bool:
+        if self._reason is None and self.deadline is not None \
+                and time.monotonic() >= self.deadline:
+            self._reason = TIMEOUT_REASON
+        return self._reason is not None
+
+    def cancel(self, reason: str = CANCELLED_REASON) -> None:
+        with self._lock:
+            if self._reason is None:
+                self._reason = reason
+            for connection in self._connections:
+                connection.interrupt()
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise QueryCancelled(self._reason)
+
+    def attach(self, connection: sqlite3.Connection) -> None:
+        with self._lock:
+            self._connections.add(connection)
+            # Отмена могла прийти до подключения, тогда запрос не начнётся
+            if self._reason is not None:
+                connection.interrupt()
+
+    def detach(self, connection: sqlite3.Connection) -> None:
+        with self._lock:
+            self._connections.discard(connection)
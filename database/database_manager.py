@@ -1,22 +1,77 @@
+import functools
+import json
 import sqlite3
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Callable
 from models.task import Task
 from models.project import Project
 from models.user import User
+from database.cancellation import CancellationToken, QueryCancelled, is_interrupt
+from database.identity_map import IdentityMap
+from database.instrumentation import InstrumentedConnection, QueryInstrumentation
+from database.query_cache import QueryCache
+from database.relation_loader import RelationLoader
+from database.migrations import MigrationRunner
+from database.projection import (
+    PREVIEW_COLUMN, deferred_columns, normalize, select_list
+)
+from database.storage import DATE_COLUMNS, TASK_STATUSES, StorageCodec
+from database.task_query import TaskQuery
+
+
+DELETE_CHUNK_SIZE = 500
+# Пакет IN (...) заведомо меньше лимита переменных SQLite (999 в старых сборках)
+ID_CHUNK_SIZE = 500
+# Больший набор ID передаётся одним параметром через json_each
+JSON_IDS_THRESHOLD = 5000
+STREAM_BATCH_SIZE = 500
+IDENTITY_CACHE_SIZE = 1024
+QUERY_CACHE_SIZE = 64
+# Как часто (в секундах) поиск по ID проверяет изменения базы другими
+# соединениями; иначе каждое попадание в кэш стоило бы запроса к SQLite
+DATA_VERSION_CHECK_INTERVAL = 0.05
+# Через сколько инструкций виртуальной машины SQLite проверяется отмена запроса
+PROGRESS_HANDLER_STEPS = 1000
+TABLES = ('users', 'projects', 'tasks')
+MODELS = {'tasks': Task, 'projects': Project, 'users': User}
+PROJECT_STATS_COLUMNS = ('total',) + TASK_STATUSES
+EMPTY_WORKLOAD = {'open': 0, 'in_progress': 0, 'overdue': 0, 'next_due_date': None}
 
 
 class DatabaseManager:
-    def __init__(self, db_path: str = "tasks.db") -> None:
+    def __init__(self, db_path: str = "tasks.db", cache_size: int = IDENTITY_CACHE_SIZE,
+                 query_cache_size: int = QUERY_CACHE_SIZE,
+                 compact_enums: Optional[bool] = None,
+                 epoch_dates: Optional[bool] = None) -> None:
         self.db_path = db_path
-        self.connection: Optional[sqlite3.Connection] = None
+        self._init_state(cache_size, query_cache_size)
         self._connect()
         self.create_tables()
+        if compact_enums is not None or epoch_dates is not None:
+            self.convert_storage(compact_enums=compact_enums, epoch_dates=epoch_dates)
+
+    def _init_state(self, cache_size: int, query_cache_size: int) -> None:
+        self.connection: Optional[sqlite3.Connection] = None
+        self._cache_sizes = (cache_size, query_cache_size)
+        self._task_cache = IdentityMap(cache_size)
+        self._project_cache = IdentityMap(cache_size)
+        self._user_cache = IdentityMap(cache_size)
+        self._query_cache = QueryCache(query_cache_size)
+        self._data_version: Optional[int] = None
+        self._data_version_checked = 0.0
+        self.codec = StorageCodec()
+        self.instrumentation: Optional[QueryInstrumentation] = None
+        self._tokens: List[CancellationToken] = []
+        self._wal = False
 
     def _connect(self) -> None:
         try:
-            self.connection = sqlite3.connect(self.db_path)
+            self.connection = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES,
+                                              factory=InstrumentedConnection)
             self.connection.row_factory = sqlite3.Row
+            self.connection.instrumentation = self.instrumentation
             self.connection.execute("PRAGMA foreign_keys = ON")
         except sqlite3.Error as e:
             raise Exception(f"Ошибка подключения к базе данных: {e}")
@@ -25,85 +80,243 @@ class DatabaseManager:
         if self.connection:
             self.connection.close()
             self.connection = None
+        self.clear_cache()
 
-    def create_tables(self) -> None:
+    def clear_cache(self) -> None:
+        self._task_cache.clear()
+        self._project_cache.clear()
+        self._user_cache.clear()
+        self._query_cache.clear()
+
+    def get_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            'tasks': self._task_cache.stats(),
+            'projects': self._project_cache.stats(),
+            'users': self._user_cache.stats(),
+            'queries': self._query_cache.stats()
+        }
+
+    def enable_instrumentation(self, slow_query_ms: Optional[float] = None, trace: bool = False,
+                               slow_query_callback: Optional[Callable] = None
+                               ) -> QueryInstrumentation:
+        # В режиме trace дополнительно сохраняются все инструкции в том виде,
+        # в каком их выполняет SQLite, включая вызванные триггерами
+        self.instrumentation = QueryInstrumentation(slow_query_ms, slow_query_callback)
+        self.connection.instrumentation = self.instrumentation
+        self.connection.set_trace_callback(self.instrumentation.trace if trace else None)
+        return self.instrumentation
+
+    def disable_instrumentation(self) -> None:
+        self.instrumentation = None
+        if self.connection:
+            self.connection.instrumentation = None
+            self.connection.set_trace_callback(None)
+
+    def get_query_stats(self) -> List[Dict[str, Any]]:
+        return self.instrumentation.stats() if self.instrumentation else []
+
+    def get_slow_queries(self) -> List[Dict[str, Any]]:
+        return list(self.instrumentation.slow_queries) if self.instrumentation else []
+
+    def get_traced_statements(self) -> List[str]:
+        return list(self.instrumentation.traced) if self.instrumentation else []
+
+    def reset_query_stats(self) -> None:
+        if self.instrumentation:
+            self.instrumentation.reset()
+
+    @contextmanager
+    def read_snapshot(self) -> Iterator["DatabaseManager"]:
+        # Отчёт из нескольких запросов читает один согласованный снимок базы
+        # через отдельное соединение. В режиме WAL читатель видит базу на момент
+        # начала своей транзакции и не блокирует запись основного соединения
+        if self.db_path == ":memory:" or not self.db_path:
+            raise Exception("Снимок чтения недоступен для базы данных в памяти")
+        self._enable_wal()
+        reader = self._open_reader()
+        try:
+            yield reader
+        finally:
+            reader.close()
+
+    def _enable_wal(self) -> None:
+        # Режим WAL сохраняется в файле базы, поэтому переключается один раз
+        if self._wal:
+            return
+        try:
+            mode = self.connection.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        except sqlite3.Error as e:
+            raise Exception(f"Ошибка базы данных: {e}")
+        if mode.lower() != 'wal':
+            raise Exception(f"Не удалось включить режим WAL, текущий режим: {mode}")
+        self._wal = True
+
+    def _open_reader(self) -> "DatabaseManager":
+        # Читатель разделяет с менеджером формат хранения, но не кэши:
+        # кэши менеджера отражают последние записи, а не снимок
+        reader = DatabaseManager.__new__(DatabaseManager)
+        reader.db_path = self.db_path
+        reader._init_state(*self._cache_sizes)
+        reader.codec = self.codec
+        reader.instrumentation = self.instrumentation
+        reader._wal = True
+        reader._connect()
+        connection = reader.connection
+        try:
+            connection.isolation_level = None
+            connection.execute("PRAGMA query_only = ON")
+            connection.execute("BEGIN")
+            # Снимок закрепляется первым чтением в транзакции и держится до её конца
+            connection.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        except sqlite3.Error as e:
+            reader.close()
+            raise Exception(f"Ошибка базы данных: {e}")
+        return reader
+
+    @contextmanager
+    def cancellable(self, token: Optional[CancellationToken] = None) -> Iterator[None]:
+        # Все запросы внутри блока прерываются при отмене токена или истечении
+        # его срока; прерванный запрос завершается исключением QueryCancelled.
+        # Блоки могут быть вложенными, проверяются все активные токены
+        if token is None:
+            yield
+            return
+        token.check()
+        connection = self.connection
+        if not self._tokens:
+            connection.set_progress_handler(self._progress, PROGRESS_HANDLER_STEPS)
+        self._tokens.append(token)
+        token.attach(connection)
+        try:
+            yield
+        except Exception as e:
+            # Прерванный запрос приходит как обёрнутая ошибка базы данных;
+            # остальные ошибки, в том числе QueryCancelled, не подменяются
+            cancelled = next((t for t in self._tokens if t.cancelled), None)
+            if cancelled is not None and is_interrupt(e):
+                raise QueryCancelled(cancelled.reason) from e
+            raise
+        finally:
+            token.detach(connection)
+            self._tokens.remove(token)
+            if not self._tokens and self.connection is connection:
+                connection.set_progress_handler(None, 0)
+
+    def _progress(self) -> int:
+        return 1 if any(token.cancelled for token in self._tokens) else 0
+
+    def _mark_changed(self, *tables: str) -> None:
+        self._query_cache.bump(*tables)
+
+    def _sync_data_version(self, throttled: bool = False) -> None:
+        # PRAGMA data_version меняется только при фиксации транзакций другими
+        # соединениями, поэтому так обнаруживаются изменения из других процессов.
+        # Собственные изменения сбрасывают кэши сразу, поэтому поиск по ID
+        # проверяет версию не чаще DATA_VERSION_CHECK_INTERVAL
+        now = time.monotonic()
+        if throttled and now - self._data_version_checked < DATA_VERSION_CHECK_INTERVAL:
+            return
+        self._data_version_checked = now
+        try:
+            version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error as e:
+            raise Exception(f"Ошибка базы данных: {e}")
+        
+        if self._data_version is not None and version != self._data_version:
+            self._task_cache.clear()
+            self._project_cache.clear()
+            self._user_cache.clear()
+            self._mark_changed(*TABLES)
+        self._data_version = version
+
+    def _cached_list(self, tables, query, params, row_converter, on_load=None):
+        self._sync_data_version()
+        key = (query, params)
+        cached = self._query_cache.get(key, tables)
+        if cached is not None:
+            return list(cached)
+        
         try:
             cursor = self.connection.cursor()
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT NOT NULL UNIQUE,
-                    email TEXT NOT NULL UNIQUE,
-                    role TEXT NOT NULL CHECK(role IN ('admin', 'manager', 'developer')),
-                    registration_date TEXT NOT NULL
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS projects (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    description TEXT,
-                    start_date TEXT NOT NULL,
-                    end_date TEXT NOT NULL,
-                    status TEXT NOT NULL CHECK(status IN ('active', 'completed', 'on_hold'))
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS tasks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    priority INTEGER NOT NULL CHECK(priority IN (1, 2, 3)),
-                    status TEXT NOT NULL CHECK(status IN ('pending', 'in_progress', 'completed')),
-                    due_date TEXT NOT NULL,
-                    project_id INTEGER NOT NULL,
-                    assignee_id INTEGER NOT NULL,
-                    FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE,
-                    FOREIGN KEY (assignee_id) REFERENCES users (id) ON DELETE CASCADE
-                )
-            ''')
-            
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_project_id ON tasks(project_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_assignee_id ON tasks(assignee_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority)')
-            
-            self.connection.commit()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
         except sqlite3.Error as e:
-            raise Exception(f"Ошибка создания таблиц: {e}")
+            raise Exception(f"Ошибка базы данных: {e}")
+        
+        result = [row_converter(dict(row)) for row in rows]
+        if on_load:
+            on_load(result)
+        self._query_cache.put(key, tables, result)
+        return list(result)
 
-    def add_task(self, task: Task) -> int:
+    def create_tables(self) -> None:
+        self.migrate()
+
+    def migrate(self, target: Optional[int] = None, dry_run: bool = False,
+                progress_callback: Optional[Callable[[str, int], None]] = None) -> List[Dict]:
+        try:
+            runner = MigrationRunner(self.connection)
+            applied = runner.migrate(target, dry_run, progress_callback)
+        except sqlite3.Error as e:
+            raise Exception(f"Ошибка миграции схемы: {e}")
+        
+        self.codec = runner.codec
+        if applied and not dry_run:
+            self.clear_cache()
+            self._mark_changed(*TABLES)
+        return applied
+
+    def schema_version(self) -> int:
+        return MigrationRunner(self.connection).current_version()
+
+    def convert_storage(self, compact_enums: Optional[bool] = None,
+                        epoch_dates: Optional[bool] = None,
+                        dry_run: bool = False) -> List[str]:
+        target = StorageCodec(
+            compact_enums=self.codec.compact_enums if compact_enums is None else compact_enums,
+            epoch_dates=self.codec.epoch_dates if epoch_dates is None else epoch_dates
+        )
+        try:
+            runner = MigrationRunner(self.connection, codec=self.codec)
+            statements = runner.rebuild_storage(target, dry_run)
+        except sqlite3.Error as e:
+            raise Exception(f"Ошибка преобразования формата хранения: {e}")
+        
+        if statements and not dry_run:
+            self.codec = target
+            self.clear_cache()
+            self._mark_changed(*TABLES)
+        return statements
 
+    def add_task(self, task: Task) -> int:
+        # Проверка по кэшу не должна пропустить проект или пользователя,
+        # удалённого другим соединением
+        self._sync_data_version()
         try:
             cursor = self.connection.cursor()
-            
-            cursor.execute("SELECT id FROM projects WHERE id = ?", (task.project_id,))
-            if not cursor.fetchone():
-                raise ValueError(f"Проект с ID {task.project_id} не найден")
-            
-            cursor.execute("SELECT id FROM users WHERE id = ?", (task.assignee_id,))
-            if not cursor.fetchone():
-                raise ValueError(f"Пользователь с ID {task.assignee_id} не найден")
+            self._require_row(cursor, 'projects', task.project_id, self._project_cache,
+                              f"Проект с ID {task.project_id} не найден")
+            self._require_row(cursor, 'users', task.assignee_id, self._user_cache,
+                              f"Пользователь с ID {task.assignee_id} не найден")
             
             query = '''
-                INSERT INTO tasks (title, description, priority, status, due_date, project_id, assignee_id)
+                INSERT INTO tasks (title, description, priority, status, due_date,
+                                   project_id, assignee_id)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             '''
             params = (
                 task.title,
                 task.description,
                 task.priority,
-                task.status,
-                task.due_date.isoformat(),
+                self.codec.encode('tasks', 'status', task.status),
+                self.codec.encode_date(task.due_date),
                 task.project_id,
                 task.assignee_id
             )
             
             cursor.execute(query, params)
             self.connection.commit()
+            self._mark_changed('tasks')
             
             task_id = cursor.lastrowid
             task.id = task_id
@@ -113,7 +326,20 @@ class DatabaseManager:
         except sqlite3.Error as e:
             raise Exception(f"Ошибка базы данных: {e}")
 
+    def _require_row(self, cursor, table, entity_id, cache, message) -> None:
+        # Запись из кэша идентичности существует, остальные проверяются запросом
+        if entity_id in cache:
+            return
+        cursor.execute(f"SELECT id FROM {table} WHERE id = ?", (entity_id,))
+        if not cursor.fetchone():
+            raise ValueError(message)
+
     def get_task_by_id(self, task_id: int) -> Optional[Task]:
+        self._sync_data_version(throttled=True)
+        cached = self._task_cache.get(task_id)
+        if cached is not None:
+            return cached
+        
         try:
             cursor = self.connection.cursor()
             query = "SELECT * FROM tasks WHERE id = ?"
@@ -121,21 +347,31 @@ class DatabaseManager:
             row = cursor.fetchone()
             
             if row:
-                return self._row_to_task(dict(row))
+                task = self._row_to_task(dict(row))
+                self._link_relations([task])
+                self._task_cache.put(task_id, task)
+                return task
             return None
         except sqlite3.Error as e:
             raise Exception(f"Ошибка базы данных: {e}")
 
-    def get_all_tasks(self) -> List[Task]:
-        try:
-            cursor = self.connection.cursor()
-            query = "SELECT * FROM tasks ORDER BY due_date ASC"
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            return [self._row_to_task(dict(row)) for row in rows]
-        except sqlite3.Error as e:
-            raise Exception(f"Ошибка базы данных: {e}")
+    def get_tasks_by_ids(self, task_ids: Iterable[int]) -> Dict[int, Task]:
+        tasks = self._get_by_ids('tasks', task_ids, self._task_cache)
+        self._link_relations(list(tasks.values()))
+        return tasks
+
+    def get_all_tasks(self, columns: Optional[Iterable[str]] = None) -> List[Task]:
+        columns = normalize('tasks', columns)
+        query = f"SELECT {select_list(columns)} FROM tasks ORDER BY due_date ASC"
+        return self._cached_list(('tasks',), query, (), self._converter('tasks', columns),
+                                 self._link_relations)
+
+    def iter_tasks(self, batch_size: int = STREAM_BATCH_SIZE,
+                   columns: Optional[Iterable[str]] = None) -> Iterator[Task]:
+        columns = normalize('tasks', columns)
+        query = f"SELECT {select_list(columns)} FROM tasks ORDER BY due_date ASC"
+        return self._iter_rows(query, self._converter('tasks', columns), batch_size,
+                               on_load=self._link_relations)
 
     def update_task(self, task_id: int, **kwargs) -> bool:
         try:
@@ -151,15 +387,13 @@ class DatabaseManager:
             set_clause = ", ".join([f"{key} = ?" for key in kwargs.keys()])
             query = f"UPDATE tasks SET {set_clause} WHERE id = ?"
             
-            params = list(kwargs.values())
+            params = [self.codec.encode('tasks', key, value) for key, value in kwargs.items()]
             params.append(task_id)
             
-            for i, value in enumerate(params[:-1]):
-                if isinstance(value, datetime):
-                    params[i] = value.isoformat()
-            
             cursor.execute(query, tuple(params))
             self.connection.commit()
+            self._task_cache.invalidate(task_id)
+            self._mark_changed('tasks')
             
             return cursor.rowcount > 0
         except sqlite3.Error as e:
@@ -176,56 +410,60 @@ class DatabaseManager:
             query = "DELETE FROM tasks WHERE id = ?"
             cursor.execute(query, (task_id,))
             self.connection.commit()
+            self._task_cache.invalidate(task_id)
+            self._mark_changed('tasks')
             
             return cursor.rowcount > 0
         except sqlite3.Error as e:
             raise Exception(f"Ошибка базы данных: {e}")
 
-    def search_tasks(self, query_str: str) -> List[Task]:
-        try:
-            cursor = self.connection.cursor()
-            search_pattern = f"%{query_str}%"
-            query = """
-                SELECT * FROM tasks 
-                WHERE title LIKE ? OR description LIKE ?
-                ORDER BY due_date ASC
-            """
-            cursor.execute(query, (search_pattern, search_pattern))
-            rows = cursor.fetchall()
+    def search_tasks(self, query_str: str,
+                     token: Optional[CancellationToken] = None) -> List[Task]:
+        search_pattern = f"%{query_str}%"
+        query = """
+            SELECT * FROM tasks 
+            WHERE title LIKE ? OR description LIKE ?
+            ORDER BY due_date ASC
+        """
+        params = (search_pattern, search_pattern)
+        with self.cancellable(token):
+            return self._cached_list(('tasks',), query, params, self._row_to_task,
+                                     self._link_relations)
+
+    def query_tasks(self, query: TaskQuery,
+                    token: Optional[CancellationToken] = None) -> List[Task]:
+        sql, params = query.build(self.codec)
+        converter = self._converter('tasks', query.columns)
+        with self.cancellable(token):
+            if not query.overdue_only:
+                return self._cached_list(('tasks',), sql, params, converter,
+                                         self._link_relations)
             
-            return [self._row_to_task(dict(row)) for row in rows]
-        except sqlite3.Error as e:
-            raise Exception(f"Ошибка базы данных: {e}")
+            # Условие просрочки зависит от текущего времени, кэшировать результат нет смысла
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute(sql, params)
+                return self._link_relations([converter(dict(row)) for row in cursor.fetchall()])
+            except sqlite3.Error as e:
+                raise Exception(f"Ошибка базы данных: {e}")
 
     def get_tasks_by_project(self, project_id: int) -> List[Task]:
-        try:
-            cursor = self.connection.cursor()
-            query = """
-                SELECT * FROM tasks 
-                WHERE project_id = ? 
-                ORDER BY priority ASC, due_date ASC
-            """
-            cursor.execute(query, (project_id,))
-            rows = cursor.fetchall()
-            
-            return [self._row_to_task(dict(row)) for row in rows]
-        except sqlite3.Error as e:
-            raise Exception(f"Ошибка базы данных: {e}")
+        query = """
+            SELECT * FROM tasks 
+            WHERE project_id = ? 
+            ORDER BY priority ASC, due_date ASC
+        """
+        return self._cached_list(('tasks',), query, (project_id,), self._row_to_task,
+                                 self._link_relations)
 
     def get_tasks_by_user(self, user_id: int) -> List[Task]:
-        try:
-            cursor = self.connection.cursor()
-            query = """
-                SELECT * FROM tasks 
-                WHERE assignee_id = ? 
-                ORDER BY due_date ASC, priority ASC
-            """
-            cursor.execute(query, (user_id,))
-            rows = cursor.fetchall()
-            
-            return [self._row_to_task(dict(row)) for row in rows]
-        except sqlite3.Error as e:
-            raise Exception(f"Ошибка базы данных: {e}")
+        query = """
+            SELECT * FROM tasks 
+            WHERE assignee_id = ? 
+            ORDER BY due_date ASC, priority ASC
+        """
+        return self._cached_list(('tasks',), query, (user_id,), self._row_to_task,
+                                 self._link_relations)
 
     def add_project(self, project: Project) -> int:
         try:
@@ -237,13 +475,14 @@ class DatabaseManager:
             params = (
                 project.name,
                 project.description,
-                project.start_date.isoformat(),
-                project.end_date.isoformat(),
-                project.status
+                self.codec.encode_date(project.start_date),
+                self.codec.encode_date(project.end_date),
+                self.codec.encode('projects', 'status', project.status)
             )
             
             cursor.execute(query, params)
             self.connection.commit()
+            self._mark_changed('projects')
             
             project_id = cursor.lastrowid
             project.id = project_id
@@ -254,6 +493,11 @@ class DatabaseManager:
             raise Exception(f"Ошибка базы данных: {e}")
 
     def get_project_by_id(self, project_id: int) -> Optional[Project]:
+        self._sync_data_version(throttled=True)
+        cached = self._project_cache.get(project_id)
+        if cached is not None:
+            return cached
+        
         try:
             cursor = self.connection.cursor()
             query = "SELECT * FROM projects WHERE id = ?"
@@ -261,21 +505,26 @@ class DatabaseManager:
             row = cursor.fetchone()
             
             if row:
-                return self._row_to_project(dict(row))
+                project = self._row_to_project(dict(row))
+                self._project_cache.put(project_id, project)
+                return project
             return None
         except sqlite3.Error as e:
             raise Exception(f"Ошибка базы данных: {e}")
 
-    def get_all_projects(self) -> List[Project]:
-        try:
-            cursor = self.connection.cursor()
-            query = "SELECT * FROM projects ORDER BY start_date DESC"
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            return [self._row_to_project(dict(row)) for row in rows]
-        except sqlite3.Error as e:
-            raise Exception(f"Ошибка базы данных: {e}")
+    def get_projects_by_ids(self, project_ids: Iterable[int]) -> Dict[int, Project]:
+        return self._get_by_ids('projects', project_ids, self._project_cache)
+
+    def get_all_projects(self, columns: Optional[Iterable[str]] = None) -> List[Project]:
+        columns = normalize('projects', columns)
+        query = f"SELECT {select_list(columns)} FROM projects ORDER BY start_date DESC"
+        return self._cached_list(('projects',), query, (), self._converter('projects', columns))
+
+    def iter_projects(self, batch_size: int = STREAM_BATCH_SIZE,
+                      columns: Optional[Iterable[str]] = None) -> Iterator[Project]:
+        columns = normalize('projects', columns)
+        query = f"SELECT {select_list(columns)} FROM projects ORDER BY start_date DESC"
+        return self._iter_rows(query, self._converter('projects', columns), batch_size)
 
     def update_project(self, project_id: int, **kwargs) -> bool:
         try:
@@ -291,15 +540,13 @@ class DatabaseManager:
             set_clause = ", ".join([f"{key} = ?" for key in kwargs.keys()])
             query = f"UPDATE projects SET {set_clause} WHERE id = ?"
             
-            params = list(kwargs.values())
+            params = [self.codec.encode('projects', key, value) for key, value in kwargs.items()]
             params.append(project_id)
             
-            for i, value in enumerate(params[:-1]):
-                if isinstance(value, datetime):
-                    params[i] = value.isoformat()
-            
             cursor.execute(query, tuple(params))
             self.connection.commit()
+            self._project_cache.invalidate(project_id)
+            self._mark_changed('projects')
             
             return cursor.rowcount > 0
         except sqlite3.Error as e:
@@ -316,11 +563,34 @@ class DatabaseManager:
             query = "DELETE FROM projects WHERE id = ?"
             cursor.execute(query, (project_id,))
             self.connection.commit()
+            self._project_cache.invalidate(project_id)
+            self._task_cache.clear()
+            self._mark_changed('projects', 'tasks')
             
             return cursor.rowcount > 0
         except sqlite3.Error as e:
             raise Exception(f"Ошибка базы данных: {e}")
 
+    def delete_projects(self, project_ids: Iterable[int], chunk_size: int = DELETE_CHUNK_SIZE,
+                        progress_callback: Optional[Callable[[int, int], None]] = None) -> int:
+        return self._delete_in_chunks('projects', 'project_id', project_ids,
+                                      self._project_cache, chunk_size, progress_callback)
+
+    def purge_completed_projects(self, older_than: datetime,
+                                 chunk_size: int = DELETE_CHUNK_SIZE,
+                                 progress_callback: Optional[Callable[[int, int], None]] = None
+                                 ) -> int:
+        try:
+            cursor = self.connection.cursor()
+            query = "SELECT id FROM projects WHERE status = ? AND end_date < ?"
+            cursor.execute(query, (self.codec.encode('projects', 'status', 'completed'),
+                                   self.codec.encode_date(older_than)))
+            project_ids = [row['id'] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            raise Exception(f"Ошибка базы данных: {e}")
+        
+        return self.delete_projects(project_ids, chunk_size, progress_callback)
+
     def add_user(self, user: User) -> int:
         try:
             cursor = self.connection.cursor()
@@ -331,12 +601,13 @@ class DatabaseManager:
             params = (
                 user.username,
                 user.email,
-                user.role,
-                user.registration_date.isoformat()
+                self.codec.encode('users', 'role', user.role),
+                self.codec.encode_date(user.registration_date)
             )
             
             cursor.execute(query, params)
             self.connection.commit()
+            self._mark_changed('users')
             
             user_id = cursor.lastrowid
             user.id = user_id
@@ -347,6 +618,11 @@ class DatabaseManager:
             raise Exception(f"Ошибка базы данных: {e}")
 
     def get_user_by_id(self, user_id: int) -> Optional[User]:
+        self._sync_data_version(throttled=True)
+        cached = self._user_cache.get(user_id)
+        if cached is not None:
+            return cached
+        
         try:
             cursor = self.connection.cursor()
             query = "SELECT * FROM users WHERE id = ?"
@@ -354,21 +630,26 @@ class DatabaseManager:
             row = cursor.fetchone()
             
             if row:
-                return self._row_to_user(dict(row))
+                user = self._row_to_user(dict(row))
+                self._user_cache.put(user_id, user)
+                return user
             return None
         except sqlite3.Error as e:
             raise Exception(f"Ошибка базы данных: {e}")
 
-    def get_all_users(self) -> List[User]:
-        try:
-            cursor = self.connection.cursor()
-            query = "SELECT * FROM users ORDER BY username ASC"
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            return [self._row_to_user(dict(row)) for row in rows]
-        except sqlite3.Error as e:
-            raise Exception(f"Ошибка базы данных: {e}")
+    def get_users_by_ids(self, user_ids: Iterable[int]) -> Dict[int, User]:
+        return self._get_by_ids('users', user_ids, self._user_cache)
+
+    def get_all_users(self, columns: Optional[Iterable[str]] = None) -> List[User]:
+        columns = normalize('users', columns)
+        query = f"SELECT {select_list(columns)} FROM users ORDER BY username ASC"
+        return self._cached_list(('users',), query, (), self._converter('users', columns))
+
+    def iter_users(self, batch_size: int = STREAM_BATCH_SIZE,
+                   columns: Optional[Iterable[str]] = None) -> Iterator[User]:
+        columns = normalize('users', columns)
+        query = f"SELECT {select_list(columns)} FROM users ORDER BY username ASC"
+        return self._iter_rows(query, self._converter('users', columns), batch_size)
 
     def update_user(self, user_id: int, **kwargs) -> bool:
         try:
@@ -384,15 +665,13 @@ class DatabaseManager:
             set_clause = ", ".join([f"{key} = ?" for key in kwargs.keys()])
             query = f"UPDATE users SET {set_clause} WHERE id = ?"
             
-            params = list(kwargs.values())
+            params = [self.codec.encode('users', key, value) for key, value in kwargs.items()]
             params.append(user_id)
             
-            for i, value in enumerate(params[:-1]):
-                if isinstance(value, datetime):
-                    params[i] = value.isoformat()
-            
             cursor.execute(query, tuple(params))
             self.connection.commit()
+            self._user_cache.invalidate(user_id)
+            self._mark_changed('users')
             
             return cursor.rowcount > 0
         except sqlite3.Error as e:
@@ -409,51 +688,202 @@ class DatabaseManager:
             query = "DELETE FROM users WHERE id = ?"
             cursor.execute(query, (user_id,))
             self.connection.commit()
+            self._user_cache.invalidate(user_id)
+            self._task_cache.clear()
+            self._mark_changed('users', 'tasks')
             
             return cursor.rowcount > 0
         except sqlite3.Error as e:
             raise Exception(f"Ошибка базы данных: {e}")
+
+    def delete_users(self, user_ids: Iterable[int], chunk_size: int = DELETE_CHUNK_SIZE,
+                     progress_callback: Optional[Callable[[int, int], None]] = None) -> int:
+        return self._delete_in_chunks('users', 'assignee_id', user_ids,
+                                      self._user_cache, chunk_size, progress_callback)
+
+    def _delete_in_chunks(self, table, task_column, ids, cache, chunk_size, progress_callback):
+        if chunk_size < 1:
+            raise ValueError("Размер пакета должен быть положительным")
         
-    def _row_to_task(self, row):
-        due_date = datetime.fromisoformat(row['due_date']) if row['due_date'] else None
+        ids = list(dict.fromkeys(ids))
+        total = len(ids)
+        deleted = 0
         
-        task = Task(
-            id=row['id'],
-            title=row['title'],
-            description=row['description'],
-            priority=row['priority'],
-            due_date=due_date,
-            project_id=row['project_id'],
-            assignee_id=row['assignee_id'],
-            status=row['status']
-        )
-        return task
+        # Каждая транзакция удаляет не больше chunk_size строк, поэтому между
+        # транзакциями блокировка записи освобождается и читатели могут работать.
+        # Задачи удаляются явно пакетами по индексу, а не одним каскадом.
+        for start in range(0, total, chunk_size):
+            chunk = ids[start:start + chunk_size]
+            try:
+                self._delete_tasks_of(task_column, chunk, chunk_size)
+                with self.connection:
+                    cursor = self.connection.execute(
+                        f"DELETE FROM {table} WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+            except sqlite3.Error as e:
+                raise Exception(f"Ошибка базы данных: {e}")
+            finally:
+                cache.invalidate_many(chunk)
+                self._task_cache.clear()
+                self._mark_changed(table, 'tasks')
+            
+            deleted += cursor.rowcount
+            if progress_callback:
+                progress_callback(start + len(chunk), total)
+        
+        return deleted
+
+    def _delete_tasks_of(self, task_column, owner_ids, batch_size):
+        query = f"""
+            DELETE FROM tasks WHERE rowid IN (
+                SELECT rowid FROM tasks WHERE {task_column} IN ({', '.join('?' * len(owner_ids))})
+                LIMIT ?
+            )
+        """
+        while True:
+            with self.connection:
+                cursor = self.connection.execute(query, (*owner_ids, batch_size))
+            if cursor.rowcount < batch_size:
+                return
+
+    def _iter_rows(self, query, row_converter, batch_size, params=(), on_load=None):
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                entities = [row_converter(dict(row)) for row in rows]
+                if on_load:
+                    on_load(entities)
+                yield from entities
+        except sqlite3.Error as e:
+            raise Exception(f"Ошибка базы данных: {e}")
+
+    def _get_by_ids(self, table, ids, cache):
+        # Записи из кэша идентичности не запрашиваются повторно, остальные
+        # читаются одним запросом на пакет; отсутствующие ID в результат не попадают
+        self._sync_data_version(throttled=True)
+        ids = list(dict.fromkeys(ids))
+        found, missing = self._partition_cached(ids, cache)
+        converter = self._converter(table, None)
+        try:
+            cursor = self.connection.cursor()
+            for query, params in self._id_batches(table, missing):
+                cursor.execute(query, params)
+                for row in cursor.fetchall():
+                    entity = converter(dict(row))
+                    cache.put(entity.id, entity)
+                    found[entity.id] = entity
+        except sqlite3.Error as e:
+            raise Exception(f"Ошибка базы данных: {e}")
+        return {entity_id: found[entity_id] for entity_id in ids if entity_id in found}
+
+    def _partition_cached(self, ids, cache):
+        found = {}
+        missing = []
+        for entity_id in ids:
+            entity = cache.get(entity_id)
+            if entity is None:
+                missing.append(entity_id)
+            else:
+                found[entity_id] = entity
+        return found, missing
+
+    def _id_batches(self, table, ids):
+        # Большой набор передаётся одним параметром JSON, небольшой - пакетами IN (...)
+        if len(ids) > JSON_IDS_THRESHOLD:
+            return [(f"SELECT * FROM {table} WHERE id IN (SELECT value FROM json_each(?))",
+                     (json.dumps(ids),))]
+        return [
+            (f"SELECT * FROM {table} WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+            for chunk in (ids[start:start + ID_CHUNK_SIZE]
+                          for start in range(0, len(ids), ID_CHUNK_SIZE))
+        ]
+
+    def _link_relations(self, tasks):
+        # Общие загрузчики связей на выборку: обращение к task.project или
+        # task.assignee загружает связанные записи всей выборки одним запросом
+        loaders = {
+            'project': RelationLoader(tasks, 'project_id', self.get_projects_by_ids,
+                                      functools.partial(self._query_cache.version, 'projects')),
+            'assignee': RelationLoader(tasks, 'assignee_id', self.get_users_by_ids,
+                                       functools.partial(self._query_cache.version, 'users')),
+        }
+        for task in tasks:
+            task._relations = loaders
+        return tasks
+
+    def _converter(self, table, columns):
+        if columns is None:
+            return {'tasks': self._row_to_task, 'projects': self._row_to_project,
+                    'users': self._row_to_user}[table]
+        return functools.partial(self._row_to_partial, table, deferred_columns(table, columns))
+
+    def _row_to_partial(self, table, deferred, row):
+        # В строке есть не все столбцы, остальные загрузит Deferred
+        # при первом обращении
+        values = self._decode_columns(table, row)
+        if PREVIEW_COLUMN in values:
+            values['_description_preview'] = values.pop(PREVIEW_COLUMN)
+        entity = MODELS[table].from_row(values)
+        if deferred:
+            entity._deferred_loader = functools.partial(
+                self._load_columns, table, row['id'], deferred)
+        return entity
+
+    def _decode_columns(self, table, row):
+        return {
+            column: (self.codec.decode_date(value) if (table, column) in DATE_COLUMNS
+                     else self.codec.decode(table, column, value))
+            for column, value in row.items()
+        }
+
+    def _load_columns(self, table, entity_id, columns):
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(f"SELECT {', '.join(columns)} FROM {table} WHERE id = ?", (entity_id,))
+            row = cursor.fetchone()
+        except sqlite3.Error as e:
+            raise Exception(f"Ошибка базы данных: {e}")
+        # Запись могла быть удалена после выборки списка
+        if row is None:
+            return dict.fromkeys(columns)
+        return self._decode_columns(table, dict(row))
+
+    # Полные строки собираются через from_row без валидации конструкторов:
+    # данные в базе уже проверены при записи и CHECK-ограничениями схемы
+    def _row_to_task(self, row):
+        return Task.from_row({
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'priority': row['priority'],
+            'status': self.codec.decode('tasks', 'status', row['status']),
+            'due_date': self.codec.decode_date(row['due_date']),
+            'project_id': row['project_id'],
+            'assignee_id': row['assignee_id'],
+        })
 
     def _row_to_project(self, row):
-        start_date = datetime.fromisoformat(row['start_date']) if row['start_date'] else None
-        end_date = datetime.fromisoformat(row['end_date']) if row['end_date'] else None
-        
-        project = Project(
-            id=row['id'],
-            name=row['name'],
-            description=row['description'],
-            start_date=start_date,
-            end_date=end_date,
-            status=row['status']
-        )
-        return project
+        return Project.from_row({
+            'id': row['id'],
+            'name': row['name'],
+            'description': row['description'],
+            'start_date': self.codec.decode_date(row['start_date']),
+            'end_date': self.codec.decode_date(row['end_date']),
+            'status': self.codec.decode('projects', 'status', row['status']),
+        })
 
     def _row_to_user(self, row):
-        registration_date = datetime.fromisoformat(row['registration_date']) if row['registration_date'] else None
-        
-        user = User(
-            id=row['id'],
-            username=row['username'],
-            email=row['email'],
-            role=row['role'],
-            registration_date=registration_date
-        )
-        return user
+        return User.from_row({
+            'id': row['id'],
+            'username': row['username'],
+            'email': row['email'],
+            'role': self.codec.decode('users', 'role', row['role']),
+            'registration_date': (self.codec.decode_date(row['registration_date'])
+                                  or datetime.now()),
+        })
 
     def fetch_one(self, query, params=()):
         cursor = self.connection.cursor()
@@ -467,15 +897,16 @@ class DatabaseManager:
         return [dict(row) for row in rows]
     
     def get_overdue_tasks(self) -> List[Task]:
-        query = """
+        completed = self.codec.literal('tasks', 'status', 'completed')
+        query = f"""
             SELECT * FROM tasks 
-            WHERE status != 'completed' 
+            WHERE status != {completed} 
             AND due_date < ?
             ORDER BY due_date ASC
             """
                 
         cursor = self.connection.cursor()
-        cursor.execute(query, (datetime.now().isoformat(),))
+        cursor.execute(query, (self.codec.encode_date(datetime.now()),))
         rows = cursor.fetchall()
                 
         tasks = []
@@ -484,4 +915,116 @@ class DatabaseManager:
             if task:
                 tasks.append(task)
                 
-        return tasks
\ No newline at end of file
+        return self._link_relations(tasks)
+
+    def get_counts(self) -> Dict[str, int]:
+        # Строка состояния показывает только количества, поэтому они считаются
+        # одним запросом по индексам без загрузки самих записей
+        completed = self.codec.literal('tasks', 'status', 'completed')
+        query = f"""
+            SELECT
+                (SELECT COUNT(*) FROM tasks) AS tasks,
+                (SELECT COUNT(*) FROM tasks
+                 WHERE status != {completed} AND due_date < ?) AS overdue,
+                (SELECT COUNT(*) FROM projects) AS projects,
+                (SELECT COUNT(*) FROM users) AS users
+        """
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(query, (self.codec.encode_date(datetime.now()),))
+            return dict(cursor.fetchone())
+        except sqlite3.Error as e:
+            raise Exception(f"Ошибка базы данных: {e}")
+
+    def get_project_stats(self, project_id: int) -> Dict[str, int]:
+        # Счётчики поддерживаются триггерами на tasks; у проекта без задач строки нет
+        query = (f"SELECT {', '.join(PROJECT_STATS_COLUMNS)} FROM project_stats "
+                 "WHERE project_id = ?")
+        rows = self._cached_list(('projects', 'tasks'), query, (project_id,), dict)
+        return dict(rows[0]) if rows else dict.fromkeys(PROJECT_STATS_COLUMNS, 0)
+
+    def get_all_project_stats(self) -> Dict[int, Dict[str, int]]:
+        query = f"SELECT project_id, {', '.join(PROJECT_STATS_COLUMNS)} FROM project_stats"
+        rows = self._cached_list(('projects', 'tasks'), query, (), dict)
+        return {row['project_id']: {column: row[column] for column in PROJECT_STATS_COLUMNS}
+                for row in rows}
+
+    def get_user_workload(self, user_id: int) -> Dict[str, Any]:
+        workload = self._read_workload("WHERE user_id = ?", (user_id,))
+        return workload.get(user_id, dict(EMPTY_WORKLOAD))
+
+    def get_all_user_workload(self) -> Dict[int, Dict[str, Any]]:
+        return self._read_workload("", ())
+
+    def _read_workload(self, where, params):
+        # Счётчики и ближайший срок поддерживаются триггерами; просроченные
+        # задачи считаются по индексу только у тех, чей ближайший срок прошёл
+        completed = self.codec.literal('tasks', 'status', 'completed')
+        query = f"""
+            SELECT user_id, open, in_progress, next_due_date,
+                CASE WHEN next_due_date < ? THEN (
+                    SELECT COUNT(*) FROM tasks
+                    WHERE assignee_id = user_workload.user_id
+                      AND status != {completed} AND due_date < ?
+                ) ELSE 0 END AS overdue
+            FROM user_workload {where}
+        """
+        now = self.codec.encode_date(datetime.now())
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(query, (now, now) + tuple(params))
+            rows = cursor.fetchall()
+        except sqlite3.Error as e:
+            raise Exception(f"Ошибка базы данных: {e}")
+        return {
+            row['user_id']: {
+                'open': row['open'],
+                'in_progress': row['in_progress'],
+                'overdue': row['overdue'],
+                'next_due_date': self.codec.decode_date(row['next_due_date']),
+            }
+            for row in rows
+        }
+
+    def changes_since(self, seq: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        try:
+            cursor = self.connection.cursor()
+            query = """
+                SELECT seq, op, entity, entity_id, changed_at FROM change_log
+                WHERE seq > ?
+                ORDER BY seq ASC
+                LIMIT ?
+            """
+            cursor.execute(query, (seq, limit))
+            return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            raise Exception(f"Ошибка базы данных: {e}")
+
+    def latest_change_seq(self) -> int:
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log")
+            return cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            raise Exception(f"Ошибка базы данных: {e}")
+
+    def compact_changes(self, acknowledged_seq: Optional[int] = None) -> int:
+        # Для каждой сущности достаточно последней записи: потребитель всё равно
+        # перечитывает строку по ID. Записи до acknowledged_seq уже забраны всеми
+        # потребителями и удаляются целиком.
+        try:
+            with self.connection:
+                cursor = self.connection.execute("""
+                    DELETE FROM change_log
+                    WHERE seq NOT IN (
+                        SELECT MAX(seq) FROM change_log GROUP BY entity, entity_id
+                    )
+                """)
+                removed = cursor.rowcount
+                if acknowledged_seq is not None:
+                    cursor = self.connection.execute(
+                        "DELETE FROM change_log WHERE seq <= ?", (acknowledged_seq,))
+                    removed += cursor.rowcount
+            return removed
+        except sqlite3.Error as e:
+            raise Exception(f"Ошибка базы данных: {e}")
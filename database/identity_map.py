@@ -0,0 +1,53 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+
+class IdentityMap:
+    def __init__(self, max_size: int = 1024) -> None:
+        if max_size < 0:
+            raise ValueError("Размер кэша не может быть отрицательным")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._entries
+
+    def get(self, key: int) -> Optional[Any]:
+        entity = self._entries.get(key)
+        if entity is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entity
+
+    def put(self, key: int, entity: Any) -> None:
+        if self.max_size == 0 or entity is None:
+            return
+        self._entries[key] = entity
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: int) -> None:
+        self._entries.pop(key, None)
+
+    def invalidate_many(self, keys: Iterable[int]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'max_size': self.max_size
+        }
@@ -0,0 +1,184 @@
+import re
+import sqlite3
+import sys
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+SLOW_LOG_SIZE = 100
+TRACE_LOG_SIZE = 1000
+DATABASE_PACKAGE = 'database'
+# Ленивая загрузка отложенных столбцов и связей вызывается из моделей;
+# запрос относится к коду, который обратился к атрибуту модели
+MODELS_PACKAGE = 'models'
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    # Литералы и списки параметров заменяются на ?, чтобы запросы, отличающиеся
+    # только значениями, попадали в одну группу
+    text = _STRING_LITERAL.sub("?", sql)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _PLACEHOLDER_LIST.sub("(...)", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _callers(frame) -> tuple:
+    # method - внешний метод пакета database в стеке (например,
+    # DatabaseManager.get_project_by_id), caller - код, который его вызвал
+    # (например, UserController.get_user_tasks): так видны повторяющиеся вызовы
+    method = caller = None
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module != __name__ and not module.startswith(MODELS_PACKAGE + '.'):
+            owner = frame.f_locals.get('self')
+            name = frame.f_code.co_name
+            qualified = f"{type(owner).__name__}.{name}" if owner is not None else name
+            if not module.startswith(DATABASE_PACKAGE + '.'):
+                caller = qualified
+                break
+            method = qualified
+        frame = frame.f_back
+    return method, caller
+
+
+class QueryInstrumentation:
+    def __init__(self, slow_query_ms: Optional[float] = None,
+                 slow_query_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> None:
+        self.slow_query_ms = slow_query_ms
+        self.slow_query_callback = slow_query_callback
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=SLOW_LOG_SIZE)
+        self.traced: Deque[str] = deque(maxlen=TRACE_LOG_SIZE)
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def start(self, sql: str) -> Dict[str, Any]:
+        key = fingerprint(sql)
+        method, caller = _callers(sys._getframe(1))
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = {
+                'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0,
+                'methods': {}, 'callers': {}
+            }
+        stats['count'] += 1
+        stats['methods'][method] = stats['methods'].get(method, 0) + 1
+        stats['callers'][caller] = stats['callers'].get(caller, 0) + 1
+        return {'fingerprint': key, 'sql': sql, 'method': method, 'caller': caller,
+                'duration_ms': 0.0, 'rows': 0, 'logged': False, 'stats': stats}
+
+    def record(self, execution: Dict[str, Any], elapsed_ms: float, rows: int = 0) -> None:
+        # Время выборки строк добавляется к тому же выполнению запроса, поэтому
+        # итоговая длительность включает и execute, и все fetch*
+        execution['duration_ms'] += elapsed_ms
+        execution['rows'] += rows
+        stats = execution['stats']
+        stats['total_ms'] += elapsed_ms
+        stats['rows'] += rows
+        stats['max_ms'] = max(stats['max_ms'], execution['duration_ms'])
+
+        if (self.slow_query_ms is not None and not execution['logged']
+                and execution['duration_ms'] >= self.slow_query_ms):
+            execution['logged'] = True
+            entry = {key: value for key, value in execution.items()
+                     if key not in ('stats', 'logged')}
+            execution['entry'] = entry
+            self.slow_queries.append(entry)
+            if self.slow_query_callback:
+                self.slow_query_callback(entry)
+        elif execution['logged']:
+            execution['entry']['duration_ms'] = execution['duration_ms']
+            execution['entry']['rows'] = execution['rows']
+
+    def trace(self, statement: str) -> None:
+        self.traced.append(statement)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        result = []
+        for key, stats in self._stats.items():
+            item = dict(stats, fingerprint=key)
+            item['mean_ms'] = stats['total_ms'] / stats['count'] if stats['count'] else 0.0
+            item['methods'] = dict(stats['methods'])
+            item['callers'] = dict(stats['callers'])
+            result.append(item)
+        return sorted(result, key=lambda item: item['total_ms'], reverse=True)
+
+    def reset(self) -> None:
+        self._stats.clear()
+        self.slow_queries.clear()
+        self.traced.clear()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        instrumentation = self.connection.instrumentation
+        if instrumentation is None:
+            return super().execute(sql, parameters)
+        self._execution = instrumentation.start(sql)
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            instrumentation.record(self._execution, (time.perf_counter() - started) * 1000)
+
+    def executemany(self, sql, seq_of_parameters):
+        instrumentation = self.connection.instrumentation
+        if instrumentation is None:
+            return super().executemany(sql, seq_of_parameters)
+        self._execution = instrumentation.start(sql)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            instrumentation.record(self._execution, (time.perf_counter() - started) * 1000)
+
+    def fetchone(self):
+        return self._fetch(super().fetchone, lambda row: 0 if row is None else 1)
+
+    def fetchmany(self, size=None):
+        fetch = super().fetchmany
+        return self._fetch(lambda: fetch(self.arraysize if size is None else size), len)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall, len)
+
+    def _fetch(self, fetch, count_rows):
+        instrumentation = self.connection.instrumentation
+        execution = getattr(self, '_execution', None)
+        if instrumentation is None or execution is None:
+            return fetch()
+        started = time.perf_counter()
+        result = fetch()
+        instrumentation.record(execution, (time.perf_counter() - started) * 1000,
+                               count_rows(result))
+        return result
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    # Connection.execute в C создаёт курсор в обход переопределённого cursor(),
+    # поэтому execute и executemany переопределены явно
+    instrumentation: Optional[QueryInstrumentation] = None
+    # При групповой фиксации очереди записи транзакцию завершает сама очередь:
+    # commit() и выход из блока with внутри команд ничего не фиксируют
+    deferred_commit = False
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def commit(self):
+        if not self.deferred_commit:
+            super().commit()
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.deferred_commit:
+            return False
+        return super().__exit__(exc_type, exc, tb)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,439 @@
+import sqlite3
+from typing import Callable, Dict, List, Optional, Sequence, Union
+from database.storage import StorageCodec, TABLE_COLUMNS, TASK_STATUSES
+
+
+BACKFILL_BATCH_SIZE = 5000
+TRACKED_TABLES = ('users', 'projects', 'tasks')
+CHANGE_OPS = {'INSERT': 'insert', 'UPDATE': 'update', 'DELETE': 'delete'}
+REBUILD_ORDER = ('tasks', 'projects', 'users')
+
+# Инструкция миграции: готовый SQL или функция, строящая SQL для текущего
+# режима хранения (например, когда в условии участвует литерал статуса).
+Statement = Union[str, Callable[[StorageCodec], str]]
+
+
+def render(statement: Statement, codec: StorageCodec) -> str:
+    return statement(codec) if callable(statement) else statement
+
+
+class Backfill:
+    # Заполнение выполняется пакетами по rowid в отдельных коротких транзакциях,
+    # поэтому большие таблицы обновляются без долгой блокировки записи.
+    # Условие where должно отбирать только ещё не обработанные строки: тогда
+    # прерванное заполнение безопасно продолжается при следующем запуске.
+    def __init__(self, table: str, set_clause: str, where: str,
+                 batch_size: int = BACKFILL_BATCH_SIZE) -> None:
+        self.table = table
+        self.set_clause = set_clause
+        self.where = where
+        self.batch_size = batch_size
+
+    def sql(self) -> str:
+        return (f"UPDATE {self.table} SET {self.set_clause} WHERE rowid IN "
+                f"(SELECT rowid FROM {self.table} WHERE {self.where} LIMIT {self.batch_size})")
+
+    def run(self, connection: sqlite3.Connection,
+            progress_callback: Optional[Callable[[str, int], None]] = None) -> int:
+        total = 0
+        while True:
+            with connection:
+                updated = connection.execute(self.sql()).rowcount
+            if updated <= 0:
+                break
+            total += updated
+            if progress_callback:
+                progress_callback(self.table, total)
+        return total
+
+
+class Migration:
+    # objects - индексы и триггеры основных таблиц в форме CREATE ... IF NOT EXISTS
+    # и пересчёт производных таблиц. Они выполняются заново при перестройке
+    # таблиц под другой режим хранения, поэтому должны быть идемпотентными.
+    def __init__(self, version: int, description: str, statements: Sequence[Statement] = (),
+                 backfills: Sequence[Backfill] = (), finalize: Sequence[Statement] = (),
+                 objects: Sequence[Statement] = ()) -> None:
+        self.version = version
+        self.description = description
+        self.statements = list(statements)
+        self.backfills = list(backfills)
+        self.finalize = list(finalize)
+        self.objects = list(objects)
+
+    def plan(self, codec: StorageCodec) -> Dict:
+        statements = [render(s, codec) for s in self.statements]
+        statements += [b.sql() for b in self.backfills]
+        statements += [render(s, codec) for s in self.finalize + self.objects]
+        return {
+            'version': self.version,
+            'description': self.description,
+            'statements': statements
+        }
+
+
+def _change_log_triggers() -> List[str]:
+    statements = []
+    for table in TRACKED_TABLES:
+        for event, op in CHANGE_OPS.items():
+            row = 'OLD' if event == 'DELETE' else 'NEW'
+            statements.append(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{op}_log
+                AFTER {event} ON {table}
+                BEGIN
+                    INSERT INTO change_log (op, entity, entity_id)
+                    VALUES ('{op}', '{table}', {row}.id);
+                END
+            ''')
+    return statements
+
+
+# Счётчики задач проекта по статусам. Каждое изменение задачи сдвигает
+# счётчики своего проекта, поэтому прогресс читается одной строкой без
+# просмотра задач. Просроченность зависит от текущего времени и триггером
+# не поддерживается: её границу задают счётчики незавершённых задач.
+def _status_flags(codec: StorageCodec, row: str) -> List[str]:
+    return [f"({row}.status = {codec.literal('tasks', 'status', status)})"
+            for status in TASK_STATUSES]
+
+
+def _project_stats_add(codec: StorageCodec, row: str) -> str:
+    updates = ', '.join(f"{status} = {status} + excluded.{status}" for status in TASK_STATUSES)
+    return (f"INSERT INTO project_stats (project_id, total, {', '.join(TASK_STATUSES)}) "
+            f"VALUES ({row}.project_id, 1, {', '.join(_status_flags(codec, row))}) "
+            f"ON CONFLICT(project_id) DO UPDATE SET total = total + 1, {updates};")
+
+
+def _project_stats_remove(codec: StorageCodec, row: str) -> str:
+    updates = ', '.join(f"{status} = {status} - {flag}" for status, flag
+                        in zip(TASK_STATUSES, _status_flags(codec, row)))
+    return (f"UPDATE project_stats SET total = total - 1, {updates} "
+            f"WHERE project_id = {row}.project_id;")
+
+
+def _project_stats_fill(codec: StorageCodec) -> str:
+    sums = ', '.join(f"SUM{flag}" for flag in _status_flags(codec, 'tasks'))
+    return (f"INSERT OR REPLACE INTO project_stats (project_id, total, {', '.join(TASK_STATUSES)}) "
+            f"SELECT project_id, COUNT(*), {sums} FROM tasks GROUP BY project_id")
+
+
+def _project_stats_triggers() -> List[Statement]:
+    return [
+        lambda codec: f'''
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_insert_project_stats
+            AFTER INSERT ON tasks
+            BEGIN
+                {_project_stats_add(codec, 'NEW')}
+            END
+        ''',
+        lambda codec: f'''
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_delete_project_stats
+            AFTER DELETE ON tasks
+            BEGIN
+                {_project_stats_remove(codec, 'OLD')}
+            END
+        ''',
+        lambda codec: f'''
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_update_project_stats
+            AFTER UPDATE OF status, project_id ON tasks
+            WHEN OLD.status IS NOT NEW.status OR OLD.project_id IS NOT NEW.project_id
+            BEGIN
+                {_project_stats_remove(codec, 'OLD')}
+                {_project_stats_add(codec, 'NEW')}
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_projects_delete_project_stats
+            AFTER DELETE ON projects
+            BEGIN
+                DELETE FROM project_stats WHERE project_id = OLD.id;
+            END
+        ''',
+    ]
+
+
+# Нагрузка пользователя: незавершённые задачи, задачи в работе и ближайший
+# срок среди незавершённых. Ближайший срок после удаления или изменения задачи
+# пересчитывается по частичному индексу idx_tasks_assignee_open_due.
+def _open_flag(codec: StorageCodec, row: str) -> str:
+    return f"({row}.status != {codec.literal('tasks', 'status', 'completed')})"
+
+
+def _next_due_date(codec: StorageCodec, assignee: str) -> str:
+    return (f"(SELECT MIN(due_date) FROM tasks WHERE assignee_id = {assignee} "
+            f"AND status != {codec.literal('tasks', 'status', 'completed')})")
+
+
+def _user_workload_add(codec: StorageCodec, row: str) -> str:
+    return (f"INSERT INTO user_workload (user_id, open, in_progress, next_due_date) "
+            f"VALUES ({row}.assignee_id, {_open_flag(codec, row)}, "
+            f"({row}.status = {codec.literal('tasks', 'status', 'in_progress')}), "
+            f"CASE WHEN {_open_flag(codec, row)} THEN {row}.due_date END) "
+            f"ON CONFLICT(user_id) DO UPDATE SET open = open + excluded.open, "
+            f"in_progress = in_progress + excluded.in_progress, "
+            f"next_due_date = min(coalesce(next_due_date, excluded.next_due_date), "
+            f"coalesce(excluded.next_due_date, next_due_date));")
+
+
+def _user_workload_remove(codec: StorageCodec, row: str) -> str:
+    return (f"UPDATE user_workload SET open = open - {_open_flag(codec, row)}, "
+            f"in_progress = in_progress - "
+            f"({row}.status = {codec.literal('tasks', 'status', 'in_progress')}), "
+            f"next_due_date = {_next_due_date(codec, f'{row}.assignee_id')} "
+            f"WHERE user_id = {row}.assignee_id;")
+
+
+def _user_workload_fill(codec: StorageCodec) -> str:
+    # Пересчёт целиком: выполняется и после перестройки таблиц, когда
+    # ближайшие сроки нужно перевести в новый формат дат
+    return (f"INSERT OR REPLACE INTO user_workload (user_id, open, in_progress, next_due_date) "
+            f"SELECT assignee_id, SUM{_open_flag(codec, 'tasks')}, "
+            f"SUM(tasks.status = {codec.literal('tasks', 'status', 'in_progress')}), "
+            f"MIN(CASE WHEN {_open_flag(codec, 'tasks')} THEN due_date END) "
+            f"FROM tasks GROUP BY assignee_id")
+
+
+def _user_workload_objects() -> List[Statement]:
+    return [
+        lambda codec: "CREATE INDEX IF NOT EXISTS idx_tasks_assignee_open_due "
+                      "ON tasks(assignee_id, due_date) "
+                      f"WHERE status != {codec.literal('tasks', 'status', 'completed')}",
+        lambda codec: f'''
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_insert_user_workload
+            AFTER INSERT ON tasks
+            BEGIN
+                {_user_workload_add(codec, 'NEW')}
+            END
+        ''',
+        lambda codec: f'''
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_delete_user_workload
+            AFTER DELETE ON tasks
+            BEGIN
+                {_user_workload_remove(codec, 'OLD')}
+            END
+        ''',
+        lambda codec: f'''
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_update_user_workload
+            AFTER UPDATE OF status, due_date, assignee_id ON tasks
+            WHEN OLD.status IS NOT NEW.status OR OLD.due_date IS NOT NEW.due_date
+                OR OLD.assignee_id IS NOT NEW.assignee_id
+            BEGIN
+                {_user_workload_remove(codec, 'OLD')}
+                {_user_workload_add(codec, 'NEW')}
+            END
+        ''',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_users_delete_user_workload
+            AFTER DELETE ON users
+            BEGIN
+                DELETE FROM user_workload WHERE user_id = OLD.id;
+            END
+        ''',
+        _user_workload_fill,
+    ]
+
+
+MIGRATIONS = [
+    Migration(1, "Базовая схема: пользователи, проекты, задачи", statements=[
+        '''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL UNIQUE,
+                email TEXT NOT NULL UNIQUE,
+                role TEXT NOT NULL CHECK(role IN ('admin', 'manager', 'developer')),
+                registration_date TEXT NOT NULL
+            )
+        ''',
+        '''
+            CREATE TABLE IF NOT EXISTS projects (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                description TEXT,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                status TEXT NOT NULL CHECK(status IN ('active', 'completed', 'on_hold'))
+            )
+        ''',
+        '''
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                description TEXT,
+                priority INTEGER NOT NULL CHECK(priority IN (1, 2, 3)),
+                status TEXT NOT NULL CHECK(status IN ('pending', 'in_progress', 'completed')),
+                due_date TEXT NOT NULL,
+                project_id INTEGER NOT NULL,
+                assignee_id INTEGER NOT NULL,
+                FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE,
+                FOREIGN KEY (assignee_id) REFERENCES users (id) ON DELETE CASCADE
+            )
+        ''',
+    ], objects=[
+        'CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status)',
+        'CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority)',
+    ]),
+    # Порядок столбцов совпадает с WHERE и ORDER BY списочных запросов,
+    # поэтому строки читаются из индекса уже отсортированными, без временного
+    # B-дерева. Индексы по project_id и assignee_id становятся префиксами
+    # составных и больше не нужны.
+    Migration(2, "Составные индексы для списочных запросов", statements=[
+        'DROP INDEX IF EXISTS idx_tasks_project_id',
+        'DROP INDEX IF EXISTS idx_tasks_assignee_id',
+    ], objects=[
+        'CREATE INDEX IF NOT EXISTS idx_tasks_project_priority_due '
+        'ON tasks(project_id, priority, due_date)',
+        'CREATE INDEX IF NOT EXISTS idx_tasks_assignee_due_priority '
+        'ON tasks(assignee_id, due_date, priority)',
+        'CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date)',
+        lambda codec: "CREATE INDEX IF NOT EXISTS idx_tasks_open_due_date ON tasks(due_date) "
+                      f"WHERE status != {codec.literal('tasks', 'status', 'completed')}",
+        'CREATE INDEX IF NOT EXISTS idx_projects_start_date ON projects(start_date)',
+    ]),
+    Migration(3, "Журнал изменений и триггеры для инкрементальной синхронизации", statements=[
+        '''
+            CREATE TABLE IF NOT EXISTS change_log (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                op TEXT NOT NULL CHECK(op IN ('insert', 'update', 'delete')),
+                entity TEXT NOT NULL,
+                entity_id INTEGER NOT NULL,
+                changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+            )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_change_log_entity ON change_log(entity, entity_id)',
+    ], objects=_change_log_triggers()),
+    # Счётчики заполняются в той же транзакции, что и создание триггеров,
+    # поэтому изменения задач между этими шагами не теряются
+    Migration(4, "Счётчики задач проектов для расчёта прогресса", statements=[
+        '''
+            CREATE TABLE IF NOT EXISTS project_stats (
+                project_id INTEGER PRIMARY KEY,
+                total INTEGER NOT NULL DEFAULT 0,
+                pending INTEGER NOT NULL DEFAULT 0,
+                in_progress INTEGER NOT NULL DEFAULT 0,
+                completed INTEGER NOT NULL DEFAULT 0
+            )
+        ''',
+    ], finalize=[_project_stats_fill], objects=_project_stats_triggers()),
+    # Тип next_due_date не объявлен: в нём хранится значение due_date в формате
+    # текущего режима хранения, а объекты миграции пересчитывают таблицу
+    Migration(5, "Нагрузка пользователей: открытые задачи и ближайший срок", statements=[
+        '''
+            CREATE TABLE IF NOT EXISTS user_workload (
+                user_id INTEGER PRIMARY KEY,
+                open INTEGER NOT NULL DEFAULT 0,
+                in_progress INTEGER NOT NULL DEFAULT 0,
+                next_due_date
+            )
+        ''',
+    ], objects=_user_workload_objects()),
+]
+
+
+class MigrationRunner:
+    def __init__(self, connection: sqlite3.Connection,
+                 migrations: Sequence[Migration] = MIGRATIONS,
+                 codec: Optional[StorageCodec] = None) -> None:
+        self.connection = connection
+        self.migrations = sorted(migrations, key=lambda m: m.version)
+        self.codec = codec or StorageCodec.detect(connection)
+
+    @property
+    def latest_version(self) -> int:
+        return self.migrations[-1].version if self.migrations else 0
+
+    def current_version(self) -> int:
+        return self.connection.execute("PRAGMA user_version").fetchone()[0]
+
+    def pending(self, target: Optional[int] = None) -> List[Migration]:
+        current = self.current_version()
+        target = self.latest_version if target is None else target
+        return [m for m in self.migrations if current < m.version <= target]
+
+    def migrate(self, target: Optional[int] = None, dry_run: bool = False,
+                progress_callback: Optional[Callable[[str, int], None]] = None) -> List[Dict]:
+        pending = self.pending(target)
+        if dry_run:
+            return [migration.plan(self.codec) for migration in pending]
+
+        applied = []
+        for migration in pending:
+            self._apply(migration, progress_callback)
+            applied.append(migration.plan(self.codec))
+        return applied
+
+    def rebuild_storage(self, target: StorageCodec, dry_run: bool = False) -> List[str]:
+        # Тип и CHECK столбца в SQLite нельзя изменить через ALTER, поэтому таблицы
+        # пересоздаются: новая таблица, копирование с перекодированием, удаление
+        # старой и переименование. Индексы и триггеры удаляются вместе со старой
+        # таблицей и заново строятся для нового режима из objects миграций.
+        statements = []
+        for table in REBUILD_ORDER:
+            statements += self._copy_table(table, target)
+        statements += self._rebuild_objects(target)
+
+        if dry_run or target == self.codec:
+            return statements if dry_run else []
+
+        self._run_without_foreign_keys(statements)
+        self.codec = target
+        return statements
+
+    def _copy_table(self, table: str, target: StorageCodec) -> List[str]:
+        temp = f"{table}__rebuild"
+        columns = [column for column, _ in TABLE_COLUMNS[table]]
+        expressions = [target.copy_expression(table, column, self.codec) for column in columns]
+        return [
+            target.table_ddl(table, temp),
+            f"INSERT INTO {temp} ({', '.join(columns)}) "
+            f"SELECT {', '.join(expressions)} FROM {table}",
+            f"DELETE FROM sqlite_sequence WHERE name = '{temp}'",
+            f"INSERT INTO sqlite_sequence (name, seq) "
+            f"SELECT '{temp}', seq FROM sqlite_sequence WHERE name = '{table}'",
+            f"DROP TABLE {table}",
+            f"ALTER TABLE {temp} RENAME TO {table}",
+        ]
+
+    def _rebuild_objects(self, target: StorageCodec) -> List[str]:
+        current = self.current_version()
+        return [render(s, target) for migration in self.migrations
+                if migration.version <= current for s in migration.objects]
+
+    def _run_without_foreign_keys(self, statements: Sequence[str]) -> None:
+        # Пока таблицы пересоздаются, ссылки на них временно недействительны,
+        # поэтому внешние ключи проверяются один раз в конце
+        if self.connection.in_transaction:
+            self.connection.commit()
+        self.connection.execute("PRAGMA foreign_keys = OFF")
+        try:
+            self.connection.execute("BEGIN")
+            for statement in statements:
+                self.connection.execute(statement)
+            if self.connection.execute("PRAGMA foreign_key_check").fetchone():
+                raise sqlite3.IntegrityError("Нарушение внешних ключей после перестройки таблиц")
+            self.connection.commit()
+        except sqlite3.Error:
+            self.connection.rollback()
+            raise
+        finally:
+            self.connection.execute("PRAGMA foreign_keys = ON")
+
+    def _apply(self, migration: Migration, progress_callback) -> None:
+        # Шаги идемпотентны: если миграция прервалась между транзакциями,
+        # user_version не изменился и шаг просто повторяется целиком.
+        self._run_in_transaction([render(s, self.codec) for s in migration.statements])
+        for backfill in migration.backfills:
+            backfill.run(self.connection, progress_callback)
+        final = [render(s, self.codec) for s in migration.finalize + migration.objects]
+        self._run_in_transaction(final + [f"PRAGMA user_version = {migration.version}"])
+
+    def _run_in_transaction(self, statements: Sequence[str]) -> None:
+        if self.connection.in_transaction:
+            self.connection.commit()
+        try:
+            self.connection.execute("BEGIN")
+            for statement in statements:
+                self.connection.execute(statement)
+            self.connection.commit()
+        except sqlite3.Error:
+            self.connection.rollback()
+            raise
@@ -0,0 +1,40 @@
+from typing import Iterable, List, Optional, Tuple
+
+from database.storage import TABLE_COLUMNS
+from models.deferred import PREVIEW_LENGTH
+
+PREVIEW_COLUMN = 'description_preview'
+
+# Превью считается в SQL, поэтому в Python не копируется полный текст описания
+PREVIEW_SQL = (f"substr(ifnull(description, ''), 1, {PREVIEW_LENGTH}) || "
+               f"CASE WHEN length(description) > {PREVIEW_LENGTH} THEN '...' ELSE '' END")
+
+
+def normalize(table: str, columns: Optional[Iterable[str]]) -> Optional[Tuple[str, ...]]:
+    # Столбцы приводятся к порядку таблицы, чтобы одинаковые проекции давали
+    # один и тот же текст запроса; id выбирается всегда
+    if columns is None:
+        return None
+    columns = set(columns)
+    known = [name for name, _ in TABLE_COLUMNS[table]]
+    allowed = set(known)
+    if 'description' in allowed:
+        allowed.add(PREVIEW_COLUMN)
+    unknown = columns - allowed
+    if unknown:
+        raise ValueError(f"Неизвестные столбцы таблицы {table}: {sorted(unknown)}")
+    selected = [name for name in known if name == 'id' or name in columns]
+    if PREVIEW_COLUMN in columns:
+        selected.append(PREVIEW_COLUMN)
+    return tuple(selected)
+
+
+def select_list(columns: Optional[Tuple[str, ...]]) -> str:
+    if columns is None:
+        return '*'
+    return ", ".join(f"{PREVIEW_SQL} AS {PREVIEW_COLUMN}" if name == PREVIEW_COLUMN else name
+                     for name in columns)
+
+
+def deferred_columns(table: str, columns: Tuple[str, ...]) -> List[str]:
+    return [name for name, _ in TABLE_COLUMNS[table] if name not in columns]
@@ -0,0 +1,58 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+
+class QueryCache:
+    # Каждая запись хранит версии таблиц, из которых построен результат.
+    # Любая запись в таблицу увеличивает её версию, и все зависящие от неё
+    # результаты становятся недействительными без явного перебора ключей.
+    def __init__(self, max_entries: int = 64) -> None:
+        if max_entries < 0:
+            raise ValueError("Размер кэша не может быть отрицательным")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._versions: Dict[str, int] = {}
+        self._entries: "OrderedDict[Hashable, Tuple[Tuple[int, ...], Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def version(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    def get(self, key: Hashable, tables: Iterable[str]) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != self._snapshot(tables):
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, tables: Iterable[str], result: Any) -> None:
+        if self.max_entries == 0:
+            return
+        self._entries[key] = (self._snapshot(tables), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def bump(self, *tables: str) -> None:
+        for table in tables:
+            self._versions[table] = self._versions.get(table, 0) + 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'max_size': self.max_entries,
+            'versions': dict(self._versions)
+        }
+
+    def _snapshot(self, tables):
+        return tuple(self._versions.get(table, 0) for table in tables)
@@ -0,0 +1,36 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class RelationLoader:
+    # Загрузчик связи в духе DataLoader для одной выборки. Первое обращение
+    # к связи любой записи выборки загружает связанные записи всех её записей
+    # одним пакетным запросом, поэтому обход списка с task.project стоит
+    # одного запроса, а не запроса на каждую задачу. Результаты живут, пока
+    # не изменилась связанная таблица.
+    def __init__(self, entities: List[Any], key: str,
+                 fetch_many: Callable[[Iterable[int]], Dict[int, Any]],
+                 version: Callable[[], int]) -> None:
+        self._entities = entities
+        self._key = key
+        self._fetch_many = fetch_many
+        self._version = version
+        self._loaded_version: Optional[int] = None
+        self._results: Dict[int, Any] = {}
+
+    def load(self, key: Optional[int]) -> Optional[Any]:
+        if key is None:
+            return None
+        version = self._version()
+        if version != self._loaded_version:
+            self._results = {}
+            self._loaded_version = version
+        if key not in self._results:
+            # Ключ берётся из __dict__, чтобы не догружать отложенные столбцы
+            keys = {entity.__dict__.get(self._key) for entity in self._entities}
+            keys.add(key)
+            keys.discard(None)
+            keys.difference_update(self._results)
+            found = self._fetch_many(sorted(keys))
+            for missing in keys:
+                self._results[missing] = found.get(missing)
+        return self._results[key]
@@ -0,0 +1,174 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+
+TASK_STATUSES = ('pending', 'in_progress', 'completed')
+PROJECT_STATUSES = ('active', 'completed', 'on_hold')
+USER_ROLES = ('admin', 'manager', 'developer')
+
+ENUM_COLUMNS: Dict[Tuple[str, str], Tuple[str, ...]] = {
+    ('tasks', 'status'): TASK_STATUSES,
+    ('projects', 'status'): PROJECT_STATUSES,
+    ('users', 'role'): USER_ROLES,
+}
+
+DATE_COLUMNS = {
+    ('tasks', 'due_date'),
+    ('projects', 'start_date'),
+    ('projects', 'end_date'),
+    ('users', 'registration_date'),
+}
+
+# Канонический вид основных таблиц. Тип None означает, что тип столбца
+# зависит от режима хранения и выбирается кодеком.
+TABLE_COLUMNS: Dict[str, List[Tuple[str, Optional[str]]]] = {
+    'users': [
+        ('id', 'INTEGER PRIMARY KEY AUTOINCREMENT'),
+        ('username', 'TEXT NOT NULL UNIQUE'),
+        ('email', 'TEXT NOT NULL UNIQUE'),
+        ('role', None),
+        ('registration_date', None),
+    ],
+    'projects': [
+        ('id', 'INTEGER PRIMARY KEY AUTOINCREMENT'),
+        ('name', 'TEXT NOT NULL'),
+        ('description', 'TEXT'),
+        ('start_date', None),
+        ('end_date', None),
+        ('status', None),
+    ],
+    'tasks': [
+        ('id', 'INTEGER PRIMARY KEY AUTOINCREMENT'),
+        ('title', 'TEXT NOT NULL'),
+        ('description', 'TEXT'),
+        ('priority', 'INTEGER NOT NULL CHECK(priority IN (1, 2, 3))'),
+        ('status', None),
+        ('due_date', None),
+        ('project_id', 'INTEGER NOT NULL'),
+        ('assignee_id', 'INTEGER NOT NULL'),
+    ],
+}
+
+# Даты в режиме epoch хранятся как целые секунды от начала эпохи. Наивные
+# datetime моделей считаются UTC, поэтому значения совпадают со strftime('%s')
+# SQLite и не зависят от часового пояса машины.
+EPOCH_TYPE = 'EPOCH'
+EPOCH = datetime(1970, 1, 1)
+
+TABLE_CONSTRAINTS: Dict[str, List[str]] = {
+    'tasks': [
+        'FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE',
+        'FOREIGN KEY (assignee_id) REFERENCES users (id) ON DELETE CASCADE',
+    ],
+}
+
+
+def to_epoch(value: datetime) -> int:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // timedelta(seconds=1)
+
+
+def from_epoch(value: int) -> datetime:
+    return EPOCH + timedelta(seconds=value)
+
+
+def _convert_epoch(value: bytes) -> datetime:
+    return from_epoch(int(value))
+
+
+# Объявленный тип EPOCH имеет числовую аффинность, поэтому SQLite хранит
+# значения как INTEGER, а соединения с PARSE_DECLTYPES сразу получают datetime.
+sqlite3.register_converter(EPOCH_TYPE, _convert_epoch)
+
+
+class StorageCodec:
+    # Преобразует значения модели в формат хранения и обратно. В компактном
+    # режиме статусы и роли хранятся как индексы в кортежах выше, в режиме
+    # epoch_dates даты хранятся как целые секунды.
+    def __init__(self, compact_enums: bool = False, epoch_dates: bool = False) -> None:
+        self.compact_enums = compact_enums
+        self.epoch_dates = epoch_dates
+        self._codes = {key: {value: code for code, value in enumerate(values)}
+                       for key, values in ENUM_COLUMNS.items()}
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, StorageCodec) and self.options() == other.options()
+
+    def options(self) -> Dict[str, bool]:
+        return {'compact_enums': self.compact_enums, 'epoch_dates': self.epoch_dates}
+
+    @classmethod
+    def detect(cls, connection: sqlite3.Connection) -> "StorageCodec":
+        columns = {row[1]: (row[2] or '').upper()
+                   for row in connection.execute("PRAGMA table_info(tasks)")}
+        return cls(compact_enums=columns.get('status', 'TEXT').startswith('INTEGER'),
+                   epoch_dates=columns.get('due_date', 'TEXT').startswith(EPOCH_TYPE))
+
+    def encode(self, table: str, column: str, value: Any) -> Any:
+        if isinstance(value, datetime):
+            return self.encode_date(value)
+        if self.compact_enums and isinstance(value, str):
+            codes = self._codes.get((table, column))
+            if codes is not None and value in codes:
+                return codes[value]
+        return value
+
+    def decode(self, table: str, column: str, value: Any) -> Any:
+        if self.compact_enums and isinstance(value, int):
+            values = ENUM_COLUMNS.get((table, column))
+            if values is not None:
+                return values[value]
+        return value
+
+    def encode_date(self, value: Optional[datetime]) -> Any:
+        if not value:
+            return None
+        return to_epoch(value) if self.epoch_dates else value.isoformat()
+
+    def decode_date(self, value: Any) -> Optional[datetime]:
+        if value is None or isinstance(value, datetime):
+            return value
+        if isinstance(value, int):
+            return from_epoch(value)
+        return datetime.fromisoformat(value) if value else None
+
+    def literal(self, table: str, column: str, value: Any) -> str:
+        encoded = self.encode(table, column, value)
+        if isinstance(encoded, str):
+            return "'" + encoded.replace("'", "''") + "'"
+        return str(encoded)
+
+    def column_type(self, table: str, column: str) -> str:
+        values = ENUM_COLUMNS.get((table, column))
+        if values is not None:
+            allowed = ", ".join(self.literal(table, column, value) for value in values)
+            base = 'INTEGER' if self.compact_enums else 'TEXT'
+            return f"{base} NOT NULL CHECK({column} IN ({allowed}))"
+        if (table, column) in DATE_COLUMNS:
+            return f"{EPOCH_TYPE if self.epoch_dates else 'TEXT'} NOT NULL"
+        raise KeyError(f"{table}.{column}")
+
+    def table_ddl(self, table: str, name: Optional[str] = None) -> str:
+        definitions = [
+            f"{column} {column_type or self.column_type(table, column)}"
+            for column, column_type in TABLE_COLUMNS[table]
+        ]
+        definitions += TABLE_CONSTRAINTS.get(table, [])
+        body = ",\n    ".join(definitions)
+        return f"CREATE TABLE {name or table} (\n    {body}\n)"
+
+    def copy_expression(self, table: str, column: str, source: "StorageCodec") -> str:
+        if (table, column) in DATE_COLUMNS and source.epoch_dates != self.epoch_dates:
+            if self.epoch_dates:
+                return f"CAST(strftime('%s', {column}) AS INTEGER)"
+            return f"strftime('%Y-%m-%dT%H:%M:%S', {column}, 'unixepoch')"
+        values = ENUM_COLUMNS.get((table, column))
+        if values is None or source.compact_enums == self.compact_enums:
+            return column
+        cases = " ".join(
+            f"WHEN {source.literal(table, column, value)} THEN {self.literal(table, column, value)}"
+            for value in values
+        )
+        return f"CASE {column} {cases} ELSE {column} END"
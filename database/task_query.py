@@ -0,0 +1,163 @@
+import copy
+import functools
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from database.projection import normalize, select_list
+from database.storage import TASK_STATUSES
+
+PLAN_CACHE_SIZE = 256
+SORT_FIELDS = ('due_date', 'priority', 'title', 'status', 'id')
+DEFAULT_ORDER = (('due_date', 'ASC'),)
+
+
+class TaskQuery:
+    # Неизменяемый построитель: каждый метод возвращает новый запрос, поэтому
+    # общие заготовки фильтров можно безопасно дополнять в разных местах
+    def __init__(self) -> None:
+        self.text: Optional[str] = None
+        self.statuses: Tuple[str, ...] = ()
+        self.priorities: Tuple[int, ...] = ()
+        self.project_id: Optional[int] = None
+        self.assignee_id: Optional[int] = None
+        self.due_from: Optional[datetime] = None
+        self.due_to: Optional[datetime] = None
+        self.overdue_only = False
+        self.order: Tuple[Tuple[str, str], ...] = DEFAULT_ORDER
+        self.limit_count: Optional[int] = None
+        self.offset_count = 0
+        self.columns: Optional[Tuple[str, ...]] = None
+
+    def _with(self, **changes) -> "TaskQuery":
+        query = copy.copy(self)
+        for name, value in changes.items():
+            setattr(query, name, value)
+        return query
+
+    def search(self, text: Optional[str]) -> "TaskQuery":
+        return self._with(text=text or None)
+
+    def with_status(self, *statuses: str) -> "TaskQuery":
+        for status in statuses:
+            if status not in TASK_STATUSES:
+                raise ValueError(f"Статус должен быть одним из: {list(TASK_STATUSES)}")
+        # Порядок значений фиксирован, чтобы одинаковые фильтры давали один текст SQL
+        return self._with(statuses=tuple(s for s in TASK_STATUSES if s in statuses))
+
+    def with_priority(self, *priorities: int) -> "TaskQuery":
+        for priority in priorities:
+            if priority not in (1, 2, 3):
+                raise ValueError("Приоритет должен быть 1 (высокий), 2 (средний) или 3 (низкий)")
+        return self._with(priorities=tuple(sorted(set(priorities))))
+
+    def in_project(self, project_id: Optional[int]) -> "TaskQuery":
+        return self._with(project_id=project_id)
+
+    def assigned_to(self, user_id: Optional[int]) -> "TaskQuery":
+        return self._with(assignee_id=user_id)
+
+    def due_between(self, start: Optional[datetime] = None,
+                    end: Optional[datetime] = None) -> "TaskQuery":
+        if start is not None and end is not None and start >= end:
+            raise ValueError("Начало диапазона должно быть раньше конца")
+        return self._with(due_from=start, due_to=end)
+
+    def overdue(self, flag: bool = True) -> "TaskQuery":
+        return self._with(overdue_only=flag)
+
+    def order_by(self, *fields: str) -> "TaskQuery":
+        # Поле с префиксом '-' сортируется по убыванию: order_by('priority', '-due_date')
+        order = []
+        for field in fields:
+            name = field.lstrip('-')
+            if name not in SORT_FIELDS:
+                raise ValueError(f"Сортировка возможна только по полям: {list(SORT_FIELDS)}")
+            order.append((name, 'DESC' if field.startswith('-') else 'ASC'))
+        return self._with(order=tuple(order) or DEFAULT_ORDER)
+
+    def select(self, *columns: str) -> "TaskQuery":
+        # Проекция: невыбранные столбцы загружаются при первом обращении к ним
+        return self._with(columns=normalize('tasks', columns) if columns else None)
+
+    def limit(self, count: Optional[int], offset: int = 0) -> "TaskQuery":
+        if (count is not None and count < 0) or offset < 0:
+            raise ValueError("Лимит и смещение не могут быть отрицательными")
+        return self._with(limit_count=count, offset_count=offset)
+
+    def shape(self) -> tuple:
+        # Форма запроса: какие условия заданы, но не их значения
+        return (
+            self.text is not None, len(self.statuses), len(self.priorities),
+            self.project_id is not None, self.assignee_id is not None,
+            self.due_from is not None, self.due_to is not None,
+            self.overdue_only, self.order, self._paged(), self.columns,
+        )
+
+    def _paged(self) -> bool:
+        return self.limit_count is not None or self.offset_count > 0
+
+    def build(self, codec, now: Optional[datetime] = None) -> Tuple[str, Tuple[Any, ...]]:
+        sql = compile_sql(self.shape(), codec.literal('tasks', 'status', 'completed'))
+        params = self._filter_params(codec, now)
+        if self._paged():
+            # LIMIT -1 в SQLite означает «без ограничения», смещение сохраняется
+            params += [-1 if self.limit_count is None else self.limit_count, self.offset_count]
+        return sql, tuple(params)
+
+    def _filter_params(self, codec, now: Optional[datetime]) -> List[Any]:
+        params: List[Any] = []
+        if self.text is not None:
+            pattern = f"%{escape_like(self.text)}%"
+            params += [pattern, pattern]
+        params += [codec.encode('tasks', 'status', status) for status in self.statuses]
+        params += self.priorities
+        params += [value for value in (self.project_id, self.assignee_id) if value is not None]
+        params += [codec.encode_date(value) for value in (self.due_from, self.due_to)
+                   if value is not None]
+        if self.overdue_only:
+            params.append(codec.encode_date(now or datetime.now()))
+        return params
+
+
+def escape_like(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+@functools.lru_cache(maxsize=PLAN_CACHE_SIZE)
+def compile_sql(shape: tuple, completed_literal: str) -> str:
+    # Текст SQL зависит только от формы запроса, поэтому строится один раз,
+    # а кэш подготовленных выражений sqlite3 переиспользует его план
+    *filters, order, has_limit, columns = shape
+    sql = f"SELECT {select_list(columns)} FROM tasks"
+    conditions = where_conditions(tuple(filters), completed_literal)
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += order_clause(order)
+    if has_limit:
+        sql += " LIMIT ? OFFSET ?"
+    return sql
+
+
+def where_conditions(filters: tuple, completed_literal: str) -> List[str]:
+    (has_text, status_count, priority_count, has_project, has_assignee,
+     has_from, has_to, overdue_only) = filters
+    conditions = []
+    if has_text:
+        conditions.append("(title LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\')")
+    if status_count:
+        conditions.append(f"status IN ({', '.join('?' * status_count)})")
+    if priority_count:
+        conditions.append(f"priority IN ({', '.join('?' * priority_count)})")
+    # Простые условия равенства и диапазона идут в порядке параметров build()
+    conditions += [condition for flag, condition in (
+        (has_project, "project_id = ?"), (has_assignee, "assignee_id = ?"),
+        (has_from, "due_date >= ?"), (has_to, "due_date < ?")) if flag]
+    if overdue_only:
+        # Литерал, а не параметр: только так SQLite выбирает частичный
+        # индекс idx_tasks_open_due_date
+        conditions.append(f"status != {completed_literal} AND due_date < ?")
+    return conditions
+
+
+def order_clause(order: Tuple[Tuple[str, str], ...]) -> str:
+    return " ORDER BY " + ", ".join(f"{field} {direction}" for field, direction in order)
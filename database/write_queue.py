@@ -0,0 +1,206 @@
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Tuple
+
+from models.task import Task
+from models.project import Project
+from models.user import User
+from database.database_manager import DatabaseManager
+
+WRITE_BATCH_SIZE = 256
+# Сколько секунд группа ждёт новых команд после первой
+WRITE_BATCH_DELAY = 0.0005
+# Методы DatabaseManager, которые выполняются через очередь
+WRITE_METHODS = frozenset({
+    'add_task', 'update_task', 'delete_task',
+    'add_project', 'update_project', 'delete_project', 'delete_projects',
+    'purge_completed_projects',
+    'add_user', 'update_user', 'delete_user', 'delete_users',
+})
+# Команды, которые присваивают ID добавленному объекту
+ADD_METHODS = frozenset({'add_task', 'add_project', 'add_user'})
+SAVEPOINT = "write_command"
+_STOP = object()
+
+
+class WriteQueue:
+    # Единственный писатель базы: отдельный поток забирает команды записи
+    # из очереди и фиксирует их группами, одной транзакцией на группу.
+    # Производители не борются за блокировку записи SQLite и не ждут
+    # отдельной фиксации на каждую запись. Каждая команда выполняется в своей
+    # точке сохранения, поэтому её ошибка не откатывает остальную группу.
+    # Результат команды передаётся в Future только после фиксации группы.
+    def __init__(self, db_path: str = "tasks.db", batch_size: int = WRITE_BATCH_SIZE,
+                 max_delay: float = WRITE_BATCH_DELAY) -> None:
+        if batch_size < 1:
+            raise ValueError("Размер группы должен быть положительным")
+        if max_delay < 0:
+            raise ValueError("Задержка группы не может быть отрицательной")
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.batches = 0
+        self.commands = 0
+        self._last_batch = 0
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+        # Соединение sqlite3 создаётся в потоке писателя, который им пользуется
+        started: Future = Future()
+        self._thread = threading.Thread(target=self._run, args=(started,),
+                                        name="sqlite-writer", daemon=True)
+        self._thread.start()
+        started.result()
+
+    def __enter__(self) -> "WriteQueue":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def submit(self, method: str, *args, **kwargs) -> Future:
+        if method not in WRITE_METHODS:
+            raise ValueError(f"Метод {method} не является командой записи")
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise Exception("Очередь записи закрыта")
+            self._queue.put((future, method, args, kwargs))
+        return future
+
+    def add_task(self, task: Task) -> Future:
+        return self.submit('add_task', task)
+
+    def update_task(self, task_id: int, **kwargs) -> Future:
+        return self.submit('update_task', task_id, **kwargs)
+
+    def delete_task(self, task_id: int) -> Future:
+        return self.submit('delete_task', task_id)
+
+    def add_project(self, project: Project) -> Future:
+        return self.submit('add_project', project)
+
+    def update_project(self, project_id: int, **kwargs) -> Future:
+        return self.submit('update_project', project_id, **kwargs)
+
+    def delete_project(self, project_id: int) -> Future:
+        return self.submit('delete_project', project_id)
+
+    def add_user(self, user: User) -> Future:
+        return self.submit('add_user', user)
+
+    def update_user(self, user_id: int, **kwargs) -> Future:
+        return self.submit('update_user', user_id, **kwargs)
+
+    def delete_user(self, user_id: int) -> Future:
+        return self.submit('delete_user', user_id)
+
+    def close(self) -> None:
+        # Команды, поставленные до закрытия, выполняются и фиксируются
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'batches': self.batches,
+            'commands': self.commands,
+            'avg_batch': round(self.commands / self.batches, 2) if self.batches else 0.0,
+        }
+
+    def _run(self, started: Future) -> None:
+        try:
+            db = DatabaseManager(self.db_path)
+        except Exception as e:
+            started.set_exception(e)
+            return
+        started.set_result(None)
+        try:
+            stopping = False
+            while not stopping:
+                batch, stopping = self._collect()
+                if batch:
+                    self._commit_batch(db, batch)
+        finally:
+            db.close()
+
+    def _collect(self) -> Tuple[List[tuple], bool]:
+        # Группа закрывается по размеру или через max_delay после первой
+        # команды; уже поставленные команды забираются и после задержки.
+        # После группы из одной команды не ждём: единственный производитель
+        # иначе терял бы max_delay на каждой записи
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        delay = 0.0 if self._last_batch == 1 else self.max_delay
+        deadline = time.monotonic() + delay
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 \
+                    else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _commit_batch(self, db: DatabaseManager, batch: List[tuple]) -> None:
+        connection = db.connection
+        try:
+            outcomes = self._execute_batch(db, batch)
+            connection.deferred_commit = False
+            connection.commit()
+        except sqlite3.Error as e:
+            self._fail_batch(db, batch, e)
+            return
+
+        self.batches += 1
+        self.commands += len(outcomes)
+        self._last_batch = len(batch)
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def _execute_batch(self, db: DatabaseManager, batch: List[tuple]) -> List[tuple]:
+        connection = db.connection
+        connection.execute("BEGIN IMMEDIATE")
+        connection.deferred_commit = True
+        outcomes = []
+        for future, method, args, kwargs in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            connection.execute(f"SAVEPOINT {SAVEPOINT}")
+            try:
+                outcomes.append((future, getattr(db, method)(*args, **kwargs), None))
+            except Exception as e:
+                connection.execute(f"ROLLBACK TO {SAVEPOINT}")
+                outcomes.append((future, None, e))
+            connection.execute(f"RELEASE {SAVEPOINT}")
+        return outcomes
+
+    def _fail_batch(self, db: DatabaseManager, batch: List[tuple], error: sqlite3.Error) -> None:
+        connection = db.connection
+        connection.deferred_commit = False
+        if connection.in_transaction:
+            connection.rollback()
+        # Кэши писателя могли увидеть изменения откаченной группы
+        db.clear_cache()
+        failure = Exception(f"Ошибка базы данных: {error}")
+        for future, method, args, kwargs in batch:
+            # Выполненные команды добавления успели записать ID в свои объекты
+            if future.running() and method in ADD_METHODS:
+                for entity in (args or tuple(kwargs.values()))[:1]:
+                    entity.id = None
+            if future.running() or future.set_running_or_notify_cancel():
+                future.set_exception(failure)
@@ -4,44 +4,69 @@
 Запускает GUI приложение с использованием архитектуры MVC
 """
 
+import atexit
 import os
 import sys
 from tkinter import messagebox
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-try:
-    from controllers.task_controller import TaskController
-    from controllers.project_controller import ProjectController
-    from controllers.user_controller import UserController
-    from database.database_manager import DatabaseManager
-    from views.main_window import MainWindow
-    from models.task import Task
-    from models.project import Project
-    from models.user import User
-except ImportError as e:
-    print(f"Ошибка импорта модулей: {e}")
-    print("Убедитесь, что все файлы проекта созданы")
-    print("Структура проекта должна содержать:")
-    print("  controllers/ - task_controller.py, project_controller.py, user_controller.py")
-    print("  views/ - main_window.py")
-    print("  models/ - task.py, project.py, user.py")
-    print("  database/ - database_manager.py")
-    sys.exit(1)
+
+def import_main_window():
+    """Импорт главного окна; модули приложения загружаются только при запуске GUI"""
+    try:
+        from views.main_window import MainWindow
+    except ImportError as e:
+        print(f"Ошибка импорта модулей: {e}")
+        print("Убедитесь, что все файлы проекта созданы")
+        print("Структура проекта должна содержать:")
+        print("  controllers/ - task_controller.py, project_controller.py, user_controller.py")
+        print("  views/ - main_window.py")
+        print("  models/ - task.py, project.py, user.py")
+        print("  database/ - database_manager.py")
+        sys.exit(1)
+    return MainWindow
+
 
 def check_database_connection(db_manager):
     """Проверка подключения к базе данных"""
     try:
-        db_manager.create_tables()
-        print("База данных успешно подключена")
+        applied = db_manager.migrate()
+        for migration in applied:
+            print(f"Применена миграция {migration['version']}: {migration['description']}")
+        print(f"База данных успешно подключена (версия схемы {db_manager.schema_version()})")
         return True
     except Exception as e:
         print(f"Ошибка подключения к базе данных: {e}")
         return False
 
 
+def start_metrics():
+    """Включение метрик контроллеров по переменным окружения METRICS_PORT и METRICS_FILE"""
+    port = os.environ.get("METRICS_PORT")
+    path = os.environ.get("METRICS_FILE")
+    if not port and not path:
+        return None
+
+    import metrics
+    metrics.enable()
+    server = None
+    if port:
+        server = metrics.MetricsServer(int(port)).start()
+        print(f"Метрики доступны по адресу http://{server.host}:{server.port}/metrics")
+    if path:
+        fmt = "json" if path.endswith(".json") else "prometheus"
+        atexit.register(metrics.write_metrics, path, fmt)
+        print(f"Метрики будут записаны в {path} при завершении")
+    return server
+
+
 def initialize_models():
     """Инициализация моделей (если требуется)"""
+    from models.task import Task
+    from models.project import Project
+    from models.user import User
+
     print("Модели инициализированы:")
     print(f"  - Task: {Task.__name__}")
     print(f"  - Project: {Project.__name__}")
@@ -60,7 +85,10 @@ def main():
         
         os.makedirs("database", exist_ok=True)
         
+        start_metrics()
+        
         print("\nЗапуск графического интерфейса...")
+        MainWindow = import_main_window()
         app = MainWindow(db_path)
         
         print("Приложение успешно запущено!")
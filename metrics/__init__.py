@@ -0,0 +1,22 @@
+from .registry import (
+    REGISTRY, MetricsRegistry, Counter, Histogram, Timer,
+    profiled, enable, disable, is_enabled, reset
+)
+from .exporters import MetricsServer, to_prometheus, to_json, write_metrics
+
+__all__ = [
+    'REGISTRY',
+    'MetricsRegistry',
+    'Counter',
+    'Histogram',
+    'Timer',
+    'profiled',
+    'enable',
+    'disable',
+    'is_enabled',
+    'reset',
+    'MetricsServer',
+    'to_prometheus',
+    'to_json',
+    'write_metrics'
+]
@@ -0,0 +1,156 @@
+import json
+import math
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from metrics.registry import REGISTRY, MetricsRegistry
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_PORT = 9464
+# mkstemp создаёт файл с правами 0600, а textfile-сборщик node-exporter
+# обычно работает от другого пользователя
+METRICS_FILE_MODE = 0o644
+
+
+def _format_labels(labels, extra=()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value: Optional[float]) -> str:
+    if value is None:
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+def to_prometheus(registry: MetricsRegistry = REGISTRY) -> str:
+    lines = []
+    described = set()
+    for metric in registry.collect():
+        if metric.name not in described:
+            described.add(metric.name)
+            lines += _describe(metric)
+        lines += _samples(metric)
+    return '\n'.join(lines) + '\n'
+
+
+def _describe(metric) -> List[str]:
+    lines = [f"# HELP {metric.name} {metric.help}"] if metric.help else []
+    return lines + [f"# TYPE {metric.name} {metric.kind}"]
+
+
+def _samples(metric) -> List[str]:
+    labels = _format_labels(metric.labels)
+    if metric.kind == 'counter':
+        return [f"{metric.name}{labels} {_format_value(metric.value)}"]
+    return _distribution(metric) + [
+        f"{metric.name}_sum{labels} {_format_value(metric.sum)}",
+        f"{metric.name}_count{labels} {metric.count}",
+    ]
+
+
+def _distribution(metric) -> List[str]:
+    if metric.kind == 'summary':
+        return [f"{metric.name}{_format_labels(metric.labels, [('quantile', str(q))])} "
+                f"{_format_value(metric.quantile(q))}" for q in metric.quantiles]
+    return [f"{metric.name}_bucket{_format_labels(metric.labels, [('le', _format_value(b))])} "
+            f"{count}" for b, count in metric.cumulative_buckets()]
+
+
+def to_json(registry: MetricsRegistry = REGISTRY) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    for metric in registry.collect():
+        entry = result.setdefault(metric.name, {'type': metric.kind, 'help': metric.help,
+                                                'series': []})
+        snapshot = metric.snapshot()
+        if 'quantiles' in snapshot:
+            snapshot['quantiles'] = {str(q): value for q, value in snapshot['quantiles'].items()}
+        if 'buckets' in snapshot:
+            snapshot['buckets'] = {str(b): value for b, value in snapshot['buckets'].items()}
+        entry['series'].append(dict(snapshot, labels=dict(metric.labels)))
+    return result
+
+
+def write_metrics(path: str, fmt: str = 'prometheus', registry: MetricsRegistry = REGISTRY) -> None:
+    if fmt == 'prometheus':
+        content = to_prometheus(registry)
+    elif fmt == 'json':
+        content = json.dumps(to_json(registry), ensure_ascii=False, indent=2)
+    else:
+        raise ValueError(f"Неизвестный формат метрик: {fmt}")
+
+    # Запись через временный файл и замену, чтобы сборщик не прочитал половину файла
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.metrics-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.chmod(tmp_path, METRICS_FILE_MODE)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class MetricsServer:
+    # Отдаёт /metrics в текстовом формате Prometheus и /metrics.json;
+    # по умолчанию слушает только localhost
+    def __init__(self, port: int = DEFAULT_PORT, host: str = '127.0.0.1',
+                 registry: MetricsRegistry = REGISTRY) -> None:
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MetricsServer":
+        if self._server is not None:
+            return self
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/metrics':
+                    body = to_prometheus(registry).encode('utf-8')
+                    content_type = PROMETHEUS_CONTENT_TYPE
+                elif path == '/metrics.json':
+                    body = json.dumps(to_json(registry), ensure_ascii=False).encode('utf-8')
+                    content_type = 'application/json; charset=utf-8'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='metrics-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
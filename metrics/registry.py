@@ -0,0 +1,248 @@
+import bisect
+import functools
+import inspect
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+DEFAULT_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+RESERVOIR_SIZE = 1024
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, labels: Labels) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Счётчик не может уменьшаться")
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'value': self.value}
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: Labels,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            if index < len(self.buckets):
+                self.bucket_counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def cumulative_buckets(self) -> List[Tuple[float, int]]:
+        result, total = [], 0
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            total += count
+            result.append((bound, total))
+        result.append((math.inf, self.count))
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'buckets': {('+Inf' if math.isinf(bound) else bound): count
+                        for bound, count in self.cumulative_buckets()}
+        }
+
+
+class Timer(Histogram):
+    # Перцентили считаются по последним RESERVOIR_SIZE замерам, а корзины
+    # гистограммы и сумма накапливаются за всё время работы процесса
+    kind = 'summary'
+
+    def __init__(self, name: str, help_text: str, labels: Labels,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 quantiles: Sequence[float] = DEFAULT_QUANTILES) -> None:
+        super().__init__(name, help_text, labels, buckets)
+        self.quantiles = tuple(quantiles)
+        self._recent = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, value: float) -> None:
+        super().observe(value)
+        with self._lock:
+            self._recent.append(value)
+
+    def time(self) -> "_TimerContext":
+        return _TimerContext(self)
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._recent)
+        if not samples:
+            return None
+        return samples[max(0, math.ceil(q * len(samples)) - 1)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        result = super().snapshot()
+        result['quantiles'] = {q: self.quantile(q) for q in self.quantiles}
+        return result
+
+
+class _TimerContext:
+    def __init__(self, timer: Timer) -> None:
+        self.timer = timer
+
+    def __enter__(self) -> "_TimerContext":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.timer.observe(time.perf_counter() - self.started)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[Tuple[str, Labels], Any] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str = "", **labels: str) -> Counter:
+        return self._get(Counter, name, help_text, labels)
+
+    def histogram(self, name: str, help_text: str = "",
+                  buckets: Sequence[float] = DEFAULT_BUCKETS, **labels: str) -> Histogram:
+        return self._get(Histogram, name, help_text, labels, buckets=buckets)
+
+    def timer(self, name: str, help_text: str = "", **labels: str) -> Timer:
+        return self._get(Timer, name, help_text, labels)
+
+    def get(self, name: str, **labels: str) -> Optional[Any]:
+        return self._metrics.get((name, _labels(labels)))
+
+    def collect(self) -> List[Any]:
+        with self._lock:
+            return sorted(self._metrics.values(), key=lambda m: (m.name, m.labels))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+    def _get(self, metric_class, name, help_text, labels, **options):
+        key = (name, _labels(labels))
+        with self._lock:
+            metric = self._metrics.get(key)
+            if metric is None:
+                metric = self._metrics[key] = metric_class(name, help_text, key[1], **options)
+            elif type(metric) is not metric_class:
+                raise ValueError(f"Метрика {name} уже зарегистрирована с другим типом")
+            return metric
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+REGISTRY = MetricsRegistry()
+
+CALL_TIMER = 'controller_call_seconds'
+CALL_ERRORS = 'controller_errors_total'
+
+# Пока метрики выключены, классы содержат исходные методы без обёрток,
+# поэтому выключенная подсистема не добавляет накладных расходов
+_profiled: List[Tuple[type, str, Callable]] = []
+_enabled = False
+
+
+def _timed(owner: str, name: str, func: Callable, registry: MetricsRegistry) -> Callable:
+    timer = registry.timer(CALL_TIMER, "Длительность вызова метода контроллера, секунды",
+                           controller=owner, method=name)
+    errors = registry.counter(CALL_ERRORS, "Количество вызовов, завершившихся исключением",
+                              controller=owner, method=name)
+
+    if inspect.iscoroutinefunction(func):
+        return _async_timed(func, timer, errors)
+    return _sync_timed(func, timer, errors)
+
+
+def _sync_timed(func: Callable, timer, errors) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            timer.observe(time.perf_counter() - started)
+    return wrapper
+
+
+def _async_timed(func: Callable, timer, errors) -> Callable:
+    @functools.wraps(func)
+    async def async_wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            timer.observe(time.perf_counter() - started)
+    return async_wrapper
+
+
+def profiled(cls: type) -> type:
+    for name, func in list(vars(cls).items()):
+        if name.startswith('_') or not inspect.isfunction(func):
+            continue
+        _profiled.append((cls, name, func))
+        if _enabled:
+            setattr(cls, name, _timed(cls.__name__, name, func, REGISTRY))
+    return cls
+
+
+def enable() -> None:
+    global _enabled
+    if _enabled:
+        return
+    _enabled = True
+    for cls, name, func in _profiled:
+        setattr(cls, name, _timed(cls.__name__, name, func, REGISTRY))
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+    for cls, name, func in _profiled:
+        setattr(cls, name, func)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    # Обёртки держат ссылки на свои метрики, поэтому после очистки реестра
+    # включённые методы оборачиваются заново
+    REGISTRY.clear()
+    if _enabled:
+        for cls, name, func in _profiled:
+            setattr(cls, name, _timed(cls.__name__, name, func, REGISTRY))
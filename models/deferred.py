@@ -0,0 +1,39 @@
+PREVIEW_LENGTH = 50
+
+
+def make_preview(text):
+    text = text or ""
+    return text[:PREVIEW_LENGTH] + "..." if len(text) > PREVIEW_LENGTH else text
+
+
+class Deferred:
+    # Столбцы, не выбранные списочным запросом с проекцией, загружаются
+    # одним запросом при первом обращении к любому из них. У полностью
+    # загруженных объектов все атрибуты есть, и __getattr__ не вызывается
+
+    @classmethod
+    def from_row(cls, values):
+        # Строки из базы уже прошли CHECK-ограничения и проверки при записи,
+        # поэтому объект собирается без конструктора и его валидации
+        entity = cls.__new__(cls)
+        entity.__dict__.update(values)
+        return entity
+
+    def __getattr__(self, name):
+        # Служебные имена запрашивают hasattr, copy и pickle: они не должны
+        # ни загружать столбцы, ни терять загрузчик
+        if name.startswith('__') or '_deferred_loader' not in self.__dict__:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        self._load_deferred()
+        return getattr(self, name)
+
+    def __getstate__(self):
+        # Загрузчики привязаны к соединению базы, поэтому copy и pickle
+        # получают только значения: отложенные столбцы догружаются заранее
+        self._load_deferred()
+        return dict(self.__dict__)
+
+    def _load_deferred(self):
+        loader = self.__dict__.pop('_deferred_loader', None)
+        if loader is not None:
+            self.__dict__.update(loader())
@@ -1,6 +1,9 @@
 from datetime import datetime
+from models.deferred import Deferred, make_preview
 
-class Project:
+VALID_STATUSES = ['active', 'completed', 'on_hold']
+
+class Project(Deferred):
     def __init__(self, name, description, start_date, end_date, id=None, status='active'):
         self.id = id
         self.name = name
@@ -9,20 +12,27 @@ class Project:
         self.end_date = end_date
         self.status = status
         
-        valid_statuses = ['active', 'completed', 'on_hold']
-        if status not in valid_statuses:
-            raise ValueError(f"Статус должен быть одним из: {valid_statuses}")
+        if status not in VALID_STATUSES:
+            raise ValueError(f"Статус должен быть одним из: {VALID_STATUSES}")
         
         if start_date and end_date and start_date > end_date:
             raise ValueError("Дата начала не может быть позже даты окончания")
 
     def update_status(self, new_status):
-        valid_statuses = ['active', 'completed', 'on_hold']
-        if new_status not in valid_statuses:
-            raise ValueError(f"Статус должен быть одним из: {valid_statuses}")
+        if new_status not in VALID_STATUSES:
+            raise ValueError(f"Статус должен быть одним из: {VALID_STATUSES}")
         self.status = new_status
 
-    def get_progress(self):
+    @property
+    def description_preview(self):
+        # Списочный запрос с проекцией заполняет превью в SQL, не читая описание целиком
+        preview = self.__dict__.get('_description_preview')
+        return preview if preview is not None else make_preview(self.description)
+
+    def get_progress(self, total=0, completed=0):
+        # Прогресс считается по задачам; у проекта без задач оценивается по статусу
+        if total:
+            return completed * 100.0 / total
         if self.status == 'completed':
             return 100.0
         elif self.status == 'on_hold':
@@ -30,7 +40,9 @@ class Project:
         else:
             return 50.0
 
-    def to_dict(self):
+    def to_dict(self, total=0, completed=0):
+        # Счётчики задач передаются так же, как в get_progress, чтобы
+        # прогресс в словаре совпадал с прогрессом контроллера
         return {
             'id': self.id,
             'name': self.name,
@@ -38,5 +50,5 @@ class Project:
             'start_date': self.start_date.isoformat() if self.start_date else None,
             'end_date': self.end_date.isoformat() if self.end_date else None,
             'status': self.status,
-            'progress': self.get_progress()
+            'progress': self.get_progress(total, completed)
         }
\ No newline at end of file
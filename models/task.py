@@ -1,6 +1,11 @@
 from datetime import datetime
+from models.deferred import Deferred, make_preview
 
-class Task:
+VALID_STATUSES = ['pending', 'in_progress', 'completed']
+VALID_PRIORITIES = (1, 2, 3)
+RELATION_KEYS = {'project': 'project_id', 'assignee': 'assignee_id'}
+
+class Task(Deferred):
     def __init__(self, title, description, priority, due_date, project_id, assignee_id, 
                  id=None, status='pending'):
         self.id = id
@@ -12,19 +17,47 @@ class Task:
         self.project_id = project_id
         self.assignee_id = assignee_id
         
-        if priority not in [1, 2, 3]:
+        if priority not in VALID_PRIORITIES:
             raise ValueError("Приоритет должен быть 1 (высокий), 2 (средний) или 3 (низкий)")
         
-        valid_statuses = ['pending', 'in_progress', 'completed']
-        if status not in valid_statuses:
-            raise ValueError(f"Статус должен быть одним из: {valid_statuses}")
+        if status not in VALID_STATUSES:
+            raise ValueError(f"Статус должен быть одним из: {VALID_STATUSES}")
 
     def update_status(self, new_status):
-        valid_statuses = ['pending', 'in_progress', 'completed']
-        if new_status not in valid_statuses:
-            raise ValueError(f"Статус должен быть одним из: {valid_statuses}")
+        if new_status not in VALID_STATUSES:
+            raise ValueError(f"Статус должен быть одним из: {VALID_STATUSES}")
         self.status = new_status
 
+    @property
+    def description_preview(self):
+        # Списочный запрос с проекцией заполняет превью в SQL, не читая описание целиком
+        preview = self.__dict__.get('_description_preview')
+        return preview if preview is not None else make_preview(self.description)
+
+    @property
+    def project(self):
+        return self._related('project')
+
+    @property
+    def assignee(self):
+        return self._related('assignee')
+
+    def _related(self, name):
+        # Связи доступны у задач, прочитанных из базы; задачи одной выборки
+        # загружают связанные записи общим пакетным запросом
+        loaders = self.__dict__.get('_relations')
+        if loaders is None:
+            return self.__dict__.get('_resolved', {}).get(name)
+        return loaders[name].load(getattr(self, RELATION_KEYS[name]))
+
+    def __getstate__(self):
+        # Вместо загрузчиков связей копия хранит уже загруженные записи
+        state = super().__getstate__()
+        loaders = state.pop('_relations', None)
+        if loaders is not None:
+            state['_resolved'] = {name: self._related(name) for name in RELATION_KEYS}
+        return state
+
     def is_overdue(self):
         if self.status == 'completed':
             return False
@@ -1,7 +1,12 @@
 import re
 from datetime import datetime
+from models.deferred import Deferred
 
-class User:
+# Шаблон компилируется один раз при импорте, а не при каждой проверке
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+VALID_ROLES = ['admin', 'manager', 'developer']
+
+class User(Deferred):
     def __init__(self, username, email, role, id=None, registration_date=None):
         self.id = id
         self.username = username
@@ -12,13 +17,11 @@ class User:
         if not self._is_valid_email(email):
             raise ValueError("Некорректный email адрес")
         
-        valid_roles = ['admin', 'manager', 'developer']
-        if role not in valid_roles:
-            raise ValueError(f"Роль должна быть одной из: {valid_roles}")
+        if role not in VALID_ROLES:
+            raise ValueError(f"Роль должна быть одной из: {VALID_ROLES}")
 
     def _is_valid_email(self, email):
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
+        return EMAIL_PATTERN.match(email) is not None
 
     def update_info(self, username=None, email=None, role=None):
         if username is not None:
@@ -30,9 +33,8 @@ class User:
             self.email = email
             
         if role is not None:
-            valid_roles = ['admin', 'manager', 'developer']
-            if role not in valid_roles:
-                raise ValueError(f"Роль должна быть одной из: {valid_roles}")
+            if role not in VALID_ROLES:
+                raise ValueError(f"Роль должна быть одной из: {VALID_ROLES}")
             self.role = role
 
     def to_dict(self):
@@ -1,12 +1,22 @@
+import asyncio
+import json
 import tempfile
 import os
 import pytest
+import stat
 import time
+import urllib.request
 from datetime import datetime, timedelta
 from database.database_manager import DatabaseManager
 from controllers.task_controller import TaskController
 from controllers.project_controller import ProjectController
 from controllers.user_controller import UserController
+from controllers.async_controllers import (
+    AsyncTaskController, AsyncProjectController, AsyncUserController
+)
+from database.async_database_manager import AsyncDatabaseManager
+from views.entity_store import EntityStore
+import metrics
 
 
 class TestTaskController:
@@ -618,6 +628,39 @@ class TestProjectController:
         assert isinstance(progress, (int, float))
         assert progress == 50.0
     
+    def test_get_all_project_progress(self):
+        project = self.controller.add_project(
+            name="Test Project",
+            description="Test Description",
+            start_date=self.start_date,
+            end_date=self.end_date
+        )
+        empty = self.controller.add_project(
+            name="Empty Project",
+            description="Test Description",
+            start_date=self.start_date,
+            end_date=self.end_date
+        )
+        self.controller.update_project_status(empty.id, "completed")
+        
+        tasks = [self.task_controller.add_task(
+            title=f"Task {i}",
+            description="Description",
+            priority=2,
+            due_date=datetime.now() + timedelta(days=5),
+            project_id=project.id,
+            assignee_id=self.user.id
+        ) for i in range(4)]
+        self.task_controller.update_task_status(tasks[0].id, "completed")
+        
+        assert self.controller.get_all_project_progress() == {project.id: 25.0, empty.id: 100.0}
+        
+        self.task_controller.delete_task(tasks[1].id)
+        
+        progress = self.controller.get_all_project_progress()
+        assert progress[project.id] == pytest.approx(100 / 3)
+        assert progress[project.id] == self.controller.get_project_progress(project.id)
+
     def test_get_project_progress_nonexistent(self):
         with pytest.raises(ValueError, match="Проект с ID"):
             self.controller.get_project_progress(99999)
@@ -846,4 +889,339 @@ class TestUserController:
         
         task_ids = [t["id"] for t in user_tasks]
         assert task1.id in task_ids, f"Задача {task1.id} должна быть в списке"
-        assert task2.id not in task_ids, f"Задача {task2.id} не должна быть в списке"
\ No newline at end of file
+        assert task2.id not in task_ids, f"Задача {task2.id} не должна быть в списке"
+
+    def test_get_user_workload(self):
+        project_controller = ProjectController(self.db_manager)
+        task_controller = TaskController(self.db_manager)
+        project = project_controller.add_project(
+            name="Test Project",
+            description="Test Description",
+            start_date=datetime.now() + timedelta(days=1),
+            end_date=datetime.now() + timedelta(days=30)
+        )
+        due_dates = [datetime.now() + timedelta(days=days) for days in (7, 3, 14)]
+        tasks = [task_controller.add_task(
+            title=f"Task {i}",
+            description="Description",
+            priority=1,
+            due_date=due_date,
+            project_id=project.id,
+            assignee_id=self.user.id
+        ) for i, due_date in enumerate(due_dates)]
+        task_controller.update_task_status(tasks[0].id, "in_progress")
+        task_controller.update_task_status(tasks[1].id, "completed")
+        
+        workload = self.controller.get_user_workload(self.user.id)
+        
+        assert workload == {'open': 2, 'in_progress': 1, 'overdue': 0,
+                            'next_due_date': due_dates[0]}
+        all_workload = self.controller.get_all_user_workload()
+        assert all_workload == {self.user.id: workload}
+        assert all_workload[99999] == {'open': 0, 'in_progress': 0, 'overdue': 0,
+                                       'next_due_date': None}
+        
+        with pytest.raises(ValueError, match="Пользователь с ID"):
+            self.controller.get_user_workload(99999)
+
+    def test_get_user_tasks_query_profile(self):
+        project_controller = ProjectController(self.db_manager)
+        task_controller = TaskController(self.db_manager)
+        for i in range(3):
+            project = project_controller.add_project(
+                name=f"Project {i}",
+                description="Test Description",
+                start_date=datetime.now() + timedelta(days=1),
+                end_date=datetime.now() + timedelta(days=30)
+            )
+            task_controller.add_task(
+                title=f"Task {i}",
+                description="Description",
+                priority=1,
+                due_date=datetime.now() + timedelta(days=7),
+                project_id=project.id,
+                assignee_id=self.user.id
+            )
+        self.db_manager.clear_cache()
+        self.db_manager.enable_instrumentation()
+        
+        self.controller.get_user_tasks(self.user.id)
+        
+        stats = {item['fingerprint']: item for item in self.db_manager.get_query_stats()}
+        project_lookup = stats["SELECT * FROM projects WHERE id IN (...)"]
+        assert project_lookup['count'] == 1
+        assert project_lookup['callers'] == {'UserController.get_user_tasks': 1}
+        assert "SELECT * FROM projects WHERE id = ?" not in stats
+
+
+class TestAsyncControllers:
+
+    def setup_method(self):
+        self.db_manager = AsyncDatabaseManager(":memory:")
+        self.task_controller = AsyncTaskController(self.db_manager)
+        self.project_controller = AsyncProjectController(self.db_manager)
+        self.user_controller = AsyncUserController(self.db_manager)
+
+    def teardown_method(self):
+        asyncio.run(self.db_manager.close())
+
+    def test_concurrent_add_and_search(self):
+        async def scenario():
+            user = await self.user_controller.add_user(
+                username="testuser",
+                email="test@example.com",
+                role="developer"
+            )
+            project = await self.project_controller.add_project(
+                name="Test Project",
+                description="Test Description",
+                start_date=datetime.now() + timedelta(days=1),
+                end_date=datetime.now() + timedelta(days=31)
+            )
+            await asyncio.gather(*(
+                self.task_controller.add_task(
+                    title=f"Task {i}",
+                    description="Test Description",
+                    priority=2,
+                    due_date=datetime.now() + timedelta(days=7),
+                    project_id=project.id,
+                    assignee_id=user.id
+                )
+                for i in range(10)
+            ))
+            return await self.task_controller.search_tasks("Task")
+
+        tasks = asyncio.run(scenario())
+
+        assert len(tasks) == 10
+
+    def test_validation_errors_propagate(self):
+        with pytest.raises(ValueError, match="Проект с ID"):
+            asyncio.run(self.project_controller.get_project_progress(99999))
+
+
+class TestControllerMetrics:
+
+    def setup_method(self):
+        self.db_manager = DatabaseManager(":memory:")
+        self.task_controller = TaskController(self.db_manager)
+        self.project_controller = ProjectController(self.db_manager)
+        self.user_controller = UserController(self.db_manager)
+        self.user = self.user_controller.add_user(
+            username="testuser",
+            email="test@example.com",
+            role="developer"
+        )
+        self.project = self.project_controller.add_project(
+            name="Test Project",
+            description="Test Description",
+            start_date=datetime.now() + timedelta(days=1),
+            end_date=datetime.now() + timedelta(days=30)
+        )
+        self.original_add_task = TaskController.add_task
+        metrics.reset()
+
+    def teardown_method(self):
+        metrics.disable()
+        metrics.reset()
+        self.db_manager.close()
+
+    def _add_tasks(self, count):
+        for i in range(count):
+            self.task_controller.add_task(
+                title=f"Task {i}",
+                description="Test Description",
+                priority=2,
+                due_date=datetime.now() + timedelta(days=7),
+                project_id=self.project.id,
+                assignee_id=self.user.id
+            )
+
+    def test_disabled_metrics_leave_methods_unwrapped(self):
+        assert not metrics.is_enabled()
+        assert TaskController.add_task is self.original_add_task
+        
+        self._add_tasks(2)
+        
+        assert metrics.REGISTRY.collect() == []
+
+    def test_enabled_metrics_record_latency_and_errors(self):
+        metrics.enable()
+        assert TaskController.add_task is not self.original_add_task
+        
+        self._add_tasks(5)
+        self.task_controller.search_tasks("Task")
+        self.task_controller.get_overdue_tasks()
+        with pytest.raises(ValueError):
+            self.task_controller.add_task("Bad", "Test Description", 5, datetime.now(),
+                                          self.project.id, self.user.id)
+        
+        add_task = metrics.REGISTRY.get('controller_call_seconds',
+                                        controller='TaskController', method='add_task')
+        assert add_task.count == 6
+        assert add_task.quantile(0.5) > 0
+        assert add_task.quantile(0.99) >= add_task.quantile(0.5)
+        errors = metrics.REGISTRY.get('controller_errors_total',
+                                      controller='TaskController', method='add_task')
+        assert errors.value == 1
+        search = metrics.REGISTRY.get('controller_call_seconds',
+                                      controller='TaskController', method='search_tasks')
+        assert search.count == 1
+        
+        metrics.disable()
+        assert TaskController.add_task is self.original_add_task
+
+    def test_prometheus_and_json_exporters(self):
+        metrics.enable()
+        self._add_tasks(1)
+        self.task_controller.get_overdue_tasks()
+        
+        text = metrics.to_prometheus()
+        assert "# TYPE controller_call_seconds summary" in text
+        assert ('controller_call_seconds_count{controller="TaskController",'
+                'method="add_task"} 1') in text
+        assert ('controller_call_seconds{controller="TaskController",'
+                'method="add_task",quantile="0.99"}') in text
+        
+        data = metrics.to_json()
+        series = data['controller_call_seconds']['series']
+        overdue = [s for s in series if s['labels']['method'] == 'get_overdue_tasks']
+        assert overdue[0]['count'] == 1
+        assert overdue[0]['quantiles']['0.5'] is not None
+        
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        try:
+            metrics.write_metrics(path, fmt='json')
+            with open(path, encoding='utf-8') as f:
+                assert json.load(f) == json.loads(json.dumps(metrics.to_json()))
+        finally:
+            os.unlink(path)
+
+    def test_metrics_file_is_world_readable(self):
+        metrics.enable()
+        self._add_tasks(1)
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'app.prom')
+        try:
+            metrics.write_metrics(path)
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+        finally:
+            os.unlink(path)
+            os.rmdir(directory)
+
+    def test_metrics_server_serves_localhost(self):
+        metrics.enable()
+        self._add_tasks(1)
+        server = metrics.MetricsServer(port=0).start()
+        try:
+            url = f"http://127.0.0.1:{server.port}"
+            with urllib.request.urlopen(f"{url}/metrics", timeout=5) as response:
+                assert response.headers['Content-Type'].startswith('text/plain')
+                assert 'method="add_task"' in response.read().decode('utf-8')
+            with urllib.request.urlopen(f"{url}/metrics.json", timeout=5) as response:
+                assert 'controller_call_seconds' in json.loads(response.read())
+        finally:
+            server.stop()
+
+
+class TestEntityStore:
+
+    def setup_method(self):
+        self.db_manager = DatabaseManager(":memory:")
+        self.task_controller = TaskController(self.db_manager)
+        self.project_controller = ProjectController(self.db_manager)
+        self.user_controller = UserController(self.db_manager)
+        self.user = self.user_controller.add_user(
+            username="testuser",
+            email="test@example.com",
+            role="developer"
+        )
+        self.project = self.project_controller.add_project(
+            name="Test Project",
+            description="Test Description",
+            start_date=datetime.now() + timedelta(days=1),
+            end_date=datetime.now() + timedelta(days=30)
+        )
+        self.task = self.task_controller.add_task(
+            title="Task",
+            description="Test Description",
+            priority=2,
+            due_date=datetime.now() + timedelta(days=7),
+            project_id=self.project.id,
+            assignee_id=self.user.id
+        )
+        self.store = EntityStore(self.task_controller, self.project_controller,
+                                 self.user_controller)
+        self.events = []
+
+    def teardown_method(self):
+        self.db_manager.close()
+
+    def test_get_many_loads_only_missing_entities(self):
+        other = self.user_controller.add_user(
+            username="otheruser",
+            email="other@example.com",
+            role="developer"
+        )
+        self.db_manager.clear_cache()
+        
+        users = self.store.get_many('users', [other.id, 99999])
+        
+        assert list(users) == [other.id]
+        assert not self.store.is_loaded('users')
+        assert self.store.get('users', other.id) is users[other.id]
+        
+        users = self.store.get_many('users', [self.user.id, other.id])
+        assert [user.username for user in users.values()] == ["testuser", "otheruser"]
+        assert self.db_manager.get_cache_stats()['users']['hits'] == 0
+
+    def test_entities_loaded_once_and_indexed_by_id(self):
+        assert not self.store.is_loaded('tasks')
+        
+        assert [task.id for task in self.store.all('tasks')] == [self.task.id]
+        assert self.store.get('tasks', self.task.id) is self.store.all('tasks')[0]
+        assert self.store.get('projects', self.project.id).name == "Test Project"
+        assert self.store.get('users', 99999) is None
+        assert self.store.is_loaded('tasks')
+
+    def test_projects_loaded_with_list_projection(self):
+        project = self.store.all('projects')[0]
+        
+        assert 'description' not in vars(project)
+        assert project.description_preview == "Test Description"
+        assert project.description == "Test Description"
+
+    def test_subscribers_notified_about_their_kinds(self):
+        self.store.all('projects')
+        self.store.subscribe(self.events.append, kinds=['projects'])
+        
+        self.project_controller.update_project(self.project.id, name="Renamed")
+        self.store.refresh('projects', self.project.id)
+        self.store.reload('users')
+        
+        assert self.events == ['projects']
+        assert self.store.get('projects', self.project.id).name == "Renamed"
+        
+        self.store.unsubscribe(self.events.append)
+        self.store.reload('projects')
+        assert self.events == ['projects']
+
+    def test_removed_owner_drops_cascaded_tasks(self):
+        self.store.all('tasks')
+        self.store.all('users')
+        self.store.subscribe(self.events.append)
+        
+        self.user_controller.delete_user(self.user.id)
+        self.store.remove('users', self.user.id)
+        
+        assert self.events == ['users', 'tasks']
+        assert self.store.all('users') == []
+        assert self.store.all('tasks') == []
+
+    def test_refresh_removes_missing_entity(self):
+        self.store.all('tasks')
+        self.task_controller.delete_task(self.task.id)
+        
+        assert self.store.refresh('tasks', self.task.id) is None
+        assert self.store.get('tasks', self.task.id) is None
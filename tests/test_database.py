@@ -1,9 +1,22 @@
+import asyncio
+import copy
+import pickle
+import sqlite3
 import tempfile
+import threading
 import os
 import time
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from database import async_database_manager, database_manager
 from database.database_manager import DatabaseManager
+from database.async_database_manager import AsyncDatabaseManager
+from database.cancellation import CancellationToken, QueryCancelled
+from database.instrumentation import InstrumentedConnection
+from database.migrations import Backfill, Migration, MigrationRunner
+from database.task_query import TaskQuery
+from database.write_queue import WriteQueue
 from models.task import Task
 from models.project import Project
 from models.user import User
@@ -799,6 +812,409 @@ class TestDatabaseManager:
         existing_project = self.db.get_project_by_id(project_id)
         assert existing_project is not None
 
+    def test_get_by_id_uses_identity_cache(self):
+        user = User(
+            username="testuser",
+            email="test@example.com",
+            role="developer"
+        )
+        user_id = self.db.add_user(user)
+        
+        first = self.db.get_user_by_id(user_id)
+        second = self.db.get_user_by_id(user_id)
+        
+        assert first is second
+        stats = self.db.get_cache_stats()['users']
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        
+        self.db.update_user(user_id, username="renamed")
+        
+        updated = self.db.get_user_by_id(user_id)
+        assert updated is not first
+        assert updated.username == "renamed"
+
+    def test_identity_cache_invalidated_by_cascade(self):
+        user = User(
+            username="testuser",
+            email="test@example.com",
+            role="developer"
+        )
+        user_id = self.db.add_user(user)
+        
+        project = Project(
+            name="Test Project",
+            description="Test Description",
+            start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=30)
+        )
+        project_id = self.db.add_project(project)
+        
+        task = Task(
+            title="Test Task",
+            description="Test Description",
+            priority=2,
+            due_date=datetime.now() + timedelta(days=7),
+            project_id=project_id,
+            assignee_id=user_id
+        )
+        task_id = self.db.add_task(task)
+        assert self.db.get_task_by_id(task_id) is not None
+        
+        self.db.delete_project(project_id)
+        
+        assert self.db.get_project_by_id(project_id) is None
+        assert self.db.get_task_by_id(task_id) is None
+
+    def test_identity_cache_size_limit(self):
+        db = DatabaseManager(":memory:", cache_size=2)
+        user_ids = [
+            db.add_user(User(username=f"user{i}", email=f"user{i}@example.com", role="developer"))
+            for i in range(3)
+        ]
+        
+        for user_id in user_ids:
+            db.get_user_by_id(user_id)
+        
+        assert db.get_cache_stats()['users']['size'] == 2
+        db.close()
+
+    def test_query_instrumentation_groups_by_fingerprint(self):
+        user_id = self.db.add_user(User(
+            username="testuser",
+            email="test@example.com",
+            role="developer"
+        ))
+        project_id = self.db.add_project(Project(
+            name="Test Project",
+            description="Test Description",
+            start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=30)
+        ))
+        task_ids = [self.db.add_task(Task(
+            title=f"Task {i}",
+            description="Test Description",
+            priority=2,
+            due_date=datetime.now() + timedelta(days=7),
+            project_id=project_id,
+            assignee_id=user_id
+        )) for i in range(3)]
+        self.db.clear_cache()
+        
+        self.db.enable_instrumentation()
+        for task_id in task_ids:
+            self.db.get_task_by_id(task_id)
+        self.db.get_all_tasks()
+        
+        stats = {item['fingerprint']: item for item in self.db.get_query_stats()}
+        by_id = stats["SELECT * FROM tasks WHERE id = ?"]
+        assert by_id['count'] == 3
+        assert by_id['rows'] == 3
+        assert by_id['methods'] == {'DatabaseManager.get_task_by_id': 3}
+        assert by_id['callers'] == {
+            'TestDatabaseManager.test_query_instrumentation_groups_by_fingerprint': 3
+        }
+        assert by_id['total_ms'] >= by_id['max_ms'] > 0
+        
+        all_tasks = [item for key, item in stats.items()
+                     if key.startswith("SELECT * FROM tasks ORDER BY")]
+        assert len(all_tasks) == 1
+        assert all_tasks[0]['rows'] == 3
+        assert all_tasks[0]['methods'] == {'DatabaseManager.get_all_tasks': 1}
+        
+        self.db.reset_query_stats()
+        assert self.db.get_query_stats() == []
+        
+        self.db.disable_instrumentation()
+        self.db.get_all_projects()
+        assert self.db.get_query_stats() == []
+
+    def test_slow_query_log_and_trace(self):
+        slow = []
+        self.db.enable_instrumentation(slow_query_ms=0, trace=True,
+                                       slow_query_callback=slow.append)
+        user_id = self.db.add_user(User(
+            username="testuser",
+            email="test@example.com",
+            role="developer"
+        ))
+        self.db.get_all_users()
+        
+        logged = self.db.get_slow_queries()
+        assert logged == slow
+        insert = next(entry for entry in logged if entry['sql'].lstrip().startswith("INSERT"))
+        assert insert['method'] == 'DatabaseManager.add_user'
+        select = next(entry for entry in logged
+                      if entry['method'] == 'DatabaseManager.get_all_users')
+        assert select['rows'] == 1
+        
+        traced = self.db.get_traced_statements()
+        assert any("'testuser'" in statement for statement in traced)
+        assert 'COMMIT' in traced
+        assert user_id == 1
+        
+        self.db.disable_instrumentation()
+
+    def test_list_queries_use_result_cache(self):
+        self.db.add_user(User(username="user1", email="user1@example.com", role="developer"))
+        
+        first = self.db.get_all_users()
+        second = self.db.get_all_users()
+        
+        assert [u.username for u in second] == ["user1"]
+        assert first[0] is second[0]
+        assert self.db.get_cache_stats()['queries']['hits'] == 1
+        
+        self.db.add_user(User(username="user2", email="user2@example.com", role="manager"))
+        
+        assert [u.username for u in self.db.get_all_users()] == ["user1", "user2"]
+
+    def test_result_cache_sees_other_connection_writes(self):
+        self.db.add_user(User(username="user1", email="user1@example.com", role="developer"))
+        assert len(self.db.get_all_users()) == 1
+        
+        other = DatabaseManager(self.db_file)
+        other.add_user(User(username="user2", email="user2@example.com", role="manager"))
+        other.close()
+        
+        assert len(self.db.get_all_users()) == 2
+
+    def test_repeated_lookups_do_not_query_sqlite(self):
+        user_id = self.db.add_user(User(username="user1", email="user1@example.com",
+                                        role="developer"))
+        user = self.db.get_user_by_id(user_id)
+        statements = []
+        self.db.connection.set_trace_callback(statements.append)
+        
+        assert all(self.db.get_user_by_id(user_id) is user for _ in range(10))
+        
+        self.db.connection.set_trace_callback(None)
+        assert len(statements) <= 1
+
+    def test_add_task_rechecks_project_deleted_elsewhere(self):
+        user_id = self.db.add_user(User(username="user1", email="user1@example.com",
+                                        role="developer"))
+        project_id = self.db.add_project(Project(name="Project", description="",
+                                                 start_date=datetime.now(),
+                                                 end_date=datetime.now() + timedelta(days=30)))
+        assert self.db.get_project_by_id(project_id) is not None
+        
+        other = DatabaseManager(self.db_file)
+        other.delete_project(project_id)
+        other.close()
+        
+        with pytest.raises(ValueError, match=f"Проект с ID {project_id} не найден"):
+            self.db.add_task(Task(title="Task", description="", priority=1,
+                                  due_date=datetime.now() + timedelta(days=1),
+                                  project_id=project_id, assignee_id=user_id))
+
+    def test_changes_since_records_all_operations(self):
+        user = User(
+            username="testuser",
+            email="test@example.com",
+            role="developer"
+        )
+        user_id = self.db.add_user(user)
+        
+        project = Project(
+            name="Test Project",
+            description="Test Description",
+            start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=30)
+        )
+        project_id = self.db.add_project(project)
+        
+        task = Task(
+            title="Test Task",
+            description="Test Description",
+            priority=2,
+            due_date=datetime.now() + timedelta(days=7),
+            project_id=project_id,
+            assignee_id=user_id
+        )
+        task_id = self.db.add_task(task)
+        
+        start_seq = self.db.latest_change_seq()
+        self.db.update_task(task_id, status="completed")
+        self.db.delete_project(project_id)
+        
+        changes = self.db.changes_since(start_seq)
+        
+        assert [(c['op'], c['entity'], c['entity_id']) for c in changes] == [
+            ('update', 'tasks', task_id),
+            ('delete', 'tasks', task_id),
+            ('delete', 'projects', project_id),
+        ]
+        assert changes[0]['seq'] > start_seq
+        assert len(self.db.changes_since(0, limit=2)) == 2
+
+    def test_compact_changes(self):
+        user = User(
+            username="testuser",
+            email="test@example.com",
+            role="developer"
+        )
+        user_id = self.db.add_user(user)
+        self.db.update_user(user_id, role="manager")
+        self.db.update_user(user_id, role="admin")
+        
+        other = User(
+            username="other",
+            email="other@example.com",
+            role="developer"
+        )
+        other_id = self.db.add_user(other)
+        
+        removed = self.db.compact_changes()
+        
+        changes = self.db.changes_since(0)
+        assert removed == 2
+        assert [(c['op'], c['entity_id']) for c in changes] == [
+            ('update', user_id),
+            ('insert', other_id),
+        ]
+        
+        self.db.compact_changes(acknowledged_seq=changes[0]['seq'])
+        assert [c['entity_id'] for c in self.db.changes_since(0)] == [other_id]
+
+    def test_list_queries_avoid_temp_btree_sort(self):
+        statements = []
+        self.db.connection.set_trace_callback(statements.append)
+        
+        self.db.get_all_tasks()
+        self.db.get_tasks_by_project(1)
+        self.db.get_tasks_by_user(1)
+        self.db.get_overdue_tasks()
+        self.db.get_all_projects()
+        self.db.get_all_users()
+        
+        self.db.connection.set_trace_callback(None)
+        
+        selects = [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+        assert len(selects) == 6
+        
+        cursor = self.db.connection.cursor()
+        for sql in selects:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            plan = " | ".join(row[3] for row in cursor.fetchall())
+            assert "USE TEMP B-TREE" not in plan, f"{sql.strip()} -> {plan}"
+
+    def test_delete_projects_in_chunks(self):
+        user = User(
+            username="testuser",
+            email="test@example.com",
+            role="developer"
+        )
+        user_id = self.db.add_user(user)
+        
+        project_ids = []
+        for i in range(5):
+            project = Project(
+                name=f"Project {i}",
+                description="Test Description",
+                start_date=datetime.now(),
+                end_date=datetime.now() + timedelta(days=30)
+            )
+            project_id = self.db.add_project(project)
+            project_ids.append(project_id)
+            
+            task = Task(
+                title=f"Task {i}",
+                description="Test Description",
+                priority=2,
+                due_date=datetime.now() + timedelta(days=7),
+                project_id=project_id,
+                assignee_id=user_id
+            )
+            self.db.add_task(task)
+        
+        progress = []
+        deleted = self.db.delete_projects(
+            project_ids[:4], chunk_size=2,
+            progress_callback=lambda done, total: progress.append((done, total))
+        )
+        
+        assert deleted == 4
+        assert progress == [(2, 4), (4, 4)]
+        assert len(self.db.get_all_projects()) == 1
+        assert len(self.db.get_all_tasks()) == 1
+        assert self.db.get_user_by_id(user_id) is not None
+
+    def test_delete_users_in_chunks(self):
+        user_ids = []
+        for i in range(3):
+            user = User(
+                username=f"user{i}",
+                email=f"user{i}@example.com",
+                role="developer"
+            )
+            user_ids.append(self.db.add_user(user))
+        
+        deleted = self.db.delete_users(user_ids + [99999], chunk_size=2)
+        
+        assert deleted == 3
+        assert self.db.get_all_users() == []
+
+    def test_purge_completed_projects(self):
+        old_project = Project(
+            name="Old Project",
+            description="Test Description",
+            start_date=datetime.now() - timedelta(days=60),
+            end_date=datetime.now() - timedelta(days=30),
+            status="completed"
+        )
+        old_id = self.db.add_project(old_project)
+        
+        active_project = Project(
+            name="Active Project",
+            description="Test Description",
+            start_date=datetime.now() - timedelta(days=60),
+            end_date=datetime.now() - timedelta(days=30)
+        )
+        active_id = self.db.add_project(active_project)
+        
+        deleted = self.db.purge_completed_projects(older_than=datetime.now() - timedelta(days=7))
+        
+        assert deleted == 1
+        assert self.db.get_project_by_id(old_id) is None
+        assert self.db.get_project_by_id(active_id) is not None
+
+    def test_purge_bounds_rows_per_transaction(self):
+        user_id = self.db.add_user(User(username="testuser", email="test@example.com",
+                                        role="developer"))
+        ended = datetime.now() - timedelta(days=30)
+        with self.db.connection:
+            for i in range(500):
+                project_id = self.db.add_project(Project(
+                    name=f"Project {i}", description="", start_date=ended - timedelta(days=30),
+                    end_date=ended, status="completed"))
+                for j in range(2):
+                    self.db.add_task(Task(title=f"Task {i}.{j}", description="", priority=2,
+                                          due_date=ended, project_id=project_id,
+                                          assignee_id=user_id))
+        
+        # Перед каждой новой транзакцией читатель без ожидания видит
+        # промежуточное состояние: блокировка записи между ними свободна
+        reader = sqlite3.connect(self.db_file, timeout=0)
+        seen = []
+        
+        def on_statement(sql):
+            if sql.startswith("BEGIN"):
+                seen.append(reader.execute("SELECT count(*) FROM tasks").fetchone()[0])
+        
+        self.db.connection.set_trace_callback(on_statement)
+        try:
+            deleted = self.db.purge_completed_projects(older_than=datetime.now())
+        finally:
+            self.db.connection.set_trace_callback(None)
+            reader.close()
+        
+        assert deleted == 500
+        assert len(seen) > 2
+        assert seen[0] == 1000
+        assert any(0 < count < 1000 for count in seen)
+        assert self.db.get_counts()['tasks'] == 0
+
     def test_close_and_reopen(self):
         user = User(
             username="testuser",
@@ -990,4 +1406,1021 @@ class TestDatabaseManager:
             task_due_date_dt = datetime.fromisoformat(task_due_date)
             assert task_due_date_dt < now
         else:
-            assert task_due_date < now
\ No newline at end of file
+            assert task_due_date < now
+
+    def test_get_counts(self):
+        user_id = self.db.add_user(User(username="testuser", email="test@example.com",
+                                        role="developer"))
+        project_id = self.db.add_project(Project(name="Test Project",
+                                                 description="Test Description",
+                                                 start_date=datetime.now(),
+                                                 end_date=datetime.now() + timedelta(days=30)))
+        for title, days, status in (("Overdue", -1, "pending"), ("Future", 1, "pending"),
+                                    ("Done", -1, "completed")):
+            task_id = self.db.add_task(Task(title=title, description="", priority=1,
+                                            due_date=datetime.now() + timedelta(days=days),
+                                            project_id=project_id, assignee_id=user_id))
+            self.db.update_task(task_id, status=status)
+        
+        assert self.db.get_counts() == {'tasks': 3, 'overdue': 1, 'projects': 1, 'users': 1}
+
+
+class TestTaskQuery:
+
+    def setup_method(self):
+        self.db = DatabaseManager(":memory:")
+        self.user_ids = [self.db.add_user(User(username=f"user{i}", email=f"user{i}@example.com",
+                                               role="developer")) for i in range(2)]
+        self.project_id = self.db.add_project(Project(
+            name="Test Project",
+            description="Test Description",
+            start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=30)
+        ))
+        now = datetime.now()
+        rows = [
+            ("Fix login", "100% broken", 1, now - timedelta(days=2), 0, "pending"),
+            ("Write docs", "user_guide", 2, now + timedelta(days=3), 1, "in_progress"),
+            ("Release", "Ship it", 1, now - timedelta(days=1), 1, "completed"),
+            ("Refactor login", "cleanup", 3, now + timedelta(days=10), 0, "pending"),
+        ]
+        for title, description, priority, due_date, assignee, status in rows:
+            self.db.add_task(Task(title=title, description=description, priority=priority,
+                                  due_date=due_date, project_id=self.project_id,
+                                  assignee_id=self.user_ids[assignee], status=status))
+
+    def teardown_method(self):
+        self.db.close()
+
+    def _titles(self, query):
+        return [task.title for task in self.db.query_tasks(query)]
+
+    def test_filters_combine_into_one_statement(self):
+        assert self._titles(TaskQuery()) == ["Fix login", "Release", "Write docs",
+                                             "Refactor login"]
+        assert self._titles(TaskQuery().search("login").with_status("pending")
+                            .with_priority(1, 3)) == ["Fix login", "Refactor login"]
+        assert self._titles(TaskQuery().assigned_to(self.user_ids[1])
+                            .order_by('-priority', 'title')) == ["Write docs", "Release"]
+        assert self._titles(TaskQuery().due_between(datetime.now(), None)) == [
+            "Write docs", "Refactor login"]
+        assert self._titles(TaskQuery().in_project(self.project_id).limit(2, offset=1)) == [
+            "Release", "Write docs"]
+
+    def test_offset_without_limit(self):
+        sql, params = TaskQuery().limit(None, offset=3).build(self.db.codec)
+
+        assert sql.endswith("LIMIT ? OFFSET ?")
+        assert params == (-1, 3)
+        assert self._titles(TaskQuery().limit(None, offset=3)) == ["Refactor login"]
+        assert "LIMIT" not in TaskQuery().limit(None).build(self.db.codec)[0]
+
+    def test_overdue_and_like_escaping(self):
+        assert self._titles(TaskQuery().overdue()) == ["Fix login"]
+        assert self._titles(TaskQuery().search("100%")) == ["Fix login"]
+        assert self._titles(TaskQuery().search("_")) == ["Write docs"]
+
+    def test_same_shape_reuses_sql_text(self):
+        first, params = TaskQuery().search("a").with_status("pending").build(self.db.codec)
+        second, _ = TaskQuery().search("b").with_status("completed").build(self.db.codec)
+        other, _ = TaskQuery().with_status("pending", "completed").build(self.db.codec)
+        
+        assert first is second
+        assert first != other
+        assert params == ("%a%", "%a%", "pending")
+
+    def test_builder_is_immutable_and_validates(self):
+        base = TaskQuery().with_status("pending")
+        narrowed = base.with_priority(1)
+        
+        assert base.priorities == ()
+        assert narrowed.statuses == ("pending",)
+        with pytest.raises(ValueError):
+            base.with_status("done")
+        with pytest.raises(ValueError):
+            base.with_priority(4)
+        with pytest.raises(ValueError):
+            base.order_by("description; DROP TABLE tasks")
+
+    def test_projection_defers_description(self):
+        long_text = "x" * 5000
+        task_id = self.db.add_task(Task(title="Long", description=long_text, priority=2,
+                                        due_date=datetime.now() + timedelta(days=30),
+                                        project_id=self.project_id,
+                                        assignee_id=self.user_ids[0]))
+        statements = []
+        self.db.connection.set_trace_callback(statements.append)
+        
+        tasks = self.db.get_all_tasks(columns=['title', 'description_preview', 'priority'])
+        task = next(t for t in tasks if t.id == task_id)
+        
+        assert statements[-1].startswith("SELECT id, title, priority, substr(")
+        assert 'description' not in vars(task)
+        assert task.description_preview == "x" * 50 + "..."
+        assert next(t for t in tasks if t.title == "Release").description_preview == "Ship it"
+        
+        assert task.description == long_text
+        assert task.status == "pending"
+        assert task.due_date > datetime.now()
+        assert sum("FROM tasks WHERE id =" in sql for sql in statements) == 1
+        self.db.connection.set_trace_callback(None)
+
+    def test_projection_in_query_and_iterator(self):
+        [task] = self.db.query_tasks(TaskQuery().select('title').search("docs"))
+        assert vars(task).keys() >= {'id', 'title'}
+        assert 'priority' not in vars(task)
+        assert task.priority == 2
+        
+        users = list(self.db.iter_users(batch_size=1, columns=['username']))
+        assert [user.username for user in users] == ["user0", "user1"]
+        assert users[0].email == "user0@example.com"
+        
+        with pytest.raises(ValueError):
+            self.db.get_all_projects(columns=['name', 'budget'])
+
+    def test_dunder_probe_keeps_deferred_loader(self):
+        [task] = self.db.query_tasks(TaskQuery().select('title').search("docs"))
+
+        assert not hasattr(task, '__html__')
+        assert 'priority' not in vars(task)
+        assert task.priority == 2
+        assert task.description == "user_guide"
+
+    def test_deferred_columns_of_deleted_row(self):
+        [task] = self.db.query_tasks(TaskQuery().select('title').search("docs"))
+        self.db.delete_task(task.id)
+        
+        assert task.description is None
+
+    def test_rows_are_hydrated_without_constructors(self, monkeypatch):
+        expected = [task.to_dict() for task in self.db.get_all_tasks()]
+        self.db.clear_cache()
+        
+        def forbidden(*args, **kwargs):
+            raise AssertionError("конструктор вызван при чтении из базы")
+        for model in (Task, Project, User):
+            monkeypatch.setattr(model, "__init__", forbidden)
+        
+        assert [task.to_dict() for task in self.db.get_all_tasks()] == expected
+        assert self.db.get_project_by_id(self.project_id).name == "Test Project"
+        assert [user.role for user in self.db.get_all_users()] == ["developer", "developer"]
+
+    def test_overdue_query_uses_partial_index(self):
+        sql, params = TaskQuery().overdue().build(self.db.codec)
+        plan = " | ".join(row[3] for row in self.db.connection.execute(
+            "EXPLAIN QUERY PLAN " + sql, params))
+        
+        assert "idx_tasks_open_due_date" in plan
+        assert "USE TEMP B-TREE" not in plan
+
+
+class TestTaskCounters:
+
+    def setup_method(self):
+        self.db = DatabaseManager(":memory:")
+        self.user_id = self.db.add_user(User(username="user", email="user@example.com",
+                                             role="developer"))
+        self.project_ids = [self.db.add_project(Project(
+            name=f"Project {i}",
+            description="Test Description",
+            start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=30)
+        )) for i in range(2)]
+        self.task_ids = [self.db.add_task(Task(
+            title=f"Task {i}", description="", priority=2,
+            due_date=datetime.now() + timedelta(days=2 * i - 1),
+            project_id=self.project_ids[0], assignee_id=self.user_id, status=status
+        )) for i, status in enumerate(["pending", "in_progress", "completed", "pending"])]
+
+    def teardown_method(self):
+        self.db.close()
+
+    def _recount_projects(self):
+        rows = self.db.fetch_all("SELECT project_id, status, COUNT(*) AS n FROM tasks "
+                                 "GROUP BY project_id, status")
+        expected = {}
+        for row in rows:
+            counts = expected.setdefault(row['project_id'], {
+                'total': 0, 'pending': 0, 'in_progress': 0, 'completed': 0})
+            counts['total'] += row['n']
+            counts[row['status']] += row['n']
+        return expected
+
+    def test_project_stats_follow_task_changes(self):
+        assert self.db.get_project_stats(self.project_ids[0]) == {
+            'total': 4, 'pending': 2, 'in_progress': 1, 'completed': 1}
+        assert self.db.get_project_stats(self.project_ids[1])['total'] == 0
+        
+        self.db.update_task(self.task_ids[0], status="completed")
+        self.db.update_task(self.task_ids[1], project_id=self.project_ids[1])
+        self.db.update_task(self.task_ids[3], title="Renamed")
+        self.db.delete_task(self.task_ids[2])
+        
+        assert self.db.get_all_project_stats() == self._recount_projects()
+        assert self.db.get_project_stats(self.project_ids[0]) == {
+            'total': 2, 'pending': 1, 'in_progress': 0, 'completed': 1}
+        
+        self.db.delete_project(self.project_ids[1])
+        assert set(self.db.get_all_project_stats()) == {self.project_ids[0]}
+
+    def test_user_workload_follows_task_changes(self):
+        workload = self.db.get_user_workload(self.user_id)
+        assert (workload['open'], workload['in_progress'], workload['overdue']) == (3, 1, 1)
+        assert workload['next_due_date'] < datetime.now()
+        
+        other_id = self.db.add_user(User(username="other", email="other@example.com",
+                                         role="developer"))
+        assert self.db.get_user_workload(other_id)['open'] == 0
+        
+        self.db.update_task(self.task_ids[0], assignee_id=other_id)
+        self.db.update_task(self.task_ids[1], status="completed")
+        
+        workload = self.db.get_user_workload(self.user_id)
+        assert (workload['open'], workload['in_progress'], workload['overdue']) == (1, 0, 0)
+        assert workload['next_due_date'] == self.db.get_task_by_id(self.task_ids[3]).due_date
+        assert self.db.get_user_workload(other_id)['overdue'] == 1
+        
+        self.db.delete_task(self.task_ids[3])
+        assert self.db.get_user_workload(self.user_id) == {
+            'open': 0, 'in_progress': 0, 'overdue': 0, 'next_due_date': None}
+        
+        self.db.delete_user(other_id)
+        assert set(self.db.get_all_user_workload()) == {self.user_id}
+
+    def test_counters_survive_storage_conversion(self):
+        stats = self.db.get_all_project_stats()
+        workload = self.db.get_user_workload(self.user_id)
+        
+        assert self.db.convert_storage(compact_enums=True, epoch_dates=True)
+        
+        # В режиме epoch даты хранятся с точностью до секунды
+        workload['next_due_date'] = workload['next_due_date'].replace(microsecond=0)
+        assert self.db.get_all_project_stats() == stats
+        assert self.db.get_user_workload(self.user_id) == workload
+        self.db.update_task(self.task_ids[0], status="in_progress")
+        workload = self.db.get_user_workload(self.user_id)
+        assert (workload['open'], workload['in_progress']) == (3, 2)
+
+
+class TestBatchLookups:
+
+    def setup_method(self):
+        self.db = DatabaseManager(":memory:")
+        self.user_ids = [self.db.add_user(User(username=f"user{i}", email=f"user{i}@example.com",
+                                               role="developer")) for i in range(7)]
+        self.db.clear_cache()
+        self.statements = []
+        self.db.connection.set_trace_callback(self.statements.append)
+
+    def teardown_method(self):
+        self.db.connection.set_trace_callback(None)
+        self.db.close()
+
+    def _lookups(self):
+        return [sql for sql in self.statements if sql.startswith("SELECT * FROM users")]
+
+    def test_ids_are_chunked_and_keyed_by_id(self, monkeypatch):
+        monkeypatch.setattr(database_manager, "ID_CHUNK_SIZE", 3)
+        wanted = [self.user_ids[5], 99999, self.user_ids[0], self.user_ids[5]] + self.user_ids[1:4]
+        
+        users = self.db.get_users_by_ids(wanted)
+        
+        assert list(users) == [self.user_ids[5], self.user_ids[0]] + self.user_ids[1:4]
+        assert all(users[user_id].id == user_id for user_id in users)
+        assert len(self._lookups()) == 2
+        
+        assert self.db.get_users_by_ids(self.user_ids[:2]) == {
+            user_id: users[user_id] for user_id in self.user_ids[:2]}
+        assert len(self._lookups()) == 2
+        assert self.db.get_users_by_ids([]) == {}
+
+    def test_large_sets_use_one_json_parameter(self, monkeypatch):
+        monkeypatch.setattr(database_manager, "JSON_IDS_THRESHOLD", 4)
+        
+        users = self.db.get_users_by_ids(self.user_ids + [99999])
+        
+        assert list(users) == self.user_ids
+        [lookup] = self._lookups()
+        assert "json_each" in lookup
+        assert self.db.get_user_by_id(self.user_ids[6]) is users[self.user_ids[6]]
+
+    def test_task_relations_load_once_per_result(self):
+        project_ids = [self.db.add_project(Project(
+            name=f"Project {i}",
+            description="Test Description",
+            start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=30)
+        )) for i in range(3)]
+        for i in range(6):
+            self.db.add_task(Task(title=f"Task {i}", description="", priority=2,
+                                  due_date=datetime.now() + timedelta(days=i),
+                                  project_id=project_ids[i % 3], assignee_id=self.user_ids[i]))
+        self.db.clear_cache()
+        self.statements.clear()
+        
+        tasks = self.db.get_all_tasks()
+        
+        assert [task.project.name for task in tasks] == [f"Project {i % 3}" for i in range(6)]
+        assert [task.assignee.username for task in tasks] == [f"user{i}" for i in range(6)]
+        assert tasks[0].project is tasks[3].project
+        lookups = [sql for sql in self.statements if sql.startswith("SELECT * FROM projects")]
+        assert len(lookups) == 1
+        assert len(self._lookups()) == 1
+        
+        self.db.update_project(project_ids[0], name="Renamed")
+        assert tasks[3].project.name == "Renamed"
+        assert self.db.get_task_by_id(tasks[1].id).assignee.username == "user1"
+
+    def test_loaded_tasks_can_be_copied_and_pickled(self):
+        project_id = self.db.add_project(Project(
+            name="Project",
+            description="Test Description",
+            start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=30)
+        ))
+        task_id = self.db.add_task(Task(title="Task", description="Long text", priority=2,
+                                        due_date=datetime.now() + timedelta(days=1),
+                                        project_id=project_id, assignee_id=self.user_ids[0]))
+        task = self.db.get_task_by_id(task_id)
+        [partial] = self.db.get_all_tasks(columns=['title'])
+
+        copied = copy.deepcopy(task)
+        restored = pickle.loads(pickle.dumps(partial))
+
+        assert copied is not task
+        assert copied.to_dict() == task.to_dict()
+        assert copied.project.name == "Project"
+        assert copied.assignee.username == "user0"
+        assert restored.description == "Long text"
+        assert restored.project.id == project_id
+        assert '_relations' in vars(task)
+
+
+# Запрос, который без отмены выполнялся бы очень долго
+ENDLESS_QUERY = """
+    WITH RECURSIVE counter(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM counter)
+    SELECT count(*) FROM counter
+"""
+
+
+class TestCancellation:
+
+    def setup_method(self):
+        self.db = DatabaseManager(":memory:")
+        user_id = self.db.add_user(User(username="user", email="user@example.com",
+                                        role="developer"))
+        project_id = self.db.add_project(Project(name="Project", description="",
+                                                 start_date=datetime.now(),
+                                                 end_date=datetime.now() + timedelta(days=30)))
+        self.db.add_task(Task(title="Task", description="", priority=1,
+                              due_date=datetime.now() + timedelta(days=1),
+                              project_id=project_id, assignee_id=user_id))
+
+    def teardown_method(self):
+        self.db.close()
+
+    def test_cancel_from_another_thread(self):
+        token = CancellationToken()
+        timer = threading.Timer(0.05, token.cancel)
+        started = time.monotonic()
+        timer.start()
+        try:
+            with pytest.raises(QueryCancelled, match="Запрос отменён"):
+                with self.db.cancellable(token):
+                    self.db.fetch_all(ENDLESS_QUERY)
+        finally:
+            timer.cancel()
+        
+        assert time.monotonic() - started < 2
+        assert self.db.fetch_one("SELECT 1 AS one")['one'] == 1
+
+    def test_deadline_interrupts_query(self):
+        started = time.monotonic()
+        
+        with pytest.raises(QueryCancelled, match="Превышено время"):
+            with self.db.cancellable(CancellationToken(timeout=0.05)):
+                self.db.fetch_all(ENDLESS_QUERY)
+        
+        assert time.monotonic() - started < 2
+        # Обработчик прогресса снят: запросы без токена не прерываются
+        assert [task.title for task in self.db.query_tasks(TaskQuery())] == ["Task"]
+
+    def test_cancelled_token_stops_before_query(self):
+        token = CancellationToken()
+        token.cancel()
+        statements = []
+        self.db.connection.set_trace_callback(statements.append)
+        
+        with pytest.raises(QueryCancelled):
+            self.db.query_tasks(TaskQuery().search("Task"), token)
+        with pytest.raises(QueryCancelled):
+            self.db.search_tasks("Task", token)
+        
+        self.db.connection.set_trace_callback(None)
+        assert statements == []
+        # Прерванный запрос не попадает в кэш
+        assert [task.title for task in self.db.search_tasks("Task")] == ["Task"]
+
+    def test_nested_blocks_check_inner_deadline(self):
+        outer = CancellationToken()
+        
+        with self.db.cancellable(outer):
+            with pytest.raises(QueryCancelled):
+                with self.db.cancellable(CancellationToken(timeout=0.05)):
+                    self.db.fetch_all(ENDLESS_QUERY)
+            assert self.db.fetch_one("SELECT 1 AS one")['one'] == 1
+        
+        assert not outer.cancelled
+
+    def test_other_errors_are_not_cancellations(self):
+        with pytest.raises(sqlite3.OperationalError):
+            with self.db.cancellable(CancellationToken(timeout=60)):
+                self.db.fetch_all("SELECT * FROM missing_table")
+
+    def test_errors_after_cancel_keep_their_type(self):
+        token = CancellationToken()
+        with pytest.raises(ValueError, match="Неверные данные"):
+            with self.db.cancellable(token):
+                token.cancel()
+                raise ValueError("Неверные данные")
+
+
+class TestReadSnapshot:
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.temp_dir.name, "snapshot.db"))
+        self.user_id = self.db.add_user(User(username="user", email="user@example.com",
+                                             role="developer"))
+        self.project_id = self.db.add_project(Project(
+            name="Project", description="", start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=30)))
+        self._add_task("First")
+
+    def teardown_method(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def _add_task(self, title):
+        return self.db.add_task(Task(title=title, description="", priority=1,
+                                     due_date=datetime.now() + timedelta(days=1),
+                                     project_id=self.project_id, assignee_id=self.user_id))
+
+    def test_snapshot_ignores_later_writes(self):
+        with self.db.read_snapshot() as snapshot:
+            assert [task.title for task in snapshot.get_all_tasks()] == ["First"]
+            # Запись не ждёт завершения отчёта
+            self._add_task("Second")
+            assert self.db.update_project(self.project_id, name="Renamed") == True
+            
+            assert [task.title for task in snapshot.get_all_tasks()] == ["First"]
+            assert snapshot.get_counts()['tasks'] == 1
+            assert snapshot.get_project_by_id(self.project_id).name == "Project"
+            assert [t.project.name for t in snapshot.iter_tasks()] == ["Project"]
+            assert snapshot.get_project_stats(self.project_id)['total'] == 1
+        
+        assert self.db.fetch_one("PRAGMA journal_mode")['journal_mode'] == "wal"
+        with self.db.read_snapshot() as snapshot:
+            assert snapshot.get_counts()['tasks'] == 2
+            assert snapshot.get_project_by_id(self.project_id).name == "Renamed"
+
+    def test_snapshot_is_read_only(self):
+        with self.db.read_snapshot() as snapshot:
+            with pytest.raises(Exception, match="readonly"):
+                snapshot.delete_task(1)
+        
+        assert self.db.get_counts()['tasks'] == 1
+
+    def test_memory_database_has_no_snapshots(self):
+        db = DatabaseManager(":memory:")
+        try:
+            with pytest.raises(Exception, match="в памяти"):
+                with db.read_snapshot():
+                    pass
+        finally:
+            db.close()
+
+
+class TestWriteQueue:
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_file = os.path.join(self.temp_dir.name, "writes.db")
+        self.db = DatabaseManager(self.db_file)
+        self.user_id = self.db.add_user(User(username="user", email="user@example.com",
+                                             role="developer"))
+        self.project_id = self.db.add_project(Project(
+            name="Project", description="", start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=30)))
+
+    def teardown_method(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def _task(self, title, project_id=None):
+        return Task(title=title, description="", priority=1,
+                    due_date=datetime.now() + timedelta(days=1),
+                    project_id=project_id or self.project_id, assignee_id=self.user_id)
+
+    def test_commands_are_committed_in_groups(self):
+        with WriteQueue(self.db_file, max_delay=0.05) as writes:
+            futures = [writes.add_task(self._task(f"Task {i}")) for i in range(20)]
+            task_ids = [future.result(timeout=5) for future in futures]
+            updated = writes.update_task(task_ids[0], status="completed").result(timeout=5)
+            missing = writes.update_task(99999, status="completed").result(timeout=5)
+            stats = writes.stats()
+        
+        assert len(set(task_ids)) == 20
+        assert updated == True and missing == False
+        assert stats['commands'] == 22
+        assert stats['batches'] < stats['commands']
+        assert self.db.get_counts()['tasks'] == 20
+        assert self.db.get_task_by_id(task_ids[0]).status == "completed"
+
+    def test_failed_command_does_not_roll_back_group(self):
+        with WriteQueue(self.db_file, max_delay=0.05) as writes:
+            first = writes.add_task(self._task("First"))
+            broken = writes.add_task(self._task("Broken", project_id=99999))
+            deleted = writes.submit('delete_projects', [99999])
+            last = writes.add_task(self._task("Last"))
+            
+            with pytest.raises(ValueError, match="Проект с ID 99999 не найден"):
+                broken.result(timeout=5)
+            assert deleted.result(timeout=5) == 0
+            assert first.result(timeout=5) and last.result(timeout=5)
+            assert writes.stats()['batches'] == 1
+        
+        assert [task.title for task in self.db.get_all_tasks()] == ["First", "Last"]
+
+    def test_failed_group_resets_added_ids(self, monkeypatch):
+        def failing_commit(connection):
+            if not connection.deferred_commit:
+                raise sqlite3.OperationalError("disk I/O error")
+        
+        task = self._task("Rolled back")
+        with WriteQueue(self.db_file, max_delay=0.05) as writes:
+            monkeypatch.setattr(InstrumentedConnection, "commit", failing_commit)
+            future = writes.add_task(task)
+            with pytest.raises(Exception, match="Ошибка базы данных: disk I/O error"):
+                future.result(timeout=5)
+            monkeypatch.undo()
+        
+        assert task.id is None
+        assert self.db.get_counts()['tasks'] == 0
+
+    def test_batch_size_limits_group(self):
+        with WriteQueue(self.db_file, batch_size=2, max_delay=0.05) as writes:
+            futures = [writes.add_task(self._task(f"Task {i}")) for i in range(5)]
+            for future in futures:
+                future.result(timeout=5)
+            assert writes.stats()['batches'] >= 3
+
+    def _produce(self, writes, task_ids, worker):
+        for task_id in task_ids:
+            writes.update_task(task_id, priority=worker % 3 + 1).result(timeout=5)
+
+    def test_concurrent_producers(self):
+        task_ids = [self.db.add_task(self._task(f"Task {i}")) for i in range(10)]
+        
+        with WriteQueue(self.db_file) as writes, ThreadPoolExecutor(max_workers=4) as producers:
+            runs = [producers.submit(self._produce, writes, task_ids, i) for i in range(4)]
+            for run in runs:
+                run.result(timeout=10)
+            stats = writes.stats()
+        
+        assert stats['commands'] == 40
+
+    def test_close_drains_queue_and_rejects_new_commands(self):
+        writes = WriteQueue(self.db_file, max_delay=0.05)
+        future = writes.add_task(self._task("Pending"))
+        writes.close()
+        
+        assert future.result(timeout=0) > 0
+        with pytest.raises(Exception, match="Очередь записи закрыта"):
+            writes.add_task(self._task("Late"))
+        with WriteQueue(self.db_file) as other:
+            with pytest.raises(ValueError):
+                other.submit('get_all_tasks')
+
+
+class TestAsyncDatabaseManager:
+
+    def setup_method(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.db_file = self.temp_db.name
+        self.temp_db.close()
+
+    def teardown_method(self):
+        if os.path.exists(self.db_file):
+            os.unlink(self.db_file)
+
+    def test_crud_roundtrip(self):
+        async def scenario():
+            async with AsyncDatabaseManager(self.db_file) as db:
+                user_id = await db.add_user(User(
+                    username="testuser",
+                    email="test@example.com",
+                    role="developer"
+                ))
+                project_id = await db.add_project(Project(
+                    name="Test Project",
+                    description="Test Description",
+                    start_date=datetime.now(),
+                    end_date=datetime.now() + timedelta(days=30)
+                ))
+                task_id = await db.add_task(Task(
+                    title="Async Task",
+                    description="Test Description",
+                    priority=1,
+                    due_date=datetime.now() + timedelta(days=7),
+                    project_id=project_id,
+                    assignee_id=user_id
+                ))
+
+                assert await db.update_task(task_id, status="completed") == True
+                task = await db.get_task_by_id(task_id)
+                found = await db.search_tasks("Async")
+                return task, found
+
+        task, found = asyncio.run(scenario())
+
+        assert task.status == "completed"
+        assert [t.title for t in found] == ["Async Task"]
+
+    def test_iter_users_streams_in_batches(self):
+        async def scenario():
+            async with AsyncDatabaseManager(self.db_file) as db:
+                for i in range(5):
+                    await db.add_user(User(
+                        username=f"user{i}",
+                        email=f"user{i}@example.com",
+                        role="developer"
+                    ))
+                return [user.username async for user in db.iter_users(batch_size=2)]
+
+        usernames = asyncio.run(scenario())
+
+        assert usernames == [f"user{i}" for i in range(5)]
+
+    def test_cancelled_coroutine_interrupts_query(self):
+        async def scenario():
+            async with AsyncDatabaseManager(self.db_file) as db:
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(
+                        db.run_cancellable(None, db.db_manager.fetch_all, ENDLESS_QUERY), 0.05)
+                # Поток базы данных освободился и выполняет следующие запросы
+                return await asyncio.wait_for(db.fetch_one("SELECT 1 AS one"), 2)
+
+        assert asyncio.run(scenario())['one'] == 1
+
+    def test_open_does_not_block_event_loop(self, monkeypatch):
+        def slow_open(*args):
+            time.sleep(0.3)
+            return DatabaseManager(*args)
+        monkeypatch.setattr(async_database_manager, "DatabaseManager", slow_open)
+        
+        async def scenario():
+            ticks = []
+            
+            async def tick():
+                while True:
+                    ticks.append(time.perf_counter())
+                    await asyncio.sleep(0.01)
+            
+            ticker = asyncio.create_task(tick())
+            await asyncio.sleep(0)
+            started = time.perf_counter()
+            db = await AsyncDatabaseManager.open(self.db_file)
+            opened = time.perf_counter() - started
+            ticker.cancel()
+            try:
+                return opened, len(ticks), await db.fetch_one("SELECT 1 AS one")
+            finally:
+                await db.close()
+        
+        opened, ticks, row = asyncio.run(scenario())
+        
+        assert opened >= 0.3
+        assert ticks > 5
+        assert row['one'] == 1
+
+    def test_lazy_attributes_load_in_database_thread(self):
+        async def scenario():
+            async with AsyncDatabaseManager(self.db_file) as db:
+                user_id = await db.add_user(User(
+                    username="testuser",
+                    email="test@example.com",
+                    role="developer"
+                ))
+                project_id = await db.add_project(Project(
+                    name="Test Project",
+                    description="Test Description",
+                    start_date=datetime.now(),
+                    end_date=datetime.now() + timedelta(days=30)
+                ))
+                await db.add_task(Task(
+                    title="Async Task",
+                    description="Long description",
+                    priority=1,
+                    due_date=datetime.now() + timedelta(days=7),
+                    project_id=project_id,
+                    assignee_id=user_id
+                ))
+                task = (await db.get_all_tasks())[0]
+                [partial] = await db.get_all_tasks(columns=['title'])
+                return (task.project.name, task.assignee.username,
+                        partial.description, partial.project.id == project_id)
+
+        assert asyncio.run(scenario()) == ("Test Project", "testuser", "Long description", True)
+
+
+class TestMigrations:
+
+    def setup_method(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.db_file = self.temp_db.name
+        self.temp_db.close()
+
+    def teardown_method(self):
+        if os.path.exists(self.db_file):
+            os.unlink(self.db_file)
+
+    def _create_legacy_database(self):
+        connection = sqlite3.connect(self.db_file)
+        connection.executescript("""
+            CREATE TABLE users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL UNIQUE,
+                email TEXT NOT NULL UNIQUE,
+                role TEXT NOT NULL CHECK(role IN ('admin', 'manager', 'developer')),
+                registration_date TEXT NOT NULL
+            );
+            CREATE TABLE projects (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                description TEXT,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                status TEXT NOT NULL CHECK(status IN ('active', 'completed', 'on_hold'))
+            );
+            CREATE TABLE tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                description TEXT,
+                priority INTEGER NOT NULL CHECK(priority IN (1, 2, 3)),
+                status TEXT NOT NULL CHECK(status IN ('pending', 'in_progress', 'completed')),
+                due_date TEXT NOT NULL,
+                project_id INTEGER NOT NULL,
+                assignee_id INTEGER NOT NULL,
+                FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE,
+                FOREIGN KEY (assignee_id) REFERENCES users (id) ON DELETE CASCADE
+            );
+            CREATE INDEX idx_tasks_project_id ON tasks(project_id);
+            CREATE INDEX idx_tasks_assignee_id ON tasks(assignee_id);
+            INSERT INTO users (username, email, role, registration_date)
+            VALUES ('legacy', 'legacy@example.com', 'admin', '2024-01-01T00:00:00');
+        """)
+        connection.commit()
+        connection.close()
+
+    def _index_names(self, connection):
+        rows = connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        return {row[0] for row in rows}
+
+    def test_new_database_is_at_latest_version(self):
+        db = DatabaseManager(self.db_file)
+        
+        assert db.schema_version() == MigrationRunner(db.connection).latest_version
+        assert db.migrate() == []
+        
+        db.close()
+
+    def test_dry_run_then_migrate_legacy_database(self):
+        self._create_legacy_database()
+        
+        connection = sqlite3.connect(self.db_file)
+        runner = MigrationRunner(connection)
+        plan = runner.migrate(dry_run=True)
+        
+        assert [step['version'] for step in plan] == [1, 2, 3, 4, 5]
+        assert all(step['statements'] for step in plan)
+        assert runner.current_version() == 0
+        assert 'idx_tasks_due_date' not in self._index_names(connection)
+        connection.close()
+        
+        db = DatabaseManager(self.db_file)
+        
+        assert db.schema_version() == 5
+        assert db.get_all_users()[0].username == "legacy"
+        indexes = self._index_names(db.connection)
+        assert 'idx_tasks_due_date' in indexes
+        assert 'idx_tasks_project_id' not in indexes
+        
+        db.close()
+
+    def test_backfill_runs_in_batches(self):
+        connection = sqlite3.connect(self.db_file)
+        connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+        connection.executemany("INSERT INTO items (name) VALUES (?)",
+                               [(f"item{i}",) for i in range(25)])
+        connection.commit()
+        
+        migrations = [
+            Migration(1, "Столбец с верхним регистром",
+                      ["ALTER TABLE items ADD COLUMN upper_name TEXT"],
+                      backfills=[Backfill("items", "upper_name = upper(name)",
+                                          "upper_name IS NULL", batch_size=10)],
+                      finalize=["CREATE INDEX idx_items_upper_name ON items(upper_name)"])
+        ]
+        progress = []
+        runner = MigrationRunner(connection, migrations)
+        runner.migrate(progress_callback=lambda table, done: progress.append(done))
+        
+        assert progress == [10, 20, 25]
+        assert runner.current_version() == 1
+        assert connection.execute(
+            "SELECT COUNT(*) FROM items WHERE upper_name IS NULL").fetchone()[0] == 0
+        assert 'idx_items_upper_name' in self._index_names(connection)
+        connection.close()
+
+    def _populate(self, db):
+        user_id = db.add_user(User(
+            username="testuser",
+            email="test@example.com",
+            role="manager"
+        ))
+        project_id = db.add_project(Project(
+            name="Test Project",
+            description="Test Description",
+            start_date=datetime.now() - timedelta(days=30),
+            end_date=datetime.now() + timedelta(days=30),
+            status="on_hold"
+        ))
+        task_id = db.add_task(Task(
+            title="Test Task",
+            description="Test Description",
+            priority=2,
+            due_date=datetime.now() - timedelta(days=1),
+            project_id=project_id,
+            assignee_id=user_id,
+            status="in_progress"
+        ))
+        return user_id, project_id, task_id
+
+    def test_compact_enums_store_integers(self):
+        db = DatabaseManager(self.db_file, compact_enums=True)
+        user_id, project_id, task_id = self._populate(db)
+        
+        row = db.fetch_one("SELECT status FROM tasks WHERE id = ?", (task_id,))
+        assert row['status'] == 1
+        assert db.fetch_one("SELECT role FROM users WHERE id = ?", (user_id,))['role'] == 1
+        
+        db.clear_cache()
+        assert db.get_task_by_id(task_id).status == "in_progress"
+        assert db.get_project_by_id(project_id).status == "on_hold"
+        assert db.get_user_by_id(user_id).role == "manager"
+        assert [task.id for task in db.get_overdue_tasks()] == [task_id]
+        
+        assert db.update_task(task_id, status="completed")
+        assert db.get_overdue_tasks() == []
+        
+        with pytest.raises(sqlite3.IntegrityError, match="CHECK constraint failed"):
+            db.connection.execute("UPDATE tasks SET status = 7 WHERE id = ?", (task_id,))
+        
+        db.close()
+        
+        reopened = DatabaseManager(self.db_file)
+        assert reopened.codec.compact_enums
+        assert reopened.get_task_by_id(task_id).status == "completed"
+        reopened.close()
+
+    def test_convert_storage_preserves_data_and_schema(self):
+        db = DatabaseManager(self.db_file)
+        user_id, project_id, task_id = self._populate(db)
+        db.delete_task(db.add_task(Task(
+            title="Removed Task",
+            description="Test Description",
+            priority=1,
+            due_date=datetime.now(),
+            project_id=project_id,
+            assignee_id=user_id
+        )))
+        objects_before = {row['name'] for row in db.fetch_all(
+            "SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger')")}
+        seq_before = db.latest_change_seq()
+        
+        plan = db.convert_storage(compact_enums=True, dry_run=True)
+        assert any(sql.startswith("CREATE TABLE tasks__rebuild") for sql in plan)
+        assert not db.codec.compact_enums
+        
+        assert db.convert_storage(compact_enums=True)
+        assert db.codec.compact_enums
+        assert db.convert_storage(compact_enums=True) == []
+        
+        objects_after = {row['name'] for row in db.fetch_all(
+            "SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger')")}
+        assert objects_after == objects_before
+        assert db.latest_change_seq() == seq_before
+        assert db.fetch_one("SELECT status FROM tasks WHERE id = ?", (task_id,))['status'] == 1
+        assert db.get_task_by_id(task_id).status == "in_progress"
+        assert db.get_user_by_id(user_id).role == "manager"
+        
+        new_task_id = db.add_task(Task(
+            title="New Task",
+            description="Test Description",
+            priority=3,
+            due_date=datetime.now() + timedelta(days=1),
+            project_id=project_id,
+            assignee_id=user_id
+        ))
+        assert new_task_id == task_id + 2
+        assert db.get_project_stats(project_id) == {
+            'total': 2, 'pending': 1, 'in_progress': 1, 'completed': 0}
+        
+        assert db.delete_project(project_id)
+        assert db.get_all_tasks() == []
+        assert db.get_all_project_stats() == {}
+        
+        db.close()
+
+    def test_project_stats_filled_for_existing_tasks(self):
+        db = DatabaseManager(self.db_file)
+        user_id, project_id, task_id = self._populate(db)
+        db.connection.executescript("""
+            DROP TABLE project_stats;
+            DROP TRIGGER trg_tasks_insert_project_stats;
+            DROP TRIGGER trg_tasks_delete_project_stats;
+            DROP TRIGGER trg_tasks_update_project_stats;
+            DROP TRIGGER trg_projects_delete_project_stats;
+            PRAGMA user_version = 3;
+        """)
+        db.close()
+        
+        db = DatabaseManager(self.db_file)
+        
+        assert db.schema_version() == 5
+        assert db.get_project_stats(project_id) == {
+            'total': 1, 'pending': 0, 'in_progress': 1, 'completed': 0}
+        
+        db.close()
+
+    def test_compact_overdue_query_uses_partial_index(self):
+        db = DatabaseManager(self.db_file, compact_enums=True)
+        statements = []
+        db.connection.set_trace_callback(statements.append)
+        db.get_overdue_tasks()
+        db.connection.set_trace_callback(None)
+        
+        plan = " | ".join(row[3] for row in db.connection.execute(
+            "EXPLAIN QUERY PLAN " + statements[-1]))
+        assert "idx_tasks_open_due_date" in plan
+        assert "USE TEMP B-TREE" not in plan
+        
+        db.close()
+
+    def test_epoch_dates_store_integers(self):
+        db = DatabaseManager(self.db_file, epoch_dates=True)
+        user_id, project_id, task_id = self._populate(db)
+        
+        raw = db.connection.execute(
+            "SELECT typeof(due_date), due_date FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        assert raw[0] == 'integer'
+        assert isinstance(raw[1], datetime)
+        
+        db.clear_cache()
+        task = db.get_task_by_id(task_id)
+        expected = (datetime.now() - timedelta(days=1)).replace(microsecond=0)
+        assert abs(task.due_date - expected) <= timedelta(seconds=2)
+        assert task.due_date.microsecond == 0
+        assert [t.id for t in db.get_overdue_tasks()] == [task_id]
+        
+        new_due = datetime(2030, 5, 17, 9, 30, 15)
+        assert db.update_task(task_id, due_date=new_due)
+        db.clear_cache()
+        assert db.get_task_by_id(task_id).due_date == new_due
+        assert db.get_overdue_tasks() == []
+        
+        db.close()
+
+    def test_convert_dates_between_text_and_epoch(self):
+        db = DatabaseManager(self.db_file)
+        user_id, project_id, task_id = self._populate(db)
+        due_date = datetime(2024, 2, 29, 23, 59, 58)
+        db.update_task(task_id, due_date=due_date)
+        
+        assert db.convert_storage(epoch_dates=True)
+        assert db.codec.epoch_dates and not db.codec.compact_enums
+        assert db.fetch_one(
+            "SELECT due_date FROM tasks WHERE id = ?", (task_id,))['due_date'] == due_date
+        assert db.connection.execute(
+            "SELECT due_date FROM tasks WHERE id = ?", (task_id,)).fetchone()[0] == due_date
+        assert db.fetch_one(
+            "SELECT CAST(due_date AS INTEGER) AS raw FROM tasks WHERE id = ?",
+            (task_id,))['raw'] == 1709251198
+        
+        assert db.convert_storage(epoch_dates=False)
+        assert db.fetch_one("SELECT due_date FROM tasks WHERE id = ?",
+                            (task_id,))['due_date'] == "2024-02-29T23:59:58"
+        assert db.get_task_by_id(task_id).due_date == due_date
+        
+        db.close()
@@ -175,6 +175,47 @@ class TestTaskModel:
         assert task_dict["project_id"] == 1
         assert task_dict["assignee_id"] == 1
 
+    def test_from_row_matches_constructor(self):
+        due_date = datetime.now() + timedelta(days=7)
+        task = Task(
+            title="Test Task",
+            description="Test Description",
+            priority=2,
+            due_date=due_date,
+            project_id=1,
+            assignee_id=1,
+            id=5,
+            status="in_progress"
+        )
+        
+        restored = Task.from_row(dict(vars(task)))
+        
+        assert isinstance(restored, Task)
+        assert restored.to_dict() == task.to_dict()
+        restored.update_status("completed")
+        assert restored.status == "completed"
+
+    def test_relations_without_database(self):
+        task = Task(
+            title="Test Task",
+            description="Test Description",
+            priority=2,
+            due_date=datetime.now(),
+            project_id=1,
+            assignee_id=1
+        )
+        
+        assert task.project is None
+        assert task.assignee is None
+
+    def test_from_row_skips_validation(self):
+        # Доверенный путь не проверяет значения: их гарантирует схема базы
+        task = Task.from_row({'id': 1, 'title': "Test Task", 'priority': 7})
+        
+        assert task.priority == 7
+        with pytest.raises(AttributeError):
+            task.status
+
 
 class TestProjectModel:
     
@@ -340,6 +381,20 @@ class TestProjectModel:
         assert project_dict["status"] == "active"
         assert "progress" in project_dict
         assert isinstance(project_dict["progress"], float)
+    
+    def test_to_dict_progress_uses_task_counts(self):
+        start_date = datetime.now()
+        end_date = start_date + timedelta(days=30)
+        project = Project(
+            name="Test Project",
+            description="Test Description",
+            start_date=start_date,
+            end_date=end_date,
+            status="active"
+        )
+        
+        assert project.to_dict(total=4, completed=1)["progress"] == 25.0
+        assert project.to_dict(4, 1)["progress"] == project.get_progress(4, 1)
 
 
 class TestUserModel:
@@ -471,4 +526,19 @@ class TestUserModel:
         assert user_dict["username"] == "testuser"
         assert user_dict["email"] == "test@example.com"
         assert user_dict["role"] == "developer"
-        assert user_dict["registration_date"] == reg_date.isoformat()
\ No newline at end of file
+        assert user_dict["registration_date"] == reg_date.isoformat()
+
+    def test_from_row_matches_constructor(self):
+        user = User(
+            username="testuser",
+            email="test@example.com",
+            role="developer",
+            id=12,
+            registration_date=datetime.now()
+        )
+        
+        restored = User.from_row(dict(vars(user)))
+        
+        assert restored.to_dict() == user.to_dict()
+        with pytest.raises(ValueError, match="Некорректный email адрес"):
+            restored.update_info(email="invalid-email")
@@ -1,11 +1,24 @@
-from .main_window import MainWindow
-from .task_view import TaskView
-from .project_view import ProjectView
-from .user_view import UserView
+import importlib
+
+# Представления импортируются при первом обращении: при запуске приложения
+# модули вкладок загружаются только когда вкладка открывается
+_MODULES = {
+    'MainWindow': 'views.main_window',
+    'TaskView': 'views.task_view',
+    'ProjectView': 'views.project_view',
+    'UserView': 'views.user_view',
+}
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_MODULES[name]), name)
+
 
 __all__ = [
     'MainWindow',
     'TaskView', 
     'ProjectView',
     'UserView'
-]
\ No newline at end of file
+]
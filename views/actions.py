@@ -0,0 +1,65 @@
+from tkinter import messagebox
+
+# Тексты сценария удаления для каждого вида сущностей
+DELETE_MESSAGES = {
+    'tasks': {
+        'select': "Выберите задачу для удаления",
+        'missing': "Задача не найдена",
+        'confirm': "Вы уверены, что хотите удалить задачу '{}'?",
+        'done': "Задача успешно удалена",
+        'failed': "Не удалось удалить задачу",
+    },
+    'projects': {
+        'select': "Выберите проект для удаления",
+        'missing': "Проект не найден",
+        'confirm': "Вы уверены, что хотите удалить проект '{}'?",
+        'done': "Проект успешно удален",
+        'failed': "Не удалось удалить проект",
+    },
+    'users': {
+        'select': "Выберите пользователя для удаления",
+        'missing': "Пользователь не найден",
+        'confirm': "Вы уверены, что хотите удалить пользователя '{}'?",
+        'done': "Пользователь успешно удален",
+        'failed': "Не удалось удалить пользователя",
+    },
+}
+
+
+def delete_selected_entity(store, kind, entity_id, label, delete) -> bool:
+    # Общий сценарий вкладок: проверка выбора, подтверждение, удаление
+    # через контроллер и удаление из хранилища; True, если запись удалена
+    messages = DELETE_MESSAGES[kind]
+    if not entity_id:
+        messagebox.showwarning("Удаление", messages['select'])
+        return False
+
+    name = _entity_label(store, kind, entity_id, label)
+    if not name:
+        messagebox.showerror("Ошибка", messages['missing'])
+        return False
+
+    if not messagebox.askyesno("Удаление", messages['confirm'].format(name)):
+        return False
+
+    if not _delete(delete, entity_id, messages):
+        return False
+    messagebox.showinfo("Успех", messages['done'])
+    store.remove(kind, entity_id)
+    return True
+
+
+def _delete(delete, entity_id, messages) -> bool:
+    try:
+        deleted = delete(entity_id)
+    except Exception as e:
+        messagebox.showerror("Ошибка", f"Ошибка удаления: {e}")
+        return False
+    if not deleted:
+        messagebox.showerror("Ошибка", messages['failed'])
+    return bool(deleted)
+
+
+def _entity_label(store, kind, entity_id, label) -> str:
+    entity = store.get(kind, entity_id)
+    return label(entity) if entity else ""
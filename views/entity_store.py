@@ -0,0 +1,128 @@
+import functools
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+KINDS = ('tasks', 'projects', 'users')
+# Списку проектов нужно только начало описания, полный текст из базы не читается
+PROJECT_LIST_COLUMNS = ('name', 'description_preview', 'start_date', 'end_date', 'status')
+
+# Задачи удаляются каскадно вместе с проектом или исполнителем
+CASCADES = {
+    'projects': 'project_id',
+    'users': 'assignee_id',
+}
+
+
+class EntityStore:
+    # Общие для всех вкладок загруженные сущности, проиндексированные по ID.
+    # Представления подписываются на изменения и перерисовываются из хранилища,
+    # поэтому каждая запись хранится в памяти один раз
+    def __init__(self, task_controller=None, project_controller=None,
+                 user_controller=None) -> None:
+        self._loaders = {}
+        if task_controller is not None:
+            self._loaders['tasks'] = (task_controller.get_all_tasks, task_controller.get_task,
+                                      task_controller.get_tasks_by_ids)
+        if project_controller is not None:
+            self._loaders['projects'] = (functools.partial(project_controller.get_all_projects,
+                                                           PROJECT_LIST_COLUMNS),
+                                         project_controller.get_project,
+                                         project_controller.get_projects_by_ids)
+        if user_controller is not None:
+            self._loaders['users'] = (user_controller.get_all_users, user_controller.get_user,
+                                      user_controller.get_users_by_ids)
+        self._entities: Dict[str, Dict[int, Any]] = {kind: {} for kind in KINDS}
+        # Виды, загруженные целиком; задачи обычно подгружаются частями
+        # через merge по результатам фильтров
+        self._complete: Set[str] = set()
+        self._subscribers: List[tuple] = []
+
+    def subscribe(self, callback: Callable[[str], None],
+                  kinds: Optional[Iterable[str]] = None) -> None:
+        self._subscribers.append((callback, frozenset(kinds or KINDS)))
+
+    def unsubscribe(self, callback: Callable[[str], None]) -> None:
+        self._subscribers = [item for item in self._subscribers if item[0] != callback]
+
+    def is_loaded(self, kind: str) -> bool:
+        return kind in self._complete
+
+    def all(self, kind: str) -> List[Any]:
+        return list(self._load(kind).values())
+
+    def get(self, kind: str, entity_id: int) -> Optional[Any]:
+        entity = self._entities[kind].get(entity_id)
+        if entity is None and kind not in self._complete:
+            entity = self._load(kind).get(entity_id)
+        return entity
+
+    def get_many(self, kind: str, entity_ids: Iterable[int]) -> Dict[int, Any]:
+        # Недостающие записи догружаются одним пакетным запросом,
+        # а не загрузкой всего вида
+        known = self._entities[kind]
+        entity_ids = list(entity_ids)
+        missing = [entity_id for entity_id in entity_ids if entity_id not in known]
+        if missing and kind not in self._complete:
+            self.merge(kind, self._loaders[kind][2](missing).values())
+        return {entity_id: known[entity_id] for entity_id in entity_ids if entity_id in known}
+
+    def merge(self, kind: str, entities: Iterable[Any]) -> List[Any]:
+        # Результат запроса заменяет устаревшие экземпляры в хранилище;
+        # это чтение, поэтому подписчики не уведомляются
+        known = self._entities[kind]
+        result = []
+        for entity in entities:
+            known[entity.id] = entity
+            result.append(entity)
+        return result
+
+    def reload(self, kind: str) -> None:
+        # Целиком загруженный вид перечитывается сразу, остальные
+        # подгрузятся заново по запросам подписчиков
+        complete = kind in self._complete
+        self._entities[kind] = {}
+        self._complete.discard(kind)
+        if complete:
+            self._load(kind)
+        self._notify(kind)
+
+    def reload_loaded(self) -> None:
+        for kind in [kind for kind in KINDS if kind in self._complete or self._entities[kind]]:
+            self.reload(kind)
+
+    def refresh(self, kind: str, entity_id: int) -> Optional[Any]:
+        # Перечитывает одну запись после изменения; пропавшая запись удаляется
+        entity = self._loaders[kind][1](entity_id)
+        if entity is None:
+            self.remove(kind, entity_id)
+        else:
+            self.put(kind, entity)
+        return entity
+
+    def put(self, kind: str, entity: Any) -> None:
+        self._entities[kind][entity.id] = entity
+        self._notify(kind)
+
+    def remove(self, kind: str, entity_id: int) -> None:
+        if self._entities[kind].pop(entity_id, None) is not None:
+            self._notify(kind)
+
+        column = CASCADES.get(kind)
+        if column:
+            # Подписчики на задачи уведомляются всегда: каскадно удалённые
+            # задачи могли быть ещё не загружены в хранилище
+            tasks = self._entities['tasks']
+            for task_id in [task.id for task in tasks.values()
+                            if getattr(task, column) == entity_id]:
+                del tasks[task_id]
+            self._notify('tasks')
+
+    def _load(self, kind: str) -> Dict[int, Any]:
+        if kind not in self._complete:
+            self._entities[kind] = {entity.id: entity for entity in self._loaders[kind][0]()}
+            self._complete.add(kind)
+        return self._entities[kind]
+
+    def _notify(self, kind: str) -> None:
+        for callback, kinds in list(self._subscribers):
+            if kind in kinds:
+                callback(kind)
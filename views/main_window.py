@@ -1,12 +1,22 @@
 import tkinter as tk
 from tkinter import ttk, Menu
+from database.cancellation import CancellationToken, QueryCancelled
 from database.database_manager import DatabaseManager
 from controllers.task_controller import TaskController
 from controllers.project_controller import ProjectController
 from controllers.user_controller import UserController
-from views.task_view import TaskView
-from views.project_view import ProjectView
-from views.user_view import UserView
+from views.entity_store import EntityStore
+from views.search_runner import SearchRunner
+
+# Вкладки в порядке отображения: ключ, заголовок и модуль представления.
+# Модули импортируются при первом открытии вкладки
+TABS = (
+    ('tasks', "Задачи", 'views.task_view', 'TaskView'),
+    ('projects', "Проекты", 'views.project_view', 'ProjectView'),
+    ('users', "Пользователи", 'views.user_view', 'UserView'),
+)
+# Бюджет времени полного обновления; долгие запросы прерываются
+REFRESH_BUDGET_S = 10.0
 
 
 class MainWindow:
@@ -19,6 +29,18 @@ class MainWindow:
         self.task_controller = TaskController(self.db_manager)
         self.project_controller = ProjectController(self.db_manager)
         self.user_controller = UserController(self.db_manager)
+        # Поиск задач идёт через своё соединение в фоновом потоке; базу
+        # в памяти второе соединение не видит, там поиск остаётся синхронным
+        self.searcher = SearchRunner(db_path) if db_path != ":memory:" else None
+        
+        # Все вкладки работают с одним набором загруженных сущностей
+        self.store = EntityStore(self.task_controller, self.project_controller,
+                                 self.user_controller)
+        self.store.subscribe(self._on_store_changed)
+        
+        self._views = {}
+        self._tab_frames = {}
+        self.loaded = False
         
         self._create_menu()
         
@@ -27,6 +49,7 @@ class MainWindow:
         self._create_status_bar()
         
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
+        self.root.bind("<Map>", self._on_first_map, add="+")
 
     def _create_menu(self):
         menubar = Menu(self.root)
@@ -64,30 +87,86 @@ class MainWindow:
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        self.task_view = TaskView(self.notebook, self.task_controller, 
-                                 self.project_controller, self.user_controller)
-        self.project_view = ProjectView(self.notebook, self.project_controller)
-        self.user_view = UserView(self.notebook, self.user_controller)
+        # Пока вкладка не открыта, в ней лежит пустая рамка, а представление
+        # строится при первом переключении на неё
+        for key, text, _, _ in TABS:
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=text)
+            self._tab_frames[key] = frame
         
-        self.notebook.add(self.task_view, text="Задачи")
-        self.notebook.add(self.project_view, text="Проекты")
-        self.notebook.add(self.user_view, text="Пользователи")
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
 
     def _create_status_bar(self):
-        self.status_bar = tk.Label(self.root, text="Готово", bd=1, relief=tk.SUNKEN, anchor=tk.W)
+        self.status_bar = tk.Label(self.root, text="Загрузка...", bd=1, relief=tk.SUNKEN,
+                                   anchor=tk.W)
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
-        
+
+    def _on_first_map(self, event):
+        # <Map> от дочерних виджетов тоже доходит до привязки окна верхнего уровня
+        if event.widget is not self.root:
+            return
+        self.root.unbind("<Map>")
+        # Данные загружаются после того, как цикл событий отрисует окно:
+        # idle-задача ставит таймер, и он срабатывает после обработки Expose
+        self.root.update_idletasks()
+        self.root.after_idle(self.root.after, 0, self._load_initial)
+
+    def _load_initial(self):
+        self.loaded = True
+        self._get_view(TABS[self.notebook.index("current")][0])
         self._update_statistics()
 
+    def _on_tab_changed(self, event):
+        # До первой отрисовки окна вкладки не строятся, их построит _load_initial
+        if self.loaded:
+            self._get_view(TABS[self.notebook.index("current")][0])
+
+    def _get_view(self, key):
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = self._build_view(key)
+            view.load()
+        return view
+
+    def _build_view(self, key):
+        import importlib
+        
+        module_name, class_name = next((module, cls) for k, _, module, cls in TABS if k == key)
+        view_class = getattr(importlib.import_module(module_name), class_name)
+        frame = self._tab_frames[key]
+        if key == 'tasks':
+            view = view_class(frame, self.task_controller, self.project_controller,
+                              self.user_controller, autoload=False, store=self.store,
+                              searcher=self.searcher)
+        elif key == 'projects':
+            view = view_class(frame, self.project_controller, autoload=False, store=self.store)
+        else:
+            view = view_class(frame, self.user_controller, autoload=False, store=self.store)
+        view.pack(fill=tk.BOTH, expand=True)
+        return view
+
+    @property
+    def task_view(self):
+        return self._get_view('tasks')
+
+    @property
+    def project_view(self):
+        return self._get_view('projects')
+
+    @property
+    def user_view(self):
+        return self._get_view('users')
+
+    def _on_store_changed(self, kind):
+        if self.loaded:
+            self._update_statistics()
+
     def _update_statistics(self):
         try:
-            all_tasks = self.task_controller.get_all_tasks()
-            overdue_tasks = self.task_controller.get_overdue_tasks()
-            all_projects = self.project_controller.get_all_projects()
-            all_users = self.user_controller.get_all_users()
+            counts = self.db_manager.get_counts()
             
-            stats_text = f"Задачи: {len(all_tasks)} | Просрочено: {len(overdue_tasks)} | "
-            stats_text += f"Проекты: {len(all_projects)} | Пользователи: {len(all_users)}"
+            stats_text = f"Задачи: {counts['tasks']} | Просрочено: {counts['overdue']} | "
+            stats_text += f"Проекты: {counts['projects']} | Пользователи: {counts['users']}"
             
             self.status_bar.config(text=stats_text)
             
@@ -112,25 +191,41 @@ class MainWindow:
                           "Система управления задачами\nВерсия 1.0")
 
     def refresh_all(self):
-        self.refresh_tasks()
-        self.refresh_projects()
-        self.refresh_users()
+        # Перечитываются только загруженные сущности; вкладки обновятся по уведомлениям.
+        # Прерванное обновление оставляет непрочитанные виды незагруженными,
+        # они загрузятся при следующем обращении
+        try:
+            with self.db_manager.cancellable(CancellationToken(timeout=REFRESH_BUDGET_S)):
+                self.store.reload_loaded()
+        except QueryCancelled as e:
+            self.status_bar.config(text=f"Обновление прервано: {e}")
+            return
         self._update_statistics()
 
+    # Ещё не открытые вкладки обновлять не нужно: данные загрузятся при открытии
     def refresh_tasks(self):
-        self.task_view.refresh_tasks()
+        if 'tasks' in self._views:
+            self._views['tasks'].refresh_tasks()
 
     def refresh_projects(self):
-        self.project_view.refresh_projects()
+        if 'projects' in self._views:
+            self._views['projects'].refresh_projects()
 
     def refresh_users(self):
-        self.user_view.refresh_users()
+        if 'users' in self._views:
+            self._views['users'].refresh_users()
 
     def _on_closing(self):
         import tkinter.messagebox as messagebox
         if messagebox.askokcancel("Выход", "Вы уверены, что хотите выйти?"):
-            self.db_manager.close()
-            self.root.destroy()
+            self.close()
+
+    def close(self):
+        # Закрытие окна прерывает идущий поиск, после чего останавливается его поток
+        self.db_manager.close()
+        self.root.destroy()
+        if self.searcher is not None:
+            self.searcher.close()
 
     def run(self):
         self.root.mainloop()
\ No newline at end of file
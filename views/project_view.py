@@ -2,19 +2,55 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, scrolledtext
 from datetime import datetime, timedelta
 from models.project import Project
+from views.actions import delete_selected_entity
+from views.entity_store import EntityStore
 
 
 class ProjectView(ttk.Frame):
-    def __init__(self, parent, project_controller) -> None:
+    def __init__(self, parent, project_controller, autoload: bool = True, store=None) -> None:
         super().__init__(parent)
         self.project_controller = project_controller
         
-        self.projects = []
+        self.store = store or EntityStore(project_controller=project_controller)
         self.selected_project_id = None
+        self._stale = False
+        # Прогресс читается один раз и сбрасывается по уведомлениям хранилища,
+        # а не на каждое нажатие клавиши в поиске
+        self._progress = None
+        self._descriptions = None
         
         self.create_widgets()
         
-        self.refresh_projects()
+        # Прогресс зависит от задач, поэтому их изменения тоже перерисовывают таблицу
+        self.store.subscribe(self._on_store_changed, kinds=['projects', 'tasks'])
+        self.bind("<Map>", self._on_map)
+        
+        if autoload:
+            self.load()
+
+    @property
+    def projects(self):
+        return self.store.all('projects')
+
+    def load(self) -> None:
+        try:
+            self.filter_projects(None)
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось загрузить проекты: {e}")
+
+    def _on_store_changed(self, kind) -> None:
+        self._progress = None
+        self._descriptions = None
+        # Скрытая вкладка перерисовывается, когда её снова покажут
+        if self.winfo_ismapped():
+            self.filter_projects(None)
+        else:
+            self._stale = True
+
+    def _on_map(self, event) -> None:
+        if self._stale:
+            self._stale = False
+            self.filter_projects(None)
 
     def create_widgets(self) -> None:
         control_frame = ttk.LabelFrame(self, text="Управление проектами")
@@ -55,7 +91,8 @@ class ProjectView(ttk.Frame):
         table_frame = ttk.LabelFrame(self, text="Список проектов")
         table_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        columns = ("ID", "Название", "Описание", "Дата начала", "Дата окончания", "Статус")
+        columns = ("ID", "Название", "Описание", "Дата начала", "Дата окончания", "Статус",
+                   "Прогресс")
         
         self.tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=15)
         
@@ -65,7 +102,8 @@ class ProjectView(ttk.Frame):
             "Описание": 200,
             "Дата начала": 100,
             "Дата окончания": 100,
-            "Статус": 80
+            "Статус": 80,
+            "Прогресс": 80
         }
         
         for col in columns:
@@ -84,61 +122,25 @@ class ProjectView(ttk.Frame):
 
     def refresh_projects(self) -> None:
         try:
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            
-            self.projects = self.project_controller.get_all_projects()
-            
-            for project in self.projects:
-                self.tree.insert("", tk.END, values=(
-                    project.id,
-                    project.name,
-                    project.description[:50] + "..." if len(project.description) > 50 else project.description,
-                    project.start_date.strftime("%d.%m.%Y"),
-                    project.end_date.strftime("%d.%m.%Y"),
-                    project.status
-                ))
-            
             self.search_var.set("")
             self.status_filter_var.set("Все")
             
             self.selected_project_id = None
             
+            # Таблица перерисовывается по уведомлению хранилища
+            self.store.reload('projects')
+            
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить проекты: {e}")
 
     def add_project(self) -> None:
-        dialog = ProjectFormDialog(self, self.project_controller)
-        if dialog.result:
-            self.refresh_projects()
+        ProjectFormDialog(self, self.project_controller, store=self.store)
 
     def delete_selected(self) -> None:
-        if not self.selected_project_id:
-            messagebox.showwarning("Удаление", "Выберите проект для удаления")
-            return
-        
-        project_name = ""
-        for project in self.projects:
-            if project.id == self.selected_project_id:
-                project_name = project.name
-                break
-        
-        if not project_name:
-            messagebox.showerror("Ошибка", "Проект не найден")
-            return
-        
-        if not messagebox.askyesno("Удаление", f"Вы уверены, что хотите удалить проект '{project_name}'?"):
-            return
-        
-        try:
-            if self.project_controller.delete_project(self.selected_project_id):
-                messagebox.showinfo("Успех", "Проект успешно удален")
-                self.refresh_projects()
-            else:
-                messagebox.showerror("Ошибка", "Не удалось удалить проект")
-                
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Ошибка удаления: {e}")
+        if delete_selected_entity(self.store, 'projects', self.selected_project_id,
+                                  lambda project: project.name,
+                                  self.project_controller.delete_project):
+            self.selected_project_id = None
 
     def on_project_select(self, event) -> None:
         selection = self.tree.selection()
@@ -156,9 +158,7 @@ class ProjectView(ttk.Frame):
                 messagebox.showerror("Ошибка", "Проект не найден")
                 return
             
-            dialog = ProjectFormDialog(self, self.project_controller, project=project)
-            if dialog.result:
-                self.refresh_projects()
+            ProjectFormDialog(self, self.project_controller, project=project, store=self.store)
                 
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить проект: {e}")
@@ -188,7 +188,7 @@ class ProjectView(ttk.Frame):
                 
                 if self.project_controller.update_project_status(self.selected_project_id, new_status):
                     messagebox.showinfo("Успех", "Статус проекта обновлен")
-                    self.refresh_projects()
+                    self.store.refresh('projects', self.selected_project_id)
                 else:
                     messagebox.showerror("Ошибка", "Не удалось обновить статус")
                     
@@ -201,33 +201,52 @@ class ProjectView(ttk.Frame):
         for item in self.tree.get_children():
             self.tree.delete(item)
         
-        filtered_projects = []
-        for project in self.projects:
-            if (search_text in project.name.lower() or 
-                search_text in project.description.lower()):
-                filtered_projects.append(project)
+        filtered_projects = self.projects
+        if search_text:
+            descriptions = self._project_descriptions()
+            filtered_projects = [p for p in filtered_projects
+                                 if search_text in p.name.lower()
+                                 or search_text in descriptions.get(p.id, "")]
         
         status = self.status_filter_var.get()
         if status != "Все":
             filtered_projects = [p for p in filtered_projects if p.status == status]
         
+        progress = self._project_progress()
+        
         for project in filtered_projects:
             self.tree.insert("", tk.END, values=(
                 project.id,
                 project.name,
-                project.description[:50] + "..." if len(project.description) > 50 else project.description,
+                project.description_preview,
                 project.start_date.strftime("%d.%m.%Y"),
                 project.end_date.strftime("%d.%m.%Y"),
-                project.status
+                project.status,
+                f"{progress.get(project.id, 0.0):.0f}%"
             ))
 
+    def _project_descriptions(self):
+        # Хранилище держит только превью, поэтому для поиска полные описания
+        # читаются одним запросом при первом поиске
+        if self._descriptions is None:
+            self._descriptions = {
+                project.id: (project.description or "").lower()
+                for project in self.project_controller.get_all_projects(columns=['description'])}
+        return self._descriptions
+
+    def _project_progress(self):
+        if self._progress is None:
+            self._progress = self.project_controller.get_all_project_progress()
+        return self._progress
+
     def filter_by_status(self, event=None) -> None:
         self.filter_projects(None)
 
 
 class ProjectFormDialog:
-    def __init__(self, parent, project_controller, project=None):
+    def __init__(self, parent, project_controller, project=None, store=None):
         self.project_controller = project_controller
+        self.store = store or EntityStore(project_controller=project_controller)
         self.project = project
         self.result = False
         
@@ -406,6 +425,7 @@ class ProjectFormDialog:
                 if not success:
                     messagebox.showerror("Ошибка", "Не удалось обновить проект")
                     return
+                self.store.refresh('projects', self.project.id)
             else:
                 try:
                     new_project = self.project_controller.add_project(
@@ -415,6 +435,7 @@ class ProjectFormDialog:
                         end_date=end_date
                     )
                     print(f"Проект создан с ID: {new_project.id}")
+                    self.store.refresh('projects', new_project.id)
                 except ValueError as e:
                     messagebox.showerror("Ошибка валидации", str(e))
                     return
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import List, Optional
+from models.task import Task
+from controllers.async_controllers import AsyncTaskController
+from database.async_database_manager import AsyncDatabaseManager
+from database.cancellation import CancellationToken
+from database.task_query import TaskQuery
+
+
+class SearchRunner:
+    # Поиск задач выполняется в фоновом цикле событий через отдельное
+    # соединение, поэтому долгий запрос не останавливает поток интерфейса.
+    # Результат отдаётся через Future, который представление опрашивает
+    def __init__(self, db_path: str = "tasks.db") -> None:
+        self.db_path = db_path
+        self._controller: Optional[AsyncTaskController] = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever,
+                                        name="task-search", daemon=True)
+        self._thread.start()
+
+    def submit(self, query: TaskQuery, token: CancellationToken) -> "Future[List[Task]]":
+        if self._loop.is_closed():
+            raise Exception("Поиск задач остановлен")
+        return asyncio.run_coroutine_threadsafe(self._query(query, token), self._loop)
+
+    async def _query(self, query: TaskQuery, token: CancellationToken) -> List[Task]:
+        # Соединение открывается при первом поиске, а не при запуске окна.
+        # Контроллер создаётся без await, чтобы параллельный поиск не открыл
+        # второе соединение; открытие ждёт фоновый поток, а не интерфейс
+        if self._controller is None:
+            self._controller = AsyncTaskController(AsyncDatabaseManager(self.db_path))
+        return await self._controller.query_tasks(query, token)
+
+    async def _close(self) -> None:
+        if self._controller is not None:
+            await self._controller.db_manager.close()
+            self._controller = None
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self._close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
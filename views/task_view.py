@@ -1,26 +1,90 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
+from concurrent.futures import Future
 from datetime import datetime
 from models.task import Task
+from database.cancellation import CancellationToken, QueryCancelled
+from database.task_query import TaskQuery
+from views.actions import delete_selected_entity
+from views.entity_store import EntityStore
+
+# Таблице нужно только начало описания, полный текст из базы не читается
+LIST_COLUMNS = ('title', 'description_preview', 'priority', 'status', 'due_date',
+                'project_id', 'assignee_id')
+# Поиск запускается после паузы в наборе, а не на каждое нажатие клавиши
+SEARCH_DELAY_MS = 250
+# Бюджет времени одного запроса фильтров; долгий запрос прерывается
+QUERY_BUDGET_S = 2.0
+# Период проверки, завершился ли поиск в фоновом потоке
+SEARCH_POLL_MS = 20
 
 
 class TaskView(ttk.Frame):
-    def __init__(self, parent, task_controller, project_controller, user_controller) -> None:
+    def __init__(self, parent, task_controller, project_controller, user_controller,
+                 autoload: bool = True, store=None, searcher=None) -> None:
         super().__init__(parent)
         self.task_controller = task_controller
         self.project_controller = project_controller
         self.user_controller = user_controller
+        # Без фонового поиска запрос выполняется в потоке интерфейса
+        self.searcher = searcher
         
+        self.store = store or EntityStore(task_controller, project_controller, user_controller)
         self.tasks = []
-        self.projects = []
-        self.users = []
+        self.overdue_only = False
         self.selected_task_id = None
+        self._stale = False
+        self._search_job = None
+        self._poll_job = None
+        self._token = None
         
         self.create_widgets()
         
-        self.refresh_tasks()
-        self._load_projects()
-        self._load_users()
+        self.store.subscribe(self._on_store_changed)
+        self.bind("<Map>", self._on_map)
+        self.bind("<Destroy>", self._on_destroy)
+        
+        if autoload:
+            self.load()
+
+    def load(self) -> None:
+        try:
+            self.filter_tasks(None)
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось загрузить задачи: {e}")
+
+    def _on_store_changed(self, kind) -> None:
+        # Скрытая вкладка перерисовывается, когда её снова покажут
+        if self.winfo_ismapped():
+            self.filter_tasks(None)
+        else:
+            self._stale = True
+
+    def _on_map(self, event) -> None:
+        if self._stale:
+            self._stale = False
+            self.filter_tasks(None)
+
+    def _on_destroy(self, event) -> None:
+        # Закрытое представление бросает отложенный и прерывает идущий поиск
+        if event.widget is not self:
+            return
+        self._cancel_search()
+
+    @property
+    def searching(self) -> bool:
+        return self._token is not None
+
+    def _cancel_search(self) -> None:
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+            self._search_job = None
+        if self._poll_job is not None:
+            self.after_cancel(self._poll_job)
+            self._poll_job = None
+        if self._token is not None:
+            self._token.cancel()
+            self._token = None
 
     def create_widgets(self) -> None:
         control_frame = ttk.LabelFrame(self, text="Управление задачами")
@@ -45,7 +109,7 @@ class TaskView(ttk.Frame):
         self.search_var = tk.StringVar()
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=30)
         search_entry.pack(side=tk.LEFT, padx=2)
-        search_entry.bind("<KeyRelease>", self.filter_tasks)
+        search_entry.bind("<KeyRelease>", self._schedule_search)
         
         filter_frame = ttk.Frame(control_frame)
         filter_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -69,6 +133,9 @@ class TaskView(ttk.Frame):
         ttk.Button(filter_frame, text="Просроченные", 
                   command=self.filter_overdue).pack(side=tk.LEFT, padx=2)
         
+        self.search_status = ttk.Label(filter_frame, text="", foreground="red")
+        self.search_status.pack(side=tk.LEFT, padx=10)
+        
         table_frame = ttk.LabelFrame(self, text="Список задач")
         table_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
@@ -104,68 +171,27 @@ class TaskView(ttk.Frame):
 
     def refresh_tasks(self) -> None:
         try:
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            
-            self.tasks = self.task_controller.get_all_tasks()
-            
-            for task in self.tasks:
-                project_name = self._get_project_name(task.project_id)
-                user_name = self._get_user_name(task.assignee_id)
-                
-                self.tree.insert("", tk.END, values=(
-                    task.id,
-                    task.title,
-                    task.description[:50] + "..." if len(task.description) > 50 else task.description,
-                    task.priority,
-                    task.status,
-                    task.due_date.strftime("%d.%m.%Y"),
-                    project_name,
-                    user_name
-                ))
-            
             self.search_var.set("")
             self.status_filter_var.set("Все")
             self.priority_filter_var.set("Все")
+            self.overdue_only = False
             
             self.selected_task_id = None
             
+            # Таблица перерисовывается по уведомлению хранилища
+            self.store.reload('tasks')
+            
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить задачи: {e}")
 
     def add_task(self) -> None:
-        dialog = TaskFormDialog(self, self.task_controller, 
-                               self.project_controller, self.user_controller)
-        if dialog.result:
-            self.refresh_tasks()
+        TaskFormDialog(self, self.task_controller, self.project_controller,
+                       self.user_controller, store=self.store)
 
     def delete_selected(self) -> None:
-        if not self.selected_task_id:
-            messagebox.showwarning("Удаление", "Выберите задачу для удаления")
-            return
-        
-        task_title = ""
-        for task in self.tasks:
-            if task.id == self.selected_task_id:
-                task_title = task.title
-                break
-        
-        if not task_title:
-            messagebox.showerror("Ошибка", "Задача не найдена")
-            return
-        
-        if not messagebox.askyesno("Удаление", f"Вы уверены, что хотите удалить задачу '{task_title}'?"):
-            return
-        
-        try:
-            if self.task_controller.delete_task(self.selected_task_id):
-                messagebox.showinfo("Успех", "Задача успешно удалена")
-                self.refresh_tasks()
-            else:
-                messagebox.showerror("Ошибка", "Не удалось удалить задачу")
-                
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Ошибка удаления: {e}")
+        if delete_selected_entity(self.store, 'tasks', self.selected_task_id,
+                                  lambda task: task.title, self.task_controller.delete_task):
+            self.selected_task_id = None
 
     def on_task_select(self, event) -> None:
         selection = self.tree.selection()
@@ -183,11 +209,9 @@ class TaskView(ttk.Frame):
                 messagebox.showerror("Ошибка", "Задача не найден")
                 return
             
-            dialog = TaskFormDialog(self, self.task_controller,
-                                  self.project_controller, self.user_controller,
-                                  task=task)
-            if dialog.result:
-                self.refresh_tasks()
+            TaskFormDialog(self, self.task_controller,
+                           self.project_controller, self.user_controller,
+                           task=task, store=self.store)
                 
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить задачу: {e}")
@@ -217,64 +241,88 @@ class TaskView(ttk.Frame):
                 
                 if self.task_controller.update_task_status(self.selected_task_id, new_status):
                     messagebox.showinfo("Успех", "Статус задачи обновлен")
-                    self.refresh_tasks()
+                    self.store.refresh('tasks', self.selected_task_id)
                 else:
                     messagebox.showerror("Ошибка", "Не удалось обновить статус")
                     
         except Exception as e:
             messagebox.showerror("Ошибка", f"Ошибка обновления статуса: {e}")
 
-    def _load_projects(self):
+    def _get_project_name(self, project_id):
+        project = self.store.get('projects', project_id)
+        return project.name if project else f"ID: {project_id}"
+
+    def _get_user_name(self, user_id):
+        user = self.store.get('users', user_id)
+        return user.username if user else f"ID: {user_id}"
+
+    def _schedule_search(self, event) -> None:
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DELAY_MS, self._run_search)
+
+    def _run_search(self) -> None:
+        self._search_job = None
+        self.filter_tasks(None)
+
+    def filter_tasks(self, event) -> None:
+        # Новый запрос отменяет отложенный и прерывает идущий поиск
+        # по прежнему тексту, его результат уже не нужен
+        self._cancel_search()
+        # Все фильтры выполняются одним запросом, поэтому время зависит
+        # от размера результата, а не от числа задач в базе
+        token = self._token = CancellationToken(timeout=QUERY_BUDGET_S)
+        self._poll_search(self._submit_search(self._build_query(), token), token)
+
+    def _submit_search(self, query: TaskQuery, token: CancellationToken) -> Future:
+        if self.searcher is not None:
+            return self.searcher.submit(query, token)
+        future = Future()
         try:
-            self.projects = self.project_controller.get_all_projects()
+            future.set_result(self.task_controller.query_tasks(query, token))
         except Exception as e:
-            messagebox.showerror("Ошибка", f"Не удалось загрузить проекты: {e}")
-            self.projects = []
+            future.set_exception(e)
+        return future
 
-    def _load_users(self):
+    def _poll_search(self, future: Future, token: CancellationToken) -> None:
+        # Результат поиска, который сменил более новый, отбрасывается
+        if token is not self._token:
+            return
+        if not future.done():
+            self._poll_job = self.after(SEARCH_POLL_MS, self._poll_search, future, token)
+            return
+        self._poll_job = None
+        self._token = None
         try:
-            self.users = self.user_controller.get_all_users()
+            tasks = future.result()
+        except QueryCancelled as e:
+            # Прерванный запрос не ошибка: таблица показывает прежний результат
+            self.search_status.config(text=f"Поиск прерван: {e}. Показан прежний результат")
+            return
         except Exception as e:
-            messagebox.showerror("Ошибка", f"Не удалось загрузить пользователей: {e}")
-            self.users = []
-
-    def _get_project_name(self, project_id):
-        for project in self.projects:
-            if project.id == project_id:
-                return project.name
-        return f"ID: {project_id}"
-
-    def _get_user_name(self, user_id):
-        for user in self.users:
-            if user.id == user_id:
-                return user.username
-        return f"ID: {user_id}"
+            messagebox.showerror("Ошибка", f"Не удалось загрузить задачи: {e}")
+            return
+        self._show_tasks(tasks)
 
-    def filter_tasks(self, event) -> None:
-        search_text = self.search_var.get().lower()
+    def _show_tasks(self, tasks) -> None:
+        self.search_status.config(text="")
+        self.tasks = self.store.merge('tasks', tasks)
+        # Названия проектов и имена исполнителей догружаются пакетами
+        # только для показанных задач
+        self.store.get_many('projects', {task.project_id for task in self.tasks})
+        self.store.get_many('users', {task.assignee_id for task in self.tasks})
         
         for item in self.tree.get_children():
             self.tree.delete(item)
         
-        filtered_tasks = []
         for task in self.tasks:
-            if (search_text in task.title.lower() or 
-                search_text in task.description.lower() or
-                search_text in str(task.priority) or
-                search_text in task.status.lower()):
-                filtered_tasks.append(task)
-        
-        filtered_tasks = self._apply_status_filter(filtered_tasks)
-        filtered_tasks = self._apply_priority_filter(filtered_tasks)
-        
-        for task in filtered_tasks:
             project_name = self._get_project_name(task.project_id)
             user_name = self._get_user_name(task.assignee_id)
             
             self.tree.insert("", tk.END, values=(
                 task.id,
                 task.title,
-                task.description[:50] + "..." if len(task.description) > 50 else task.description,
+                task.description_preview,
                 task.priority,
                 task.status,
                 task.due_date.strftime("%d.%m.%Y"),
@@ -290,54 +338,35 @@ class TaskView(ttk.Frame):
 
     def filter_overdue(self) -> None:
         try:
-            overdue_tasks = self.task_controller.get_overdue_tasks()
-            
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            
-            for task in overdue_tasks:
-                project_name = self._get_project_name(task.project_id)
-                user_name = self._get_user_name(task.assignee_id)
-                
-                self.tree.insert("", tk.END, values=(
-                    task.id,
-                    task.title,
-                    task.description[:50] + "..." if len(task.description) > 50 else task.description,
-                    task.priority,
-                    task.status,
-                    task.due_date.strftime("%d.%m.%Y"),
-                    project_name,
-                    user_name
-                ))
-                
+            self.overdue_only = True
+            self.filter_tasks(None)
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить просроченные задачи: {e}")
 
-    def _apply_status_filter(self, tasks):
+    def _build_query(self) -> TaskQuery:
+        query = (TaskQuery().select(*LIST_COLUMNS)
+                 .search(self.search_var.get().strip())
+                 .overdue(self.overdue_only))
+        
         status = self.status_filter_var.get()
-        if status == "Все":
-            return tasks
-        return [task for task in tasks if task.status == status]
-
-    def _apply_priority_filter(self, tasks):
+        if status != "Все":
+            query = query.with_status(status)
+        
         priority_str = self.priority_filter_var.get()
-        if priority_str == "Все":
-            return tasks
+        if priority_str != "Все":
+            query = query.with_priority(int(priority_str[0]))
         
-        try:
-            priority = int(priority_str[0])
-            return [task for task in tasks if task.priority == priority]
-        except (ValueError, IndexError):
-            return tasks
+        return query
 
 
 class TaskFormDialog:
     
     def __init__(self, parent, task_controller, project_controller, 
-                 user_controller, task=None):
+                 user_controller, task=None, store=None):
         self.task_controller = task_controller
         self.project_controller = project_controller
         self.user_controller = user_controller
+        self.store = store or EntityStore(task_controller, project_controller, user_controller)
         self.task = task
         self.result = False
         
@@ -423,7 +452,7 @@ class TaskFormDialog:
 
     def _load_projects(self):
         try:
-            projects = self.project_controller.get_all_projects()
+            projects = self.store.all('projects')
             project_list = [f"{project.id}: {project.name}" for project in projects]
             self.project_combo['values'] = project_list
             self.project_map = {item: project.id for item, project in zip(project_list, projects)}
@@ -432,7 +461,7 @@ class TaskFormDialog:
 
     def _load_users(self):
         try:
-            users = self.user_controller.get_all_users()
+            users = self.store.all('users')
             user_list = [f"{user.id}: {user.username}" for user in users]
             self.user_combo['values'] = user_list
             self.user_map = {item: user.id for item, user in zip(user_list, users)}
@@ -510,8 +539,9 @@ class TaskFormDialog:
                 if not success:
                     messagebox.showerror("Ошибка", "Не удалось обновить задачу")
                     return
+                self.store.refresh('tasks', self.task.id)
             else:
-                self.task_controller.add_task(
+                task = self.task_controller.add_task(
                     title=title,
                     description=description,
                     priority=priority,
@@ -519,6 +549,7 @@ class TaskFormDialog:
                     project_id=project_id,
                     assignee_id=assignee_id
                 )
+                self.store.refresh('tasks', task.id)
             
             self.result = True
             self.dialog.destroy()
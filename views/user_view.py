@@ -2,19 +2,53 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 from datetime import datetime
 from models.user import User
+from views.actions import delete_selected_entity
+from views.entity_store import EntityStore
 
 
 class UserView(ttk.Frame):
-    def __init__(self, parent, user_controller) -> None:
+    def __init__(self, parent, user_controller, autoload: bool = True, store=None) -> None:
         super().__init__(parent)
         self.user_controller = user_controller
         
-        self.users = []
+        self.store = store or EntityStore(user_controller=user_controller)
         self.selected_user_id = None
+        self._stale = False
+        # Нагрузка читается один раз и сбрасывается по уведомлениям хранилища,
+        # а не на каждое нажатие клавиши в поиске
+        self._workloads = None
         
         self.create_widgets()
         
-        self.refresh_users()
+        # Нагрузка зависит от задач, поэтому их изменения тоже перерисовывают таблицу
+        self.store.subscribe(self._on_store_changed, kinds=['users', 'tasks'])
+        self.bind("<Map>", self._on_map)
+        
+        if autoload:
+            self.load()
+
+    @property
+    def users(self):
+        return self.store.all('users')
+
+    def load(self) -> None:
+        try:
+            self.filter_users(None)
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось загрузить пользователей: {e}")
+
+    def _on_store_changed(self, kind) -> None:
+        self._workloads = None
+        # Скрытая вкладка перерисовывается, когда её снова покажут
+        if self.winfo_ismapped():
+            self.filter_users(None)
+        else:
+            self._stale = True
+
+    def _on_map(self, event) -> None:
+        if self._stale:
+            self._stale = False
+            self.filter_users(None)
 
     def create_widgets(self) -> None:
         control_frame = ttk.LabelFrame(self, text="Управление пользователями")
@@ -53,7 +87,8 @@ class UserView(ttk.Frame):
         table_frame = ttk.LabelFrame(self, text="Список пользователей")
         table_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        columns = ("ID", "Имя пользователя", "Email", "Роль", "Дата регистрации")
+        columns = ("ID", "Имя пользователя", "Email", "Роль", "Дата регистрации",
+                   "Открыто", "В работе", "Просрочено", "Ближайший срок")
         
         self.tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=15)
         
@@ -62,7 +97,11 @@ class UserView(ttk.Frame):
             "Имя пользователя": 150,
             "Email": 200,
             "Роль": 100,
-            "Дата регистрации": 120
+            "Дата регистрации": 120,
+            "Открыто": 70,
+            "В работе": 70,
+            "Просрочено": 80,
+            "Ближайший срок": 110
         }
         
         for col in columns:
@@ -81,60 +120,24 @@ class UserView(ttk.Frame):
 
     def refresh_users(self) -> None:
         try:
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            
-            self.users = self.user_controller.get_all_users()
-            
-            for user in self.users:
-                self.tree.insert("", tk.END, values=(
-                    user.id,
-                    user.username,
-                    user.email,
-                    user.role,
-                    user.registration_date.strftime("%d.%m.%Y")
-                ))
-            
             self.search_var.set("")
             self.role_filter_var.set("Все")
             
             self.selected_user_id = None
             
+            # Таблица перерисовывается по уведомлению хранилища
+            self.store.reload('users')
+            
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить пользователей: {e}")
 
     def add_user(self) -> None:
-        dialog = UserFormDialog(self, self.user_controller)
-        if dialog.result:
-            self.refresh_users()
+        UserFormDialog(self, self.user_controller, store=self.store)
 
     def delete_selected(self) -> None:
-        if not self.selected_user_id:
-            messagebox.showwarning("Удаление", "Выберите пользователя для удаления")
-            return
-        
-        username = ""
-        for user in self.users:
-            if user.id == self.selected_user_id:
-                username = user.username
-                break
-        
-        if not username:
-            messagebox.showerror("Ошибка", "Пользователь не найден")
-            return
-        
-        if not messagebox.askyesno("Удаление", f"Вы уверены, что хотите удалить пользователя '{username}'?"):
-            return
-        
-        try:
-            if self.user_controller.delete_user(self.selected_user_id):
-                messagebox.showinfo("Успех", "Пользователь успешно удален")
-                self.refresh_users()
-            else:
-                messagebox.showerror("Ошибка", "Не удалось удалить пользователя")
-                
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Ошибка удаления: {e}")
+        if delete_selected_entity(self.store, 'users', self.selected_user_id,
+                                  lambda user: user.username, self.user_controller.delete_user):
+            self.selected_user_id = None
 
     def on_user_select(self, event) -> None:
         selection = self.tree.selection()
@@ -152,9 +155,7 @@ class UserView(ttk.Frame):
                 messagebox.showerror("Ошибка", "Пользователь не найден")
                 return
             
-            dialog = UserFormDialog(self, self.user_controller, user=user)
-            if dialog.result:
-                self.refresh_users()
+            UserFormDialog(self, self.user_controller, user=user, store=self.store)
                 
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить пользователя: {e}")
@@ -176,22 +177,36 @@ class UserView(ttk.Frame):
         if role != "Все":
             filtered_users = [u for u in filtered_users if u.role == role]
         
+        workloads = self._user_workloads()
+        
         for user in filtered_users:
+            workload = workloads[user.id]
+            next_due_date = workload['next_due_date']
             self.tree.insert("", tk.END, values=(
                 user.id,
                 user.username,
                 user.email,
                 user.role,
-                user.registration_date.strftime("%d.%m.%Y")
+                user.registration_date.strftime("%d.%m.%Y"),
+                workload['open'],
+                workload['in_progress'],
+                workload['overdue'],
+                next_due_date.strftime("%d.%m.%Y") if next_due_date else ""
             ))
 
+    def _user_workloads(self):
+        if self._workloads is None:
+            self._workloads = self.user_controller.get_all_user_workload()
+        return self._workloads
+
     def filter_by_role(self, event=None) -> None:
         self.filter_users(None)
 
 
 class UserFormDialog:
-    def __init__(self, parent, user_controller, user=None):
+    def __init__(self, parent, user_controller, user=None, store=None):
         self.user_controller = user_controller
+        self.store = store or EntityStore(user_controller=user_controller)
         self.user = user
         self.result = False
         
@@ -278,12 +293,14 @@ class UserFormDialog:
                 if not success:
                     messagebox.showerror("Ошибка", "Не удалось обновить пользователя")
                     return
+                self.store.refresh('users', self.user.id)
             else:
-                self.user_controller.add_user(
+                user = self.user_controller.add_user(
                     username=username,
                     email=email,
                     role=role
                 )
+                self.store.refresh('users', user.id)
             
             self.result = True
             self.dialog.destroy()